@@ -1,23 +1,30 @@
 from datetime import date
 from ibis.expr.types.relations import Table
 import ibis
+from ibis.common.exceptions import IbisError
 from phenex.util.serialization.to_dict import to_dict
+from phenex.tables import PhenexTable
+
+
+# Backends on which "auto" keeps non-reduced rows with a QUALIFY over rank(),
+# instead of a GROUP BY followed by a semi-join back. DuckDB is deliberately not
+# listed: see phenex/test/aggregators/benchmark_aggregator.py for measurements.
+QUALIFY_STRATEGY_BACKENDS = ("snowflake",)
 
 
 class VerticalDateAggregator:
     """
     Base class for aggregating events by selecting rows with specific dates (first, last, nearest) within groups.
 
-    This aggregator works by applying window functions to find the min/max date within each partition,
-    then filtering to keep only rows that match that aggregated date. Useful for selecting the first or
-    last event per patient, or the nearest event to a reference date.
+    The selected date is found per partition either with a QUALIFY over a ranking window (row_number() when reducing to one row per group, rank() when all rows on the selected date are kept) or with a GROUP BY (followed by a semi-join back to the events when the full rows are needed). Useful for selecting the first or last event per patient, or the nearest event to a reference date.
 
     Attributes:
         aggregation_index (List[str]): Column names to group by. Default is ["PERSON_ID"].
-        aggregation_function (str): The aggregation function to apply. Options are "min" (first) or "max" (last/nearest).
+        aggregation_function (str): The aggregation function to apply. Options are "min" (first) or "max" (last). Nearest uses its own selection; see Nearest.
         event_date_column (str): The name of the date column to aggregate on. Default is "EVENT_DATE".
         reduce (bool): If True, returns distinct rows with only index and date columns, setting VALUE to NULL. Default is False.
         preserve_nulls (bool): If True, preserves rows where all dates in a partition are NULL. Default is False.
+        strategy (str): How the selected date is computed. One of "qualify", "group_by" or "auto". "auto" uses a pure GROUP BY when reduce=True, and otherwise picks "qualify" on backends listed in QUALIFY_STRATEGY_BACKENDS and "group_by" (GROUP BY + semi-join) elsewhere. Default is "auto".
 
     Methods:
         aggregate(input_table: Table) -> Table:
@@ -62,6 +69,12 @@ class VerticalDateAggregator:
         first = First(reduce=True)
         first_events = first.aggregate(events_table)
         ```
+
+        ```python
+        # Example 5: Force the QUALIFY strategy
+        last = Last(strategy="qualify")
+        last_events = last.aggregate(events_table)
+        ```
     """
 
     def __init__(
@@ -71,68 +84,118 @@ class VerticalDateAggregator:
         event_date_column="EVENT_DATE",
         reduce=False,
         preserve_nulls=False,
+        strategy="auto",
     ):
+        if strategy not in ["auto", "qualify", "group_by"]:
+            raise ValueError(f"Unsupported aggregation strategy: {strategy}")
         self.aggregation_index = aggregation_index
         self.aggregation_function = aggregation_function
         self.event_date_column = event_date_column
         self.reduce = reduce
         self.preserve_nulls = preserve_nulls
+        self.strategy = strategy
 
-    def aggregate(self, input_table: Table):
+    def _get_aggregation_index(self, input_table: Table):
         # Ensure INDEX_DATE is in the aggregation index if the table has it
         agg_index = list(self.aggregation_index)
         if "INDEX_DATE" in input_table.columns and "INDEX_DATE" not in agg_index:
             agg_index.append("INDEX_DATE")
-        # Define the window specification
-        partition_cols = [
-            getattr(input_table, col) if isinstance(col, str) else col
-            for col in agg_index
-        ]
-        window_spec = ibis.window(
-            group_by=partition_cols, order_by=input_table[self.event_date_column]
-        )
+        return agg_index
 
-        # Apply the specified aggregation function to the event_date_column
-        event_date_col = getattr(input_table, self.event_date_column)
+    def _aggregated_date(self, input_table: Table):
+        """
+        The aggregate expression selecting one date per group, used by the group_by strategy.
+        """
+        event_date_col = input_table[self.event_date_column]
         if self.aggregation_function == "max":
-            aggregated_date = event_date_col.max().over(window_spec)
+            return event_date_col.max()
         elif self.aggregation_function == "min":
-            aggregated_date = event_date_col.min().over(window_spec)
-        else:
-            raise ValueError(
-                f"Unsupported aggregation function: {self.aggregation_function}"
-            )
-
-        # Handle case where all dates in a partition are null
-        # In this case, max/min will return null, which is the correct behavior
+            return event_date_col.min()
+        raise ValueError(
+            f"Unsupported aggregation function: {self.aggregation_function}"
+        )
 
-        # Add the aggregated date as a new column
-        input_table = input_table.mutate(aggregated_date=aggregated_date)
+    def _sort_key(self, input_table: Table):
+        """
+        The window ordering under which the selected date ranks first, used by the qualify strategy. Null dates sort last.
+        """
+        event_date_col = input_table[self.event_date_column]
+        if self.aggregation_function == "max":
+            return event_date_col.desc(nulls_first=False)
+        elif self.aggregation_function == "min":
+            return event_date_col.asc(nulls_first=False)
+        raise ValueError(
+            f"Unsupported aggregation function: {self.aggregation_function}"
+        )
 
-        # Filter rows where the original date matches the aggregated date
-        date_match = input_table[self.event_date_column] == input_table.aggregated_date
+    def _resolve_strategy(self, input_table: Table):
+        if self.strategy != "auto":
+            return self.strategy
+        if self.reduce:
+            return "group_by"
+        try:
+            backend = input_table._find_backend(use_default=True).name
+        except IbisError:
+            # e.g. an expression spanning several backends; group_by is valid everywhere
+            return "group_by"
+        if backend in QUALIFY_STRATEGY_BACKENDS:
+            return "qualify"
+        return "group_by"
 
-        if self.preserve_nulls:
-            # Handle null dates explicitly to avoid dropping them
-            both_null = (
-                input_table[self.event_date_column].isnull()
-                & input_table.aggregated_date.isnull()
+    def aggregate(self, input_table: Table):
+        if isinstance(input_table, PhenexTable):
+            input_table = input_table.table
+        if not self.preserve_nulls:
+            input_table = input_table.filter(
+                input_table[self.event_date_column].notnull()
             )
-            input_table = input_table.filter(date_match | both_null)
-        else:
-            # Original behavior - nulls will be dropped
-            input_table = input_table.filter(date_match)
+        if self._resolve_strategy(input_table) == "group_by":
+            return self._aggregate_group_by(input_table)
+        return self._aggregate_qualify(input_table)
 
-        # Drop the temporary aggregated_date column
-        input_table = input_table.drop("aggregated_date")
+    def _aggregate_qualify(self, input_table: Table):
+        agg_index = self._get_aggregation_index(input_table)
+        window_spec = ibis.window(
+            group_by=[input_table[col] for col in agg_index],
+            order_by=self._sort_key(input_table),
+        )
+        # A filter over a bare window function compiles to QUALIFY on backends
+        # that support it (and to a subquery elsewhere)
+        if self.reduce:
+            # exactly one row per group, so no DISTINCT is needed
+            input_table = input_table.filter(ibis.row_number().over(window_spec) == 0)
+            return input_table.select(*agg_index, self.event_date_column).mutate(
+                VALUE=ibis.null().cast("int32")
+            )
+        # rank() keeps every row tied on the selected date; in an all-null
+        # partition (preserve_nulls=True) all rows tie and are kept
+        return input_table.filter(ibis.rank().over(window_spec) == 0)
+
+    def _aggregate_group_by(self, input_table: Table):
+        agg_index = self._get_aggregation_index(input_table)
+        selected_dates = input_table.group_by(agg_index).aggregate(
+            aggregated_date=self._aggregated_date(input_table)
+        )
 
-        # Apply the distinct reduction if required
         if self.reduce:
-            selected_columns = list(agg_index) + [self.event_date_column]
-            input_table = input_table.select(selected_columns).distinct()
-            input_table = input_table.mutate(VALUE=ibis.null().cast("int32"))
+            # one row per group already; no distinct and no join back required
+            selected_dates = selected_dates.select(
+                *agg_index,
+                selected_dates.aggregated_date.name(self.event_date_column),
+            )
+            return selected_dates.mutate(VALUE=ibis.null().cast("int32"))
 
-        return input_table
+        # Plain equality on the keys keeps the semi-join hashable; only the date
+        # needs a null-safe match, for all-null partitions under preserve_nulls
+        predicates = [input_table[col] == selected_dates[col] for col in agg_index]
+        event_date_col = input_table[self.event_date_column]
+        if self.preserve_nulls:
+            predicates.append(
+                event_date_col.identical_to(selected_dates.aggregated_date)
+            )
+        else:
+            predicates.append(event_date_col == selected_dates.aggregated_date)
+        return input_table.semi_join(selected_dates, predicates)
 
     def to_dict(self):
         return to_dict(self)
@@ -140,14 +203,48 @@ class VerticalDateAggregator:
 
 class Nearest(VerticalDateAggregator):
     """
-    Aggregator that selects the nearest (most recent) event date within each group.
+    Aggregator that selects the event date nearest to a reference date (by default INDEX_DATE) within each group.
 
-    This is an alias for Last, using max aggregation function to find the latest date.
-    Commonly used to find the most recent event before or at a reference date.
+    The nearest date minimizes the absolute number of days between the event date and the reference date; with the group_by strategy it is found with a single arg-min, with the qualify strategy by ranking on the same key. All rows on the selected date are kept. If two dates are equally far from the reference date, the earlier one (i.e. the one prior to the reference date) wins.
+
+    Attributes:
+        reference_date_column (str): The column the distance is measured from. Must be present on the input table. Default is "INDEX_DATE".
     """
 
-    def __init__(self, **kwargs):
-        super().__init__(aggregation_function="max", **kwargs)
+    def __init__(self, reference_date_column="INDEX_DATE", **kwargs):
+        kwargs.pop("aggregation_function", None)
+        super().__init__(aggregation_function="nearest", **kwargs)
+        self.reference_date_column = reference_date_column
+
+    def _get_aggregation_index(self, input_table: Table):
+        agg_index = super()._get_aggregation_index(input_table)
+        if self.reference_date_column not in agg_index:
+            agg_index.append(self.reference_date_column)
+        return agg_index
+
+    def _distance_key(self, input_table: Table):
+        event_date_col = input_table[self.event_date_column]
+        reference_date_col = input_table[self.reference_date_column]
+        # twice the distance, plus one for events after the reference date, so
+        # that the earlier of two equidistant dates has the smaller key
+        return reference_date_col.delta(event_date_col, "day").abs() * 2 + (
+            event_date_col > reference_date_col
+        ).cast("int64")
+
+    def _aggregated_date(self, input_table: Table):
+        return input_table[self.event_date_column].argmin(
+            self._distance_key(input_table)
+        )
+
+    def _sort_key(self, input_table: Table):
+        return self._distance_key(input_table).asc(nulls_first=False)
+
+    def aggregate(self, input_table: Table):
+        if self.reference_date_column not in input_table.columns:
+            raise ValueError(
+                f"Nearest requires a {self.reference_date_column} column on the input table"
+            )
+        return super().aggregate(input_table)
 
 
 class First(VerticalDateAggregator):
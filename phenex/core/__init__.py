@@ -3,7 +3,9 @@ from .subcohort import Subcohort
 from .study import Study
 from .data_period_filter_node import DataPeriodFilterNode
 from .hstack_node import HStackNode
+from .leaf_matrix_node import LeafMatrixNode
 from .subset_table import SubsetTable
+from .subset_keys_node import SubsetKeysNode
 from .inclusions_table_node import InclusionsTableNode
 from .exclusions_table_node import ExclusionsTableNode
 from .index_phenotype import IndexPhenotype
@@ -15,7 +17,9 @@ __all__ = [
     "Study",
     "DataPeriodFilterNode",
     "HStackNode",
+    "LeafMatrixNode",
     "SubsetTable",
+    "SubsetKeysNode",
     "InclusionsTableNode",
     "ExclusionsTableNode",
     "IndexPhenotype",
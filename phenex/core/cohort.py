@@ -2,6 +2,7 @@ import os
 import re
 from typing import List, Dict, Optional
 from phenex.phenotypes.phenotype import Phenotype
+from phenex.phenotypes.computation_graph_phenotypes import ComputationGraphPhenotype
 from phenex.node import Node, NodeGroup
 import ibis
 from ibis.expr.types.relations import Table
@@ -13,7 +14,9 @@ from phenex.filters import DateFilter
 from phenex.core.data_period_filter_node import DataPeriodFilterNode
 from phenex.core.database_sampler_node import DatabaseSamplerNode
 from phenex.core.hstack_node import HStackNode
+from phenex.core.leaf_matrix_node import LeafMatrixNode
 from phenex.core.subset_table import SubsetTable
+from phenex.core.subset_keys_node import SubsetKeysNode
 from phenex.core.inclusions_table_node import InclusionsTableNode
 from phenex.core.exclusions_table_node import ExclusionsTableNode
 from phenex.core.index_phenotype import IndexPhenotype
@@ -46,6 +49,8 @@ class Cohort:
         custom_reporters: Additional reporter instances to run on this cohort only, after the default Waterfall and Table1 reporters. Each reporter must implement ``execute(cohort)`` and ``to_json(path)``.
         write_subset_tables_entry: If True (default), materialize the entry-subset tables to the destination database. If False, keep them as lazy expressions instead.
         write_subset_tables_index: If True (default), materialize the index-subset tables to the destination database. If False, keep them as lazy expressions instead.
+        prune_unused_domains: If True (default), only subset the domains that are read by a phenotype, post-entry derived table, custom reporter or subcohort of this cohort, or that these may autojoin through; all other domains are left out of subset_tables_entry and subset_tables_index. The sampled, data period filtered and subset tables are also projected to the columns that are read downstream. Set to False if phenotypes that are not part of the cohort (e.g. the right_censor_phenotypes of a Table2 or TimeToEvent reporter executed separately) are executed against the subset tables.
+        write_prefilter_tables: If True, materialize the sampled and data period filtered tables to the destination database. If False (default), keep them as lazy expressions, so that each domain is sampled, data period filtered and subset to the entry criterion in one pass that writes only its entry subset table.
 
     Attributes:
         table (PhenotypeTable): The resulting index table after filtering (None until execute is called)
@@ -76,6 +81,8 @@ class Cohort:
         write_subset_tables_index: bool = True,
         write_characteristics_table: bool = True,
         write_outcomes_table: bool = True,
+        prune_unused_domains: bool = True,
+        write_prefilter_tables: bool = False,
     ):
         self.name = name
         self.description = description
@@ -109,6 +116,8 @@ class Cohort:
         self.write_subset_tables_index = write_subset_tables_index
         self.write_characteristics_table = write_characteristics_table
         self.write_outcomes_table = write_outcomes_table
+        self.prune_unused_domains = prune_unused_domains
+        self.write_prefilter_tables = write_prefilter_tables
         self.table = None  # Will be set during execution to index table
         self.subset_tables_entry = None  # Will be set during execution
         self.subset_tables_index = None  # Will be set during execution
@@ -144,6 +153,8 @@ class Cohort:
             self.outcomes = self._flatten(outcomes)
 
         self.custom_reporters = custom_reporters or []
+        # subcohorts execute their phenotypes against our subset tables
+        self._subcohorts = []
         self.n_persons_in_source_database = None
 
         self.phenotypes = (
@@ -182,6 +193,8 @@ class Cohort:
         self.waterfall_node = None
         self.waterfall_detailed_node = None
         self.custom_reporter_nodes = []
+        self.index_leaf_matrix_node = None
+        self.reporting_leaf_matrix_node = None
 
         self._apply_table_name_prefix(self.phenotypes)
 
@@ -189,8 +202,10 @@ class Cohort:
             f"Cohort '{self.name}' initialized with entry criterion '{self.entry_criterion.name}'"
         )
 
-    def _build_sampler_stage(self, domains: List[str]) -> Optional["NodeGroup"]:
-        """Create the sampler NodeGroup. Returns None when no sampler is configured."""
+    def _build_sampler_stage(
+        self, domains: List[str], columns: Optional[Dict[str, List[str]]] = None
+    ) -> Optional["NodeGroup"]:
+        """Create the sampler NodeGroup, optionally projecting each domain to the given columns. Returns None when no sampler is configured."""
         if not (self.database and self.database.sampler):
             return None
         _frac = self.database.sampler.fraction
@@ -201,6 +216,7 @@ class Cohort:
                 name=f"{self.name}__sampler_{domain}__{_frac_tag}".upper(),
                 domain=domain,
                 sampler=self.database.sampler,
+                columns=(columns or {}).get(domain),
             )
             for domain in domains
         ]
@@ -334,10 +350,16 @@ class Cohort:
                 f"Phenotypes requiring these domains may fail during execution."
             )
 
+        # project the domains to the columns that are read downstream as early as possible
+        used_columns = None
+        if self.prune_unused_domains:
+            used_columns = self._get_used_columns(available_tables)
+        used_columns = used_columns or {}
+
         #
         # Sampler stage: OPTIONAL
         #
-        self.sampler_stage = self._build_sampler_stage(domains)
+        self.sampler_stage = self._build_sampler_stage(domains, used_columns)
 
         #
         # Data period filter stage: OPTIONAL
@@ -351,6 +373,7 @@ class Cohort:
                     name=f"{self.name}__data_period_filter_{domain}".upper(),
                     domain=domain,
                     date_filter=self.database.data_period,
+                    columns=used_columns.get(domain),
                 )
                 for domain in domains
             ]
@@ -372,10 +395,20 @@ class Cohort:
         # Pre-entry derived table outputs become new domains available from the entry stage onward.
         pre_entry_derived_domains = [x.name for x in (self.derived_tables or [])]
         entry_domains = domains + pre_entry_derived_domains
+        if self.prune_unused_domains:
+            used_domains = self._get_used_domains(available_tables)
+            if used_domains is not None:
+                unused_domains = [d for d in entry_domains if d not in used_domains]
+                if unused_domains:
+                    logger.info(
+                        f"Cohort '{self.name}': not subsetting unused domains {unused_domains}"
+                    )
+                entry_domains = [d for d in entry_domains if d in used_domains]
         self.subset_tables_entry_nodes = self._get_subset_tables_nodes(
             stage="subset_entry",
             domains=entry_domains,
             index_phenotype=self.entry_criterion,
+            columns=used_columns,
         )
         self.entry_stage = NodeGroup(
             name="entry_stage", nodes=self.subset_tables_entry_nodes
@@ -393,6 +426,7 @@ class Cohort:
         #
         # Index stage: REQUIRED
         #
+        self._build_leaf_matrix_nodes()
         index_nodes = []
         if self.inclusions:
             self.inclusions_table_node = InclusionsTableNode(
@@ -524,17 +558,78 @@ class Cohort:
                 name="reporting_stage", nodes=reporting_nodes
             )
 
-    def _get_domains(self):
+    def _build_leaf_matrix_nodes(self):
         """
-        Get a list of all domains used by any phenotype in this cohort.
+        Pivot the leaves shared by the computation graph phenotypes (LogicPhenotype, ScorePhenotype, ArithmeticPhenotype) of the index stage, and separately of the reporting stage, once per stage with a LeafMatrixNode. The computation graph phenotypes then evaluate their expressions against it instead of each joining its own children. Computation graph phenotypes that are executed in more than one stage (or in the entry stage) keep joining their own children.
         """
-        top_level_nodes = (
-            [self.entry_criterion]
-            + self.inclusions
-            + self.exclusions
-            + self.characteristics
-            + self.outcomes
+        entry = self._get_computation_graph_phenotypes([self.entry_criterion])
+        index = self._get_computation_graph_phenotypes(
+            self.inclusions + self.exclusions
+        )
+        reporting = self._get_computation_graph_phenotypes(
+            self.characteristics + self.outcomes
+        )
+        # stages are rebuilt on every execute(); start from a clean slate
+        for pt in entry + index + reporting:
+            pt.use_leaf_matrix(None)
+        self.index_leaf_matrix_node = self._build_leaf_matrix_node(
+            "index", index, other_stages=entry + reporting
+        )
+        self.reporting_leaf_matrix_node = self._build_leaf_matrix_node(
+            "reporting", reporting, other_stages=entry + index
+        )
+
+    @staticmethod
+    def _get_computation_graph_phenotypes(phenotypes):
+        nodes = phenotypes + sum([pt.dependencies for pt in phenotypes], [])
+        unique = {}
+        for node in nodes:
+            if isinstance(node, ComputationGraphPhenotype):
+                unique[node.name] = node
+        return list(unique.values())
+
+    def _build_leaf_matrix_node(self, stage, phenotypes, other_stages):
+        other_names = [pt.name for pt in other_stages]
+        phenotypes = [
+            pt
+            for pt in phenotypes
+            if pt.name not in other_names and pt.can_use_leaf_matrix()
+        ]
+        # a phenotype the leaves themselves depend on (e.g. as anchor_phenotype)
+        # must not wait for the leaf matrix
+        while True:
+            leaves = {leaf.name: leaf for pt in phenotypes for leaf in pt.children}
+            upstream = set(leaves) | {
+                dep.name for leaf in leaves.values() for dep in leaf.dependencies
+            }
+            remaining = [pt for pt in phenotypes if pt.name not in upstream]
+            if len(remaining) == len(phenotypes):
+                break
+            phenotypes = remaining
+        if len(phenotypes) < 2:
+            # nothing to share
+            return None
+
+        leaf_matrix_node = LeafMatrixNode(
+            name=f"{self.name}__{stage}_leaf_matrix".upper(),
+            phenotypes=list(leaves.values()),
         )
+        for pt in phenotypes:
+            pt.use_leaf_matrix(leaf_matrix_node)
+        return leaf_matrix_node
+
+    def _get_domains(self, top_level_nodes: Optional[List[Node]] = None):
+        """
+        Get a list of all domains used by any phenotype in this cohort, or by any of the given top_level_nodes and their dependencies.
+        """
+        if top_level_nodes is None:
+            top_level_nodes = (
+                [self.entry_criterion]
+                + self.inclusions
+                + self.exclusions
+                + self.characteristics
+                + self.outcomes
+            )
         all_nodes = top_level_nodes + sum([t.dependencies for t in top_level_nodes], [])
 
         # FIXME Person domain should not be HARD CODED; however, it IS hardcoded in SCORE phenotype. Remove hardcoding!
@@ -544,17 +639,140 @@ class Cohort:
             if getattr(pt, "domain", None) is not None
         ]
 
-        domains += [
-            getattr(getattr(pt, "categorical_filter", None), "domain", None)
-            for pt in all_nodes
-            if getattr(getattr(pt, "categorical_filter", None), "domain", None)
-            is not None
-        ]
+        for pt in all_nodes:
+            domains += self._get_filter_domains(getattr(pt, "categorical_filter", None))
         domains = list(set(domains))
         return domains
 
+    @staticmethod
+    def _get_filter_domains(filter) -> List[str]:
+        """
+        Get the domains joined by a (possibly composed) categorical filter.
+        """
+        if filter is None:
+            return []
+        domains = [filter.domain] if getattr(filter, "domain", None) else []
+        for attr in ["filter1", "filter2", "filter"]:
+            child = getattr(filter, attr, None)
+            if child is not None and not callable(child):
+                domains += Cohort._get_filter_domains(child)
+        return domains
+
+    def _get_domain_nodes(self) -> List[Node]:
+        """
+        Get the nodes that are executed against the subset tables of this cohort: its phenotypes, its post-entry derived tables, the phenotypes held by its custom reporters, and the same nodes of its subcohorts.
+        """
+        nodes = self.phenotypes + list(self.derived_tables_post_entry or [])
+        for reporter in self.custom_reporters:
+            for value in vars(reporter).values():
+                values = value if isinstance(value, (list, tuple)) else [value]
+                nodes += [v for v in values if isinstance(v, Node)]
+        for subcohort in self._subcohorts:
+            nodes += subcohort._get_domain_nodes()
+        return nodes
+
+    def _reads_undeclared_domains(self, top_level_nodes: List[Node]) -> bool:
+        """
+        Whether any of the given nodes or their dependencies reads tables without declaring a domain (e.g. a UserDefinedPhenotype or MinMaxDatesToTimeRange), so that it may read any domain and any column.
+        """
+        for node in top_level_nodes + sum(
+            [n.dependencies for n in top_level_nodes], []
+        ):
+            if getattr(node, "domain", None) is None and not node.children:
+                logger.debug(
+                    f"Cohort '{self.name}': node '{node.name}' does not declare its domain"
+                )
+                return True
+        return False
+
+    def _get_used_domains(self, tables: Dict[str, PhenexTable]) -> Optional[List[str]]:
+        """
+        Get the domains that must be subset for this cohort: the domains read by the nodes of _get_domain_nodes() and all domains their tables may autojoin through (the tables in their PATHS and their CODES_DEFINED_IN table). Returns None if any of these nodes reads tables without declaring a domain (e.g. a UserDefinedPhenotype), in which case all domains must be subset.
+
+        Parameters:
+            tables: The available source tables, used to resolve autojoins.
+        """
+        top_level_nodes = self._get_domain_nodes()
+        if self._reads_undeclared_domains(top_level_nodes):
+            return None
+
+        used = self._get_domains(top_level_nodes)
+        queue = list(used)
+        while queue:
+            table = tables.get(queue.pop())
+            if table is None:
+                continue
+            targets = set(sum(list(getattr(table, "PATHS", {}).values()), []))
+            if getattr(table, "CODES_DEFINED_IN", None):
+                targets.add(table.CODES_DEFINED_IN)
+            for domain, other in tables.items():
+                if domain in used:
+                    continue
+                if (
+                    other.__class__.__name__ in targets
+                    or getattr(other, "NAME_TABLE", None) in targets
+                ):
+                    used.append(domain)
+                    queue.append(domain)
+        return used
+
+    def _get_used_columns(
+        self, tables: Dict[str, PhenexTable]
+    ) -> Optional[Dict[str, List[str]]]:
+        """
+        Get the columns of each domain that must be carried through the sampler, data period and subset stages: the phenex columns of the table (its KNOWN_FIELDS and column mapping, including the source columns the mapping reads), its join keys, INDEX_DATE, and any column named in the definition (to_dict()) of the nodes of _get_domain_nodes() or of the pre-entry derived tables. Returns None if any of these nodes reads tables without declaring a domain. Domains that need all of their columns are left out of the returned dictionary.
+
+        Parameters:
+            tables: The available source tables.
+        """
+        top_level_nodes = self._get_domain_nodes() + list(self.derived_tables or [])
+        if self._reads_undeclared_domains(top_level_nodes):
+            return None
+
+        referenced = set()
+        for node in top_level_nodes + sum(
+            [n.dependencies for n in top_level_nodes], []
+        ):
+            referenced |= self._get_strings(node.to_dict())
+
+        used_columns = {}
+        for domain, table in tables.items():
+            if not isinstance(table, PhenexTable):
+                continue
+            class_name = table.__class__.__name__
+            keep = referenced | {"PERSON_ID", "INDEX_DATE"} | set(table.KNOWN_FIELDS)
+            for key, value in table.column_mapping.items():
+                keep |= {key} | set(value if isinstance(value, list) else [value])
+            for relationships in ["JOIN_KEYS", "RELATIONSHIPS"]:
+                keep |= set(sum(list(getattr(table, relationships, {}).values()), []))
+            for other in tables.values():
+                keep |= set(getattr(other, "JOIN_KEYS", {}).get(class_name, []))
+            columns = [c for c in table.columns if c in keep]
+            if len(columns) < len(table.columns):
+                used_columns[domain] = columns
+        return used_columns
+
+    @staticmethod
+    def _get_strings(d) -> set:
+        """
+        Get all strings in a nested to_dict() representation.
+        """
+        if isinstance(d, str):
+            return {d}
+        if isinstance(d, dict):
+            return set(k for k in d if isinstance(k, str)).union(
+                *[Cohort._get_strings(v) for v in d.values()]
+            )
+        if isinstance(d, (list, tuple, set)):
+            return set().union(*[Cohort._get_strings(v) for v in d])
+        return set()
+
     def _get_subset_tables_nodes(
-        self, stage: str, domains: List[str], index_phenotype: Phenotype
+        self,
+        stage: str,
+        domains: List[str],
+        index_phenotype: Phenotype,
+        columns: Optional[Dict[str, List[str]]] = None,
     ):
         """
         Get the nodes for subsetting tables for all domains in this cohort subsetting by the given index_phenotype.
@@ -562,16 +780,36 @@ class Cohort:
         stage: A string for naming the nodes.
         domains: List of domains to subset.
         index_phenotype: The phenotype to use for subsetting patients.
+        columns: Optional dictionary of the columns to keep for each domain; domains not in the dictionary keep all columns.
         """
+        # the (PERSON_ID, INDEX_DATE) keys are computed once per stage
+        index_keys = SubsetKeysNode(
+            name=f"{self.name}__{stage}_keys".upper(),
+            index_phenotype=index_phenotype,
+        )
         return [
             SubsetTable(
                 name=f"{self.name}__{stage}_{domain}".upper(),
                 domain=domain,
                 index_phenotype=index_phenotype,
+                index_keys=index_keys,
+                columns=(columns or {}).get(domain),
             )
             for domain in domains
         ]
 
+    @staticmethod
+    def _with_subset_keys_nodes(subset_nodes):
+        """
+        Return the given SubsetTable nodes together with the SubsetKeysNode(s) they share.
+        """
+        keys_nodes = {
+            id(node.index_keys): node.index_keys
+            for node in subset_nodes
+            if node.index_keys is not None
+        }
+        return subset_nodes + list(keys_nodes.values())
+
     @property
     def inclusions_table(self):
         if self.inclusions_table_node:
@@ -680,16 +918,22 @@ class Cohort:
         self.build_stages(tables)
         logger.info(f"Cohort '{self.name}': stages built. Executing sampler stage...")
 
+        # Unless they are written, the sampled and data period filtered tables stay lazy
+        # expressions; each domain is then sampled, filtered and subset to the entry
+        # criterion in the single query that writes its entry subset table.
+        prefilter_con = con if self.write_prefilter_tables else None
+        prefilter_lazy_execution = lazy_execution and self.write_prefilter_tables
+
         if self.sampler_stage:
             logger.info(
                 f"Cohort '{self.name}': executing sampler stage. Sampling {self.n_persons_in_source_database} persons..."
             )
             self.sampler_stage.execute(
                 tables=tables,
-                con=con,
+                con=prefilter_con,
                 overwrite=overwrite,
                 n_threads=n_threads,
-                lazy_execution=lazy_execution,
+                lazy_execution=prefilter_lazy_execution,
                 table_name_prefix=self._table_prefix,
             )
             # If the tables were already cached, we reuse them and skip sample(),
@@ -727,10 +971,10 @@ class Cohort:
             logger.info(f"Cohort '{self.name}': executing data period filter stage ...")
             self.data_period_filter_stage.execute(
                 tables=tables,
-                con=con,
+                con=prefilter_con,
                 overwrite=overwrite,
                 n_threads=n_threads,
-                lazy_execution=lazy_execution,
+                lazy_execution=prefilter_lazy_execution,
                 table_name_prefix=self._table_prefix,
             )
             # Update tables with filtered versions (only when the node actually modified the table;
@@ -793,7 +1037,7 @@ class Cohort:
             # Remove entry_criterion from subset table children so it won't be
             # re-executed; its .table is already set and SubsetTable._execute
             # accesses it via self.index_phenotype.table.
-            for node in self.subset_tables_entry_nodes:
+            for node in self._with_subset_keys_nodes(self.subset_tables_entry_nodes):
                 node._children = [
                     c for c in node._children if c is not self.entry_criterion
                 ]
@@ -805,7 +1049,7 @@ class Cohort:
                 table_name_prefix=self.name,
             )
             # Restore children for correct dependency graphs in later stages
-            for node in self.subset_tables_entry_nodes:
+            for node in self._with_subset_keys_nodes(self.subset_tables_entry_nodes):
                 node._children.insert(0, self.entry_criterion)
 
         self.subset_tables_entry = tables = self.get_subset_tables_entry(tables)
@@ -854,7 +1098,7 @@ class Cohort:
             # already computed, so detach it from the subset nodes' children to
             # avoid re-executing it; SubsetTable accesses it via
             # self.index_phenotype.table.
-            for node in self.subset_tables_index_nodes:
+            for node in self._with_subset_keys_nodes(self.subset_tables_index_nodes):
                 node._children = [
                     c for c in node._children if c is not self.index_table_node
                 ]
@@ -866,7 +1110,7 @@ class Cohort:
                 table_name_prefix=self.name,
             )
             # Restore children for correct dependency graphs in later stages
-            for node in self.subset_tables_index_nodes:
+            for node in self._with_subset_keys_nodes(self.subset_tables_index_nodes):
                 node._children.insert(0, self.index_table_node)
 
         logger.info(f"Cohort '{self.name}': completed index stage.")
@@ -1080,7 +1324,7 @@ class Cohort:
         if not self.subset_tables_entry_nodes:
             self._get_tables_and_build_stages(con)
 
-        for node in self.subset_tables_entry_nodes:
+        for node in self._with_subset_keys_nodes(self.subset_tables_entry_nodes):
             node.delete_table(con)
 
     def delete_subset_tables_index(self, con):
@@ -1088,7 +1332,7 @@ class Cohort:
         if not self.subset_tables_index_nodes:
             self._get_tables_and_build_stages(con)
 
-        for node in self.subset_tables_index_nodes:
+        for node in self._with_subset_keys_nodes(self.subset_tables_index_nodes):
             node.delete_table(con)
 
     def delete_characteristics(self, con):
@@ -1,4 +1,4 @@
-from typing import Dict
+from typing import Dict, List, Optional
 import ibis
 from ibis.expr.types.relations import Table
 from phenex.node import Node
@@ -36,6 +36,7 @@ class DataPeriodFilterNode(Node):
         name: Unique identifier for this node in the computation graph.
         domain: The name of the table domain to filter (e.g., 'CONDITION_OCCURRENCE', 'DRUG_EXPOSURE').
         date_filter: The date filter containing min_date and max_date constraints.
+        columns: Optional list of the columns of the table to keep. The table is projected to these columns before it is filtered; by default all columns are kept.
 
     Attributes:
         domain: The table domain being filtered.
@@ -126,10 +127,17 @@ class DataPeriodFilterNode(Node):
         ```
     """
 
-    def __init__(self, name: str, domain: str, date_filter: DateFilter):
+    def __init__(
+        self,
+        name: str,
+        domain: str,
+        date_filter: DateFilter,
+        columns: Optional[List[str]] = None,
+    ):
         super(DataPeriodFilterNode, self).__init__(name=name)
         self.domain = domain
         self.date_filter = date_filter
+        self.columns = columns
 
         # Validate that column_name is EVENT_DATE if specified
         if (
@@ -142,8 +150,11 @@ class DataPeriodFilterNode(Node):
 
     def _execute(self, tables: Dict[str, Table]) -> Table:
         table = tables[self.domain]
-        columns = table.columns
         modified = False
+        if self.columns is not None:
+            table = table.select([c for c in table.columns if c in self.columns])
+            modified = True
+        columns = table.columns
         logger.debug(
             f"[{self.domain}] DataPeriodFilter: applying date range "
             f"{self.date_filter.min_value} to {self.date_filter.max_value} "
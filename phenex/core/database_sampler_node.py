@@ -1,4 +1,4 @@
-from typing import Dict, Optional, TYPE_CHECKING
+from typing import Dict, List, Optional, TYPE_CHECKING
 from phenex.node import Node
 from phenex.util.database_sampler import DatabaseSampler
 from phenex.util import create_logger
@@ -24,12 +24,20 @@ class DatabaseSamplerNode(Node):
         name: Unique node identifier (e.g. 'COHORTNAME__SAMPLER_PERSON').
         domain: Domain table to filter (e.g. 'PERSON', 'CONDITION_OCCURRENCE').
         sampler: DatabaseSampler defining fraction and seed.
+        columns: Optional list of the columns of the domain table to keep in the sampled table; by default all columns are kept.
     """
 
-    def __init__(self, name: str, domain: str, sampler: DatabaseSampler):
+    def __init__(
+        self,
+        name: str,
+        domain: str,
+        sampler: DatabaseSampler,
+        columns: Optional[List[str]] = None,
+    ):
         super().__init__(name=name)
         self.domain = domain
         self.sampler = sampler
+        self.columns = columns
 
     def to_dict(self) -> dict:
         """Return node identity including fraction and seed so hash changes when sampler config changes."""
@@ -39,6 +47,7 @@ class DatabaseSamplerNode(Node):
             "domain": self.domain,
             "fraction": self.sampler.fraction,
             "seed": self.sampler.seed,
+            "columns": self.columns,
         }
 
     @property
@@ -67,4 +76,6 @@ class DatabaseSamplerNode(Node):
             {"PERSON": person_table, self.domain: domain_table}
         )
         sampled = result.get(self.domain)
+        if sampled is not None and self.columns is not None:
+            sampled = sampled.select([c for c in sampled.columns if c in self.columns])
         return sampled
@@ -3,21 +3,35 @@ import ibis
 from ibis.expr.types.relations import Table
 from phenex.node import Node
 from phenex.phenotypes.phenotype import Phenotype
+from phenex.phenotypes.functions import hstack_boolean
 
 
 class ExclusionsTableNode(Node):
     """
-    Compute the inclusions / exclusions table from the individual inclusions / exclusions phenotypes.
+    Compute the inclusions / exclusions table from the individual inclusions / exclusions phenotypes. The BOOLEAN columns of all phenotypes are pivoted onto the entry criterion in a single UNION ALL + GROUP BY (see hstack_boolean) rather than one join per phenotype.
+
+    Parameters:
+        name: The name of the node.
+        index_phenotype: The entry criterion.
+        phenotypes: The inclusions / exclusions phenotypes.
+        bitmask: If True, add an integer BITMASK column in which bit i is set if the i-th phenotype is fulfilled. Supports at most 62 phenotypes.
     """
 
     def __init__(
-        self, name: str, index_phenotype: Phenotype, phenotypes: List[Phenotype]
+        self,
+        name: str,
+        index_phenotype: Phenotype,
+        phenotypes: List[Phenotype],
+        bitmask: bool = False,
     ):
         super(ExclusionsTableNode, self).__init__(name=name)
+        if bitmask and len(phenotypes) > 62:
+            raise ValueError("bitmask supports at most 62 phenotypes!")
         self.add_children(phenotypes)
         self.add_children(index_phenotype)
         self.phenotypes = phenotypes
         self.index_phenotype = index_phenotype
+        self.bitmask = bitmask
 
     def _execute(self, tables: Dict[str, Table]):
         # Build base from entry criterion; add INDEX_DATE if ALL phenotype tables have it
@@ -25,6 +39,7 @@ class ExclusionsTableNode(Node):
             "INDEX_DATE" in pt.table.columns for pt in self.phenotypes
         ):
             join_keys = ["PERSON_ID", "INDEX_DATE"]
+            # Derive (PERSON_ID, INDEX_DATE) pairs from entry criterion
             exclusions_table = self.index_phenotype.table.mutate(
                 INDEX_DATE=self.index_phenotype.table.EVENT_DATE
             ).select(["PERSON_ID", "INDEX_DATE"])
@@ -32,30 +47,26 @@ class ExclusionsTableNode(Node):
             join_keys = ["PERSON_ID"]
             exclusions_table = self.index_phenotype.table.select(["PERSON_ID"])
 
-        for pt in self.phenotypes:
-            pt_table = pt.table.select([*join_keys, "BOOLEAN"]).rename(
-                **{
-                    f"{pt.name}_BOOLEAN": "BOOLEAN",
-                }
-            )
-            exclusions_table = exclusions_table.left_join(pt_table, join_keys)
-            drop_cols = [f"{k}_right" for k in join_keys]
-            columns = [c for c in exclusions_table.columns if c not in drop_cols]
-            exclusions_table = exclusions_table.select(columns)
+        exclusions_table = hstack_boolean(
+            self.phenotypes, join_table=exclusions_table, join_keys=join_keys
+        )
 
         # fill all nones with False
-        boolean_columns = [col for col in exclusions_table.columns if "BOOLEAN" in col]
-        for col in boolean_columns:
-            exclusions_table = exclusions_table.mutate(
-                {col: exclusions_table[col].fill_null(False)}
-            )
+        boolean_columns = [f"{x.name}_BOOLEAN" for x in self.phenotypes]
+        exclusions_table = exclusions_table.mutate(
+            **{col: exclusions_table[col].fill_null(False) for col in boolean_columns}
+        )
 
-        # create the boolean inclusions column
-        # this is true only if all inclusions criteria are true
         exclusions_table = exclusions_table.mutate(
-            BOOLEAN=ibis.greatest(
-                *[exclusions_table[f"{x.name}_BOOLEAN"] for x in self.phenotypes]
-            )
+            BOOLEAN=ibis.greatest(*[exclusions_table[col] for col in boolean_columns])
         )
 
+        if self.bitmask:
+            exclusions_table = exclusions_table.mutate(
+                BITMASK=sum(
+                    exclusions_table[col].ifelse(1 << i, 0).cast("int64")
+                    for i, col in enumerate(boolean_columns)
+                )
+            )
+
         return exclusions_table
@@ -3,21 +3,35 @@ import ibis
 from ibis.expr.types.relations import Table
 from phenex.node import Node
 from phenex.phenotypes.phenotype import Phenotype
+from phenex.phenotypes.functions import hstack_boolean
 
 
 class InclusionsTableNode(Node):
     """
-    Compute the inclusions / exclusions table from the individual inclusions / exclusions phenotypes.
+    Compute the inclusions / exclusions table from the individual inclusions / exclusions phenotypes. The BOOLEAN columns of all phenotypes are pivoted onto the entry criterion in a single UNION ALL + GROUP BY (see hstack_boolean) rather than one join per phenotype.
+
+    Parameters:
+        name: The name of the node.
+        index_phenotype: The entry criterion.
+        phenotypes: The inclusions / exclusions phenotypes.
+        bitmask: If True, add an integer BITMASK column in which bit i is set if the i-th phenotype is fulfilled. Supports at most 62 phenotypes.
     """
 
     def __init__(
-        self, name: str, index_phenotype: Phenotype, phenotypes: List[Phenotype]
+        self,
+        name: str,
+        index_phenotype: Phenotype,
+        phenotypes: List[Phenotype],
+        bitmask: bool = False,
     ):
         super(InclusionsTableNode, self).__init__(name=name)
+        if bitmask and len(phenotypes) > 62:
+            raise ValueError("bitmask supports at most 62 phenotypes!")
         self.add_children(phenotypes)
         self.add_children(index_phenotype)
         self.phenotypes = phenotypes
         self.index_phenotype = index_phenotype
+        self.bitmask = bitmask
 
     def _execute(self, tables: Dict[str, Table]):
         # Build base from entry criterion; add INDEX_DATE if ALL phenotype tables have it
@@ -33,28 +47,26 @@ class InclusionsTableNode(Node):
             join_keys = ["PERSON_ID"]
             inclusions_table = self.index_phenotype.table.select(["PERSON_ID"])
 
-        for pt in self.phenotypes:
-            pt_table = pt.table.select([*join_keys, "BOOLEAN"]).rename(
-                **{
-                    f"{pt.name}_BOOLEAN": "BOOLEAN",
-                }
-            )
-            inclusions_table = inclusions_table.left_join(pt_table, join_keys)
-            drop_cols = [f"{k}_right" for k in join_keys]
-            columns = [c for c in inclusions_table.columns if c not in drop_cols]
-            inclusions_table = inclusions_table.select(columns)
+        inclusions_table = hstack_boolean(
+            self.phenotypes, join_table=inclusions_table, join_keys=join_keys
+        )
 
         # fill all nones with False
-        boolean_columns = [col for col in inclusions_table.columns if "BOOLEAN" in col]
-        for col in boolean_columns:
-            inclusions_table = inclusions_table.mutate(
-                {col: inclusions_table[col].fill_null(False)}
-            )
+        boolean_columns = [f"{x.name}_BOOLEAN" for x in self.phenotypes]
+        inclusions_table = inclusions_table.mutate(
+            **{col: inclusions_table[col].fill_null(False) for col in boolean_columns}
+        )
 
         inclusions_table = inclusions_table.mutate(
-            BOOLEAN=ibis.least(
-                *[inclusions_table[f"{x.name}_BOOLEAN"] for x in self.phenotypes]
-            )
+            BOOLEAN=ibis.least(*[inclusions_table[col] for col in boolean_columns])
         )
 
+        if self.bitmask:
+            inclusions_table = inclusions_table.mutate(
+                BITMASK=sum(
+                    inclusions_table[col].ifelse(1 << i, 0).cast("int64")
+                    for i, col in enumerate(boolean_columns)
+                )
+            )
+
         return inclusions_table
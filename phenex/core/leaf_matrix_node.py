@@ -0,0 +1,30 @@
+from typing import List, Dict
+from ibis.expr.types.relations import Table
+from phenex.node import Node
+from phenex.phenotypes.phenotype import Phenotype
+from phenex.phenotypes.functions import hstack_pivot, _get_join_keys
+
+
+class LeafMatrixNode(Node):
+    """
+    A compute node that pivots the leaf phenotypes of several ComputationGraphPhenotypes (LogicPhenotype, ScorePhenotype, ArithmeticPhenotype) of a stage into a single wide table keyed on the PERSON table, so that the leaves are joined once per stage rather than once per computation graph phenotype. Computation graph phenotypes read their leaf columns from this table after ComputationGraphPhenotype.use_leaf_matrix() has been called.
+
+    Only phenotypes with at most one row per (PERSON_ID, INDEX_DATE) (see Phenotype.has_one_row_per_index) may be pivoted without changing the result.
+    """
+
+    def __init__(self, name: str, phenotypes: List[Phenotype]):
+        super(LeafMatrixNode, self).__init__(name=name)
+        self.add_children(phenotypes)
+        self.phenotypes = phenotypes
+
+    def _execute(self, tables: Dict[str, Table]) -> Table:
+        """
+        Pivot the leaf phenotypes onto the PERSON table with hstack_pivot. Returns None (and the computation graph phenotypes fall back to joining their own children) if there is no PERSON table carrying the join keys of the leaves.
+        """
+        person_table = tables.get("PERSON")
+        if person_table is None:
+            return None
+        join_keys = _get_join_keys(self.phenotypes[0].table)
+        if not all(k in person_table.columns for k in join_keys):
+            return None
+        return hstack_pivot(self.phenotypes, join_table=person_table)
@@ -21,11 +21,31 @@ class Reporter(Node):
         super(Reporter, self).__init__(name=name)
         self.cohort = cohort
 
-    # def to_dict(self):
-    #     """Exclude cohort from serialization to avoid hashing the entire Cohort object."""
-    #     d = super().to_dict()
-    #     # d.pop("cohort", None)
-    #     return d
+    def to_dict(self):
+        """
+        Serialize the reporter configuration and the hashes of the nodes the report reads instead of the entire cohort, so that lazy execution reruns the report only if one of them changed.
+        """
+        d = super().to_dict()
+        d.pop("cohort", None)
+        d.pop("index_table_node", None)
+        d["inputs"] = {node.name: hash(node) for node in self._input_nodes()}
+        return d
+
+    def _input_nodes(self):
+        """The nodes whose results the report reads: the children and the index table."""
+        nodes = list(self.children)
+        index_table_node = getattr(self.cohort, "index_table_node", None)
+        if index_table_node is not None:
+            nodes.append(index_table_node)
+        return nodes
+
+    def _get_outputs(self):
+        if not hasattr(self.reporter, "get_results"):
+            return None
+        return self.reporter.get_results()
+
+    def _set_outputs(self, outputs):
+        self.reporter.set_results(self.cohort, outputs)
 
     def _execute(self, tables: Dict[str, Table]):
         """
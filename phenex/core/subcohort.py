@@ -219,6 +219,8 @@ class Subcohort(Cohort):
             custom_reporters=custom_reporters,
         )
         self.cohort = cohort
+        # the parent cohort must subset the domains of our phenotypes
+        cohort._subcohorts.append(self)
 
         # super().__init__() overwrites _table_name_prefix on shared phenotype objects;
         # restore the parent cohort's prefix on its phenotypes.
@@ -393,41 +395,20 @@ class Subcohort(Cohort):
 
         # Append additional criteria
         index = len([r for r in parent_rows if r["Type"] != "component"])
-        for inclusion in self.additional_inclusions:
-            index += 1
-            running_table = waterfall.append_phenotype_to_waterfall(
-                running_table,
-                inclusion,
-                "inclusion",
-                level=0,
-                index=index,
-            )
-            if include_component_phenotypes_level is not None:
-                waterfall._append_components_recursively(
-                    inclusion, running_table, parent_index=str(index)
-                )
-
-        for exclusion in self.additional_exclusions:
-            index += 1
-            running_table = waterfall.append_phenotype_to_waterfall(
-                running_table,
-                exclusion,
-                "exclusion",
-                level=0,
-                index=index,
-            )
-            if include_component_phenotypes_level is not None:
-                waterfall._append_components_recursively(
-                    exclusion, running_table, parent_index=str(index)
-                )
+        rows = waterfall._criteria_rows(
+            self.additional_inclusions, self.additional_exclusions, index=index
+        )
+        remaining = waterfall._count_remaining(
+            running_table, self.additional_inclusions, self.additional_exclusions
+        )
+        waterfall._append_rows(rows, remaining)
 
         # Now build the dataframe the same way Waterfall.execute does
         waterfall.ds = waterfall.append_delta(waterfall.ds)
         waterfall.df = pd.DataFrame(waterfall.ds)
 
         final_filtered = self.index_table.filter(self.index_table.BOOLEAN == True)
-        N = final_filtered.select("PERSON_ID").distinct().count().execute()
-        N_events = waterfall._count_events(final_filtered)
+        N, N_events = waterfall._count_persons_and_events(final_filtered)
 
         waterfall.df["Pct_Remaining"] = waterfall.df["Remaining"] / N_entry * 100
         waterfall.df["Pct_N"] = waterfall.df["N"] / N_entry * 100
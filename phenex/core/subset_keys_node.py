@@ -0,0 +1,36 @@
+from typing import Dict
+from ibis.expr.types.relations import Table
+from phenex.node import Node
+from phenex.phenotypes.phenotype import Phenotype
+
+
+def get_subset_keys(index_table: Table) -> Table:
+    """
+    Reduce an index phenotype table to its distinct (PERSON_ID, INDEX_DATE) keys, sorted by the keys. The EVENT_DATE of the index phenotype is used as INDEX_DATE if there is no INDEX_DATE column; if there is neither, only PERSON_ID is returned.
+    """
+    if "INDEX_DATE" in index_table.columns:
+        keys = ["PERSON_ID", "INDEX_DATE"]
+    elif "EVENT_DATE" in index_table.columns:
+        index_table = index_table.rename({"INDEX_DATE": "EVENT_DATE"})
+        keys = ["PERSON_ID", "INDEX_DATE"]
+    else:
+        keys = ["PERSON_ID"]
+    return index_table.select(keys).distinct().order_by(keys)
+
+
+class SubsetKeysNode(Node):
+    """
+    A compute node that materializes the compact, sorted (PERSON_ID, INDEX_DATE) key table of an index phenotype once, so that all SubsetTable nodes of a stage subset their domains against it with key-only joins instead of each joining the full index phenotype table and deduplicating the result.
+
+    Parameters:
+        name: Name identifier for this node.
+        index_phenotype: The phenotype whose keys are used for subsetting.
+    """
+
+    def __init__(self, name: str, index_phenotype: Phenotype):
+        super(SubsetKeysNode, self).__init__(name=name)
+        self.add_children(index_phenotype)
+        self.index_phenotype = index_phenotype
+
+    def _execute(self, tables: Dict[str, Table]) -> Table:
+        return get_subset_keys(self.index_phenotype.table)
@@ -1,7 +1,9 @@
-from typing import Dict
+from typing import Dict, List, Optional
 from ibis.expr.types.relations import Table
 from phenex.node import Node
 from phenex.phenotypes.phenotype import Phenotype
+from phenex.core.subset_keys_node import SubsetKeysNode, get_subset_keys
+from phenex.tables import PhenexTable
 from phenex.util import create_logger
 
 logger = create_logger(__name__)
@@ -13,10 +15,14 @@ class SubsetTable(Node):
 
     This node takes a table from a specific domain and filters it to include only records for patients who have entries in the index phenotype table. The resulting table contains all original columns from the domain table plus an INDEX_DATE column from the index phenotype.
 
+    The domain table is only ever joined with the distinct (PERSON_ID, INDEX_DATE) keys of the index phenotype: a semi-join if the domain table already carries INDEX_DATE (or the index phenotype has none), and otherwise an inner join on PERSON_ID that repeats each record once per index date of the patient.
+
     Parameters:
         name: Name identifier for this subset table node.
         domain: The domain name (e.g., 'PERSON', 'CONDITION_OCCURRENCE') of the table to subset.
         index_phenotype: The phenotype used to filter the domain table. Only patients present in this phenotype's table will be included in the subset.
+        index_keys: Optional SubsetKeysNode of the index phenotype, shared by the SubsetTable nodes of a stage. If not given, the keys are computed from the index phenotype table.
+        columns: Optional list of the columns of the domain table to keep. The domain table is projected to these columns before it is joined; by default all columns are kept.
 
     Attributes:
         index_phenotype: The phenotype used for subsetting.
@@ -33,11 +39,22 @@ class SubsetTable(Node):
         ```
     """
 
-    def __init__(self, name: str, domain: str, index_phenotype: Phenotype):
+    def __init__(
+        self,
+        name: str,
+        domain: str,
+        index_phenotype: Phenotype,
+        index_keys: Optional[SubsetKeysNode] = None,
+        columns: Optional[List[str]] = None,
+    ):
         super(SubsetTable, self).__init__(name=name)
         self.add_children(index_phenotype)
+        if index_keys is not None:
+            self.add_children(index_keys)
         self.index_phenotype = index_phenotype
+        self.index_keys = index_keys
         self.domain = domain
+        self.columns = columns
 
     def _execute(self, tables: Dict[str, Table]):
         table = tables.get(self.domain)
@@ -49,18 +66,10 @@ class SubsetTable(Node):
             )
             return None
 
-        index_table = self.index_phenotype.table
-
-        if "INDEX_DATE" in index_table.columns:
-            columns = list(set(["INDEX_DATE"] + table.columns))
-        elif "EVENT_DATE" in index_table.columns:
-            index_table = index_table.rename({"INDEX_DATE": "EVENT_DATE"})
-            columns = list(set(["INDEX_DATE"] + table.columns))
-        else:
-            logger.warning(
-                f"INDEX_DATE column not found in index_phenotype table for SubsetTable '{self.name}'. INDEX_DATE will not be set."
-            )
-            columns = table.columns
+        if isinstance(table, PhenexTable):
+            table = table.table
+        if self.columns is not None:
+            table = table.select([c for c in table.columns if c in self.columns])
 
         # concept tables and mapping tables do not usually have person ids and cannot be subset using this method. We will return the full table and log a warning in this case.
         # TODO: In the future, we may want to allow users to specify a different column to join on for subsetting (ie map tables can be subset to event ids that exist in other event tables), but for now we will just return the full table if PERSON_ID is not present.
@@ -68,17 +77,22 @@ class SubsetTable(Node):
             logger.info(
                 f"PERSON_ID column not found in domain table for SubsetTable '{self.name}'. Cannot perform subsetting without PERSON_ID."
             )
-            return table.table
+            return table
+
+        if self.index_keys is not None:
+            index_keys = self.index_keys.table
+        else:
+            index_keys = get_subset_keys(self.index_phenotype.table)
+
+        if "INDEX_DATE" not in index_keys.columns:
+            logger.warning(
+                f"INDEX_DATE column not found in index_phenotype table for SubsetTable '{self.name}'. INDEX_DATE will not be set."
+            )
+            return table.semi_join(index_keys, "PERSON_ID")
 
         # In multi index settings the index_table determines which index dates to use!
         # the subset tables entry will contain all possible index dates;
         # subset tables index should contain only index dates/person ids in the index_table (which may select first or last)
-        join_keys = (
-            ["PERSON_ID", "INDEX_DATE"]
-            if "INDEX_DATE" in table.columns
-            else ["PERSON_ID"]
-        )
-        subset_table = table.inner_join(index_table, join_keys)
-        subset_table = subset_table.select(columns).distinct()
-
-        return subset_table
+        if "INDEX_DATE" in table.columns:
+            return table.semi_join(index_keys, ["PERSON_ID", "INDEX_DATE"])
+        return table.inner_join(index_keys, "PERSON_ID")
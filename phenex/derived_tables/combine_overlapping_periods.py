@@ -34,101 +34,50 @@ class CombineOverlappingPeriods(Node):
             # apply the categorical filter to the table
             table = self.categorical_filter.autojoin_filter(table, tables)
 
-        # subset to only the relevant columns and sort
-        table = table.select("PERSON_ID", "START_DATE", "END_DATE")
+        return combine_overlapping_periods(table)
 
-        # Step 1: Sort by PERSON_ID, START_DATE, END_DATE
-        table = table.order_by(["PERSON_ID", "START_DATE", "END_DATE"])
 
-        # Step 1.5: Remove intervals that are wholly contained within other intervals
-        # For each interval, check if there's another interval that completely contains it
+def combine_overlapping_periods(table: Table) -> Table:
+    """
+    Combine overlapping and consecutive periods per PERSON_ID as a gaps-and-islands pass. With the periods of a person ordered by START_DATE, a period starts a new island if it begins more than one day after the latest END_DATE of all periods before it; periods wholly contained in an earlier one never start an island. The islands are numbered with a running sum and each is reduced to its earliest START_DATE and latest END_DATE.
 
-        # Self-join to find containing intervals
-        table_alias = table.view()  # Create an alias for self-join
+    Parameters:
+        table: Table with columns PERSON_ID, START_DATE and END_DATE.
 
-        # Find intervals that are wholly contained within another interval
-        contained_intervals = (
-            table.inner_join(
-                table_alias,
-                [
-                    table.PERSON_ID == table_alias.PERSON_ID,
-                    table.START_DATE >= table_alias.START_DATE,
-                    table.END_DATE <= table_alias.END_DATE,
-                    # Not the same interval (at least one bound is strictly contained)
-                    (table.START_DATE > table_alias.START_DATE)
-                    | (table.END_DATE < table_alias.END_DATE),
-                ],
-            )
-            .select(table.PERSON_ID, table.START_DATE, table.END_DATE)
-            .distinct()
+    Returns:
+        Table with columns PERSON_ID, START_DATE and END_DATE, one row per combined period.
+    """
+    # identical periods would tie in the window ordering and could be numbered
+    # inconsistently by the two windows below
+    table = table.select("PERSON_ID", "START_DATE", "END_DATE").distinct()
+    previous_end = table.END_DATE.max().over(
+        ibis.window(
+            group_by=table.PERSON_ID,
+            order_by=[table.START_DATE, table.END_DATE],
+            rows=(None, -1),
         )
-
-        # Remove wholly contained intervals
-        table = table.anti_join(
-            contained_intervals, ["PERSON_ID", "START_DATE", "END_DATE"]
+    )
+    table = table.mutate(
+        NEW_PERIOD=ibis.ifelse(
+            previous_end.isnull()
+            | (table.START_DATE > previous_end + ibis.interval(days=1)),
+            1,
+            0,
         )
-
-        # Re-sort after filtering
-        table = table.order_by(["PERSON_ID", "START_DATE", "END_DATE"])
-
-        # Step 2: Create lag window to get previous end date for each person
-        prev_end = table.END_DATE.lag(1).over(
+    )
+    table = table.mutate(
+        PERIOD_NUMBER=table.NEW_PERIOD.sum().over(
             ibis.window(
-                group_by=table.PERSON_ID, order_by=[table.START_DATE, table.END_DATE]
-            )
-        )
-
-        # Step 3: Determine if current period starts a new group
-        # New group starts if there's no previous period or if there's a gap > 1 day
-        # This matches the original pandas logic: start > merged[-1][1] + pd.Timedelta(days=1)
-        table = table.mutate(
-            prev_end_date=prev_end,
-            new_group=ibis.case()
-            .when(prev_end.isnull(), 1)  # First record for person
-            .when(
-                table.START_DATE > (prev_end + ibis.interval(days=1)), 1
-            )  # Gap > 1 day
-            .else_(0)  # Overlapping, consecutive, or same day periods
-            .end(),
-        )
-
-        # Step 4: Create group IDs using cumulative sum within each person
-        # Create a row number first, then use it to calculate running sum properly
-        table = table.mutate(
-            row_num=ibis.row_number().over(
-                ibis.window(
-                    group_by=table.PERSON_ID,
-                    order_by=[table.START_DATE, table.END_DATE],
-                )
+                group_by=table.PERSON_ID,
+                order_by=[table.START_DATE, table.END_DATE],
+                rows=(None, 0),
             )
         )
-
-        # Now calculate cumulative sum of new_group within each person
-        table = table.mutate(
-            group_num=table.new_group.sum().over(
-                ibis.window(
-                    group_by=table.PERSON_ID,
-                    order_by=table.row_num,
-                    rows=(None, 0),  # Unbounded preceding to current row
-                )
-            )
-        )
-
-        # Create a composite group ID to ensure uniqueness across persons
-        table = table.mutate(
-            group_id=table.PERSON_ID.cast("string")
-            + "_"
-            + table.group_num.cast("string")
-        )
-
-        # Step 5: Aggregate by person and group to get merged periods
-        result = table.group_by(["PERSON_ID", "group_id"]).aggregate(
-            START_DATE=table.START_DATE.min(), END_DATE=table.END_DATE.max()
-        )
-
-        # Step 6: Select final columns and sort
-        result = result.select("PERSON_ID", "START_DATE", "END_DATE").order_by(
-            ["PERSON_ID", "START_DATE"]
-        )
-
-        return result
+    )
+
+    result = table.group_by(["PERSON_ID", "PERIOD_NUMBER"]).aggregate(
+        START_DATE=table.START_DATE.min(), END_DATE=table.END_DATE.max()
+    )
+    return result.select("PERSON_ID", "START_DATE", "END_DATE").order_by(
+        ["PERSON_ID", "START_DATE"]
+    )
@@ -7,7 +7,7 @@ from phenex.node import Node
 from phenex.util import create_logger
 from phenex.codelists import Codelist
 
-from .combine_overlapping_periods import CombineOverlappingPeriods
+from .combine_overlapping_periods import combine_overlapping_periods
 
 logger = create_logger(__name__)
 
@@ -190,6 +190,4 @@ class EventsToTimeRange(Node):
             START_DATE : the codelist EVENT_DATE
             END_DATE : START_DATE + max_days
         """
-        cop = CombineOverlappingPeriods(domain="_")
-        table = cop.execute(tables={"_": table})
-        return table
+        return combine_overlapping_periods(table)
@@ -150,18 +150,13 @@ class CodelistFilter(Filter):
                     "Pass the domains dictionary via the 'tables' parameter."
                 )
 
-            # Find the target table and perform autojoin
+            # The joined tables only contribute CODE/CODE_TYPE to the filter, so
+            # filter the (small) code table by the codelist first and then
+            # semi-join the event table back along the autojoin path. This avoids
+            # the full join and keeps the original column structure of the table.
             target_table = self._find_target_table(codes_domain, tables)
-            original_columns = table.columns
-            table = table.join(target_table, domains=tables)
-
-            # Apply the codelist filter
-            filtered_table = self._filter(table)
-
-            # Restore original column structure (plus any columns needed from join)
-            # This ensures we don't pollute the output with unnecessary joined columns
-            columns_to_keep = list(set(original_columns) & set(filtered_table.columns))
-            return type(table)(filtered_table.select(columns_to_keep))
+            filtered_target_table = self._filter(target_table)
+            return table.semi_join(filtered_target_table, domains=tables)
 
         # If CODE/CODE_TYPE already exist, just apply the filter directly
         return self._filter(table)
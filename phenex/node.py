@@ -68,6 +68,7 @@ class Node:
     def __init__(self, name: Optional[str] = None):
         self._name = name or type(self).__name__
         self._children = []
+        self._execution_dependencies = []
         self.table = None  # populated upon call to execute()
         self._table_name_prefix = None
         self.lastexecution_start_time = None
@@ -81,6 +82,34 @@ class Node:
             if self._check_child_can_be_added(child):
                 self._children.append(child)
 
+    def add_execution_dependencies(self, nodes):
+        """
+        Register Nodes that must be executed before this Node without making them children. Execution dependencies are scheduled like children but are not part of the Node's definition: they are not returned by `children` (and hence not walked by reporters or serialized) and are typically attached by the object orchestrating execution, e.g. a Cohort sharing one intermediate table between several Nodes of a stage.
+        """
+        if not isinstance(nodes, list):
+            nodes = [nodes]
+        for node in nodes:
+            if not isinstance(node, Node):
+                raise ValueError("Execution dependencies must be of type Node!")
+            if self in node.dependencies:
+                raise ValueError(
+                    f"Circular dependency detected: '{self.name}' is already a dependency of '{node.name}'."
+                )
+            if not any(n is node for n in self.execution_dependencies):
+                self._execution_dependencies.append(node)
+
+    def remove_execution_dependencies(self, nodes):
+        if not isinstance(nodes, list):
+            nodes = [nodes]
+        self._execution_dependencies = [
+            n for n in self.execution_dependencies if not any(n is m for m in nodes)
+        ]
+
+    @property
+    def execution_dependencies(self):
+        # getattr for Node subclasses restored without calling __init__
+        return getattr(self, "_execution_dependencies", [])[:]
+
     def __rshift__(self, right):
         self.add_children(right)
         return right
@@ -147,10 +176,10 @@ class Node:
             Dict[Node, Set[Node]: A mapping of Node's to their children Node's.
         """
         graph = defaultdict(set)
-        graph[self] = self.children
+        graph[self] = self.children + self.execution_dependencies
 
         for node in self.dependencies:
-            graph[node] = node.children
+            graph[node] = node.children + node.execution_dependencies
         return dict(graph)
 
     @property
@@ -178,8 +207,8 @@ class Node:
             return all_deps
         visited.add(self.name)
 
-        # Add direct children (dependencies)
-        for child in self.children:
+        # Add direct children and execution dependencies
+        for child in self.children + self.execution_dependencies:
             if child.name not in all_deps:
                 all_deps[child.name] = child
                 # Recursively collect dependencies of this child
@@ -406,6 +435,7 @@ class Node:
                 node.lastexecution_end_time - node.lastexecution_start_time
             ).total_seconds()
             Node._node_manager.update_run_params(node, con)
+            Node._node_manager.save_outputs(node, con)
             return table
 
         def worker():
@@ -451,6 +481,9 @@ class Node:
                             db_name = node.get_table_name(table_name_prefix)
                             try:
                                 table = con.get_dest_table(db_name)
+                                outputs = Node._node_manager.load_outputs(node, con)
+                                if outputs is not None:
+                                    node._set_outputs(outputs)
                             except Exception:
                                 # Cached table was dropped or is inaccessible; recompute.
                                 logger.warning(
@@ -581,7 +614,7 @@ class Node:
         """
         graph = defaultdict(set)
         for node_name, node in nodes.items():
-            for child in node.children:
+            for child in node.children + node.execution_dependencies:
                 if child.name in nodes:
                     graph[node_name].add(child.name)
         return dict(graph)
@@ -598,6 +631,18 @@ class Node:
                 reverse_graph[dep].add(node_name)
         return dict(reverse_graph)
 
+    def _get_outputs(self) -> Optional[Dict]:
+        """
+        Results of _execute() other than the returned table, e.g. the auxiliary outputs of a report. Under lazy execution, they are stored with the node state and restored with _set_outputs() when the node is unchanged. None (the default) if the node has no such results.
+        """
+        return None
+
+    def _set_outputs(self, outputs: Dict):
+        """
+        Restore the results returned by _get_outputs() when lazy execution skips the node.
+        """
+        pass
+
     def _execute(self, tables: Dict[str, Table] = None) -> Table:
         """
         Implements the processing logic for this node. Should be implemented by subclasses to define specific computation logic.
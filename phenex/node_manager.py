@@ -1,4 +1,6 @@
+import base64
 import json
+import pickle
 import threading
 import uuid
 from datetime import datetime
@@ -12,6 +14,7 @@ from phenex.ibis_connect import DuckDBConnector
 logger = create_logger(__name__)
 
 NODE_STATES_TABLE_NAME = "__PHENEX_META__NODE_STATES"
+NODE_OUTPUTS_TABLE_NAME = "__PHENEX_META__NODE_OUTPUTS"
 NODE_STATES_DB_NAME = "phenex.db"
 
 
@@ -170,6 +173,97 @@ class NodeManager:
 
         return True
 
+    def save_outputs(self, node, con) -> bool:
+        """
+        Store the outputs of a node besides its table (see Node._get_outputs()) for the node's current hash and execution context, replacing those of previous runs.
+
+        Parameters:
+            node: The Node object that was executed
+            con: Database connector object (determines execution context)
+
+        Returns:
+            bool: True if outputs were stored, False if the node has none
+        """
+        outputs = node._get_outputs()
+        if outputs is None:
+            return False
+        try:
+            outputs = base64.b64encode(pickle.dumps(outputs)).decode()
+        except Exception as e:
+            logger.warning(f"Node '{node.name}': outputs cannot be stored: {e}")
+            return False
+        execution_params_json = self._get_execution_params_json(con)
+
+        with self._lock:
+            duckdb_con = DuckDBConnector(DUCKDB_DEST_DATABASE=self.db_name)
+            new_row = pd.DataFrame.from_dict(
+                {
+                    "NODE_NAME": [node.name],
+                    "NODE_HASH": [self._get_node_hash(node)],
+                    "EXECUTION_PARAMS": [execution_params_json],
+                    "OUTPUTS": [outputs],
+                }
+            )
+            existing_table = self._get_outputs_table(duckdb_con)
+            if existing_table is not None:
+                mask = self._match_outputs(
+                    existing_table, node.name, execution_params_json
+                )
+                df = pd.concat([existing_table[~mask], new_row], ignore_index=True)
+            else:
+                df = new_row
+            duckdb_con.create_table(
+                ibis.memtable(df), name_table=NODE_OUTPUTS_TABLE_NAME, overwrite=True
+            )
+        return True
+
+    def load_outputs(self, node, con) -> Optional[Dict]:
+        """
+        Retrieve the outputs stored by save_outputs() for the node's current hash and execution context.
+
+        Parameters:
+            node: The Node object
+            con: Database connector object (determines execution context)
+
+        Returns:
+            dict: The outputs of the node, or None if none are stored for the current hash and execution context
+        """
+        execution_params_json = self._get_execution_params_json(con)
+        current_hash = self._get_node_hash(node)
+        with self._lock:
+            duckdb_con = DuckDBConnector(DUCKDB_DEST_DATABASE=self.db_name)
+            table = self._get_outputs_table(duckdb_con)
+            if table is None:
+                return None
+            table = table[
+                self._match_outputs(table, node.name, execution_params_json)
+                & (table.NODE_HASH == current_hash)
+            ]
+            if len(table) == 0:
+                return None
+            return pickle.loads(base64.b64decode(table.iloc[0].OUTPUTS))
+
+    def _get_outputs_table(self, duckdb_con) -> Optional[pd.DataFrame]:
+        if NODE_OUTPUTS_TABLE_NAME in duckdb_con.dest_connection.list_tables():
+            return duckdb_con.get_dest_table(NODE_OUTPUTS_TABLE_NAME).to_pandas()
+        return None
+
+    @staticmethod
+    def _match_outputs(table, node_name, execution_params_json):
+        if execution_params_json is None:
+            return (table.NODE_NAME == node_name) & pd.isna(table.EXECUTION_PARAMS)
+        return (table.NODE_NAME == node_name) & (
+            table.EXECUTION_PARAMS == execution_params_json
+        )
+
+    def _get_execution_params_json(self, con) -> Optional[str]:
+        execution_params = self._get_execution_params(con)
+        return (
+            json.dumps(execution_params, sort_keys=True)
+            if execution_params is not None
+            else None
+        )
+
     def get_run_params(self, node, con=None) -> Optional[pd.DataFrame]:
         """
         Get execution metadata for a node.
@@ -268,6 +362,27 @@ class NodeManager:
                     # Drop the table if it's empty
                     duckdb_con.dest_connection.drop_table(NODE_STATES_TABLE_NAME)
 
+            # Clear the stored outputs the same way
+            outputs_table = self._get_outputs_table(duckdb_con)
+            if outputs_table is not None:
+                if con is not None:
+                    mask = self._match_outputs(
+                        outputs_table,
+                        node.name,
+                        (
+                            json.dumps(execution_params, sort_keys=True)
+                            if execution_params is not None
+                            else None
+                        ),
+                    )
+                else:
+                    mask = outputs_table.NODE_NAME == node.name
+                duckdb_con.create_table(
+                    ibis.memtable(outputs_table[~mask]),
+                    name_table=NODE_OUTPUTS_TABLE_NAME,
+                    overwrite=True,
+                )
+
         # Drop materialized table if connector is provided
         if con is not None:
             try:
@@ -27,6 +27,8 @@ from .factory import (
     ISTHMajorBleedPhenotype,
     ISTHBleedComponents,
     StackableRegimen,
+    StackableRegimenMaskPhenotype,
+    StackableRegimenPhenotype,
     TreatmentPatternAnalysis,
     SmartCodelistPhenotype,
     CHADSVASCPhenotype,
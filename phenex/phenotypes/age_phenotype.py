@@ -85,6 +85,11 @@ class AgePhenotype(Phenotype):
         if anchor_phenotype is not None:
             self.add_children(anchor_phenotype)
 
+    @property
+    def has_one_row_per_index(self) -> bool:
+        # one row per row of the person table
+        return True
+
     def _generate_name_from_filter(self, value_filter: Optional[ValueFilter]) -> str:
         """Generate a name like 'age_g18_le65' from the value filter."""
         if value_filter is None:
@@ -4,10 +4,13 @@ from phenex.phenotypes.phenotype import Phenotype
 from phenex.filters.relative_time_range_filter import RelativeTimeRangeFilter
 from phenex.filters.date_filter import DateFilter
 from phenex.filters.filter import AndFilter, OrFilter
-from phenex.aggregators import First, Last
+from phenex.aggregators import First, Last, Nearest
 from phenex.filters.categorical_filter import CategoricalFilter
 from phenex.tables import PHENOTYPE_TABLE_COLUMNS, PhenotypeTable
-from phenex.phenotypes.functions import select_phenotype_columns
+from phenex.phenotypes.functions import (
+    select_phenotype_columns,
+    attach_anchor_and_get_reference_date,
+)
 from ibis import _
 import ibis
 from phenex.util import create_logger
@@ -136,6 +139,10 @@ class CategoricalPhenotype(Phenotype):
             for rtr in self.relative_time_range:
                 if rtr.anchor_phenotype is not None:
                     self.children.append(rtr.anchor_phenotype)
+        if self.return_date == "nearest" and self.relative_time_range is None:
+            raise ValueError(
+                f"return_date='nearest' requires a relative_time_range to define the anchor date the nearest event is measured from ({self.name})"
+            )
 
     def _execute(self, tables) -> PhenotypeTable:
         table = tables[self.domain]
@@ -163,6 +170,17 @@ class CategoricalPhenotype(Phenotype):
                 table = rtr.filter(table)
         return table
 
+    def _get_nearest_aggregator(self, table, **kwargs):
+        """
+        Nearest is measured from the anchor of the first relative_time_range: the EVENT_DATE of its anchor_phenotype if set, otherwise INDEX_DATE.
+        """
+        table, reference_column = attach_anchor_and_get_reference_date(
+            table, self.relative_time_range[0].anchor_phenotype
+        )
+        return table, Nearest(
+            reference_date_column=reference_column.get_name(), **kwargs
+        )
+
     def _perform_date_selection(self, table):
         if self.return_date is None or self.return_date == "all":
             return table
@@ -170,6 +188,8 @@ class CategoricalPhenotype(Phenotype):
             aggregator = First()
         elif self.return_date == "last":
             aggregator = Last()
+        elif self.return_date == "nearest":
+            table, aggregator = self._get_nearest_aggregator(table)
         else:
             raise ValueError(f"Unknown return_date: {self.return_date}")
         return aggregator.aggregate(table)
@@ -124,9 +124,13 @@ class CodelistPhenotype(EventPhenotype):
         return self.codelist_filter.autojoin_filter(code_table, tables=tables)
 
     def _execute(self, tables) -> PhenotypeTable:
-        code_table = tables[self.domain]
+        code_table, date_range_pushed_down = self._perform_date_pushdown(
+            tables[self.domain]
+        )
         code_table = self._perform_codelist_filtering(code_table, tables)
-        return super()._execute_from_filtered_table(code_table, tables)
+        return super()._execute_from_filtered_table(
+            code_table, tables, date_range_pushed_down=date_range_pushed_down
+        )
 
     def _perform_value_selection(self, code_table):
         if self.return_value == "all":
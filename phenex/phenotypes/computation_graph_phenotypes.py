@@ -6,7 +6,7 @@ from phenex.tables import PhenotypeTable, PHENOTYPE_TABLE_COLUMNS
 from phenex.phenotypes.phenotype import Phenotype, ComputationGraph
 from phenex.phenotypes.functions import hstack, _get_join_keys
 from phenex.phenotypes.functions import select_phenotype_columns
-from phenex.aggregators import First, Last
+from phenex.aggregators import First, Last, Nearest
 
 
 class ComputationGraphPhenotype(Phenotype):
@@ -59,16 +59,32 @@ class ComputationGraphPhenotype(Phenotype):
         self.reduce = reduce
         self.value_filter = value_filter
         self.add_children(self.expression.get_leaf_phenotypes())
+        # set by the orchestrating Cohort; see use_leaf_matrix()
+        self.leaf_matrix = None
 
-    def _execute(self, tables: Dict[str, Table]) -> PhenotypeTable:
+    def can_use_leaf_matrix(self) -> bool:
         """
-        Executes the score phenotype processing logic.
+        A leaf matrix holds one row per (PERSON_ID, INDEX_DATE). It is equivalent to joining the leaf phenotypes only if none of them (nor any nested computation graph) contributes more than one row per index.
+        """
+        return all(
+            child.has_one_row_per_index
+            and not isinstance(child, ComputationGraphPhenotype)
+            for child in self.children
+        )
 
-        Args:
-            tables (Dict[str, Table]): A dictionary where the keys are table names and the values are Table objects.
+    def use_leaf_matrix(self, leaf_matrix: Optional["Node"]):
+        """
+        Evaluate the expression against a shared leaf matrix, i.e. a Node whose table pivots the leaf phenotypes of several ComputationGraphPhenotypes into one wide table keyed on the PERSON table (see phenex.core.LeafMatrixNode), instead of joining the children in this phenotype. The leaf matrix is executed before this phenotype, but is not a child, so it does not change the phenotype's definition. Pass None to stop using it.
+        """
+        if self.leaf_matrix is not None:
+            self.remove_execution_dependencies(self.leaf_matrix)
+        self.leaf_matrix = leaf_matrix
+        if leaf_matrix is not None:
+            self.add_execution_dependencies(leaf_matrix)
 
-        Returns:
-            PhenotypeTable: The resulting phenotype table containing the required columns.
+    def _stack_children(self, tables: Dict[str, Table]) -> Table:
+        """
+        Horizontally stack the children on the PERSON table (if available), taking their columns from the shared leaf matrix when one has been computed.
         """
         join_table = tables.get("PERSON")
         if join_table is not None:
@@ -76,7 +92,27 @@ class ComputationGraphPhenotype(Phenotype):
             if "INDEX_DATE" in join_table.columns:
                 person_cols.append("INDEX_DATE")
             join_table = join_table.select(person_cols)
-        joined_table = hstack(self.children, join_table)
+            leaf_matrix_table = getattr(self.leaf_matrix, "table", None)
+            if leaf_matrix_table is not None:
+                columns = person_cols + [
+                    f"{child.name}_{column}"
+                    for child in self.children
+                    for column in ["BOOLEAN", "EVENT_DATE", "VALUE"]
+                ]
+                return leaf_matrix_table.select(columns)
+        return hstack(self.children, join_table)
+
+    def _execute(self, tables: Dict[str, Table]) -> PhenotypeTable:
+        """
+        Executes the score phenotype processing logic.
+
+        Args:
+            tables (Dict[str, Table]): A dictionary where the keys are table names and the values are Table objects.
+
+        Returns:
+            PhenotypeTable: The resulting phenotype table containing the required columns.
+        """
+        joined_table = self._stack_children(tables)
 
         if self.populate == "value" and self.operate_on == "boolean":
             for child in self.children:
@@ -216,9 +252,10 @@ class ComputationGraphPhenotype(Phenotype):
                 reduce=False, preserve_nulls=True, aggregation_index=agg_index
             )
         elif self.return_date == "nearest":
-            # Note: Nearest is not currently implemented in the aggregators
-            # This would need to be added to the aggregator module
-            raise NotImplementedError("Nearest aggregation not yet implemented")
+            agg_index = _get_join_keys(code_table)
+            aggregator = Nearest(
+                reduce=False, preserve_nulls=True, aggregation_index=agg_index
+            )
         else:
             raise ValueError(f"Unknown return_date: {self.return_date}")
 
@@ -421,13 +458,7 @@ class LogicPhenotype(ComputationGraphPhenotype):
         Returns:
             PhenotypeTable: The resulting phenotype table containing the required columns.
         """
-        join_table = tables.get("PERSON")
-        if join_table is not None:
-            person_cols = ["PERSON_ID"]
-            if "INDEX_DATE" in join_table.columns:
-                person_cols.append("INDEX_DATE")
-            join_table = join_table.select(person_cols)
-        joined_table = hstack(self.children, join_table)
+        joined_table = self._stack_children(tables)
         # Convert boolean columns to integers for arithmetic operations if needed
         if self.populate == "value" and self.operate_on == "boolean":
             for child in self.children:
@@ -1,7 +1,11 @@
-from ibis import _
+import ibis
 
 from phenex.phenotypes.phenotype import Phenotype
-from phenex.phenotypes.functions import _get_join_keys
+from phenex.phenotypes.functions import (
+    _get_join_keys,
+    _get_inclusive_day_bounds,
+    _get_day_number,
+)
 from phenex.filters.relative_time_range_filter import RelativeTimeRangeFilter
 from phenex.filters import DateFilter, ValueFilter
 from phenex.tables import is_phenex_code_table, PHENOTYPE_TABLE_COLUMNS, PhenotypeTable
@@ -95,84 +99,63 @@ class EventCountPhenotype(Phenotype):
         group_keys = _get_join_keys(table)
         table = table.select([*group_keys, "EVENT_DATE"]).distinct()
 
-        # Count occurrences per (PERSON_ID, INDEX_DATE)
-        occurrence_counts_table = table.group_by(group_keys).aggregate(VALUE=_.count())
-        table, occurrence_counts_table = self._perform_value_filtering(
-            table, occurrence_counts_table
+        # Count occurrences per (PERSON_ID, INDEX_DATE) on every row, so no join back is needed
+        table = table.mutate(
+            VALUE=table.PERSON_ID.count().over(ibis.window(group_by=group_keys))
         )
+        table = self._perform_value_filtering(table)
         table = self._perform_relative_time_range_filtering(table)
         table = self._perform_date_selection(table)
-        select_cols = [*group_keys, "EVENT_DATE", "VALUE"]
-        table = table.left_join(
-            occurrence_counts_table.select(*group_keys, "VALUE"),
-            group_keys,
-        ).select(select_cols)
+        table = table.select([*group_keys, "EVENT_DATE", "VALUE"])
+        return table.mutate(BOOLEAN=True)
 
-        table = table.mutate(BOOLEAN=True).distinct()
-        return table
-
-    def _perform_value_filtering(self, table, occurrence_counts_table):
+    def _perform_value_filtering(self, table):
         if self.value_filter is not None:
-            occurrence_counts_table = self.value_filter.filter(occurrence_counts_table)
-            join_keys = _get_join_keys(table)
-            select_cols = [*join_keys, "EVENT_DATE", "VALUE"]
-            table = table.right_join(
-                occurrence_counts_table,
-                join_keys,
-            ).select(select_cols)
-        return table, occurrence_counts_table
+            table = self.value_filter.filter(table)
+        return table
 
     def _perform_relative_time_range_filtering(self, table):
-        if self.relative_time_range is not None:
-            # make sure that the 'when' keyword parameter is correctly set to after
-            self.relative_time_range.when = "after"
-            # Self join and rename event_date columns;
-            # the first dates will be called INDEX_DATE
-            # the second dates will be called EVENT_DATE
-            has_index = "INDEX_DATE" in table.columns
-            # Preserve original INDEX_DATE by renaming it temporarily
-            if has_index:
-                table = table.rename({"_ORIG_INDEX_DATE": "INDEX_DATE"})
-            first_cols = ["PERSON_ID", table.EVENT_DATE.name("INDEX_DATE")]
-            second_cols = ["PERSON_ID", table.EVENT_DATE.name("EVENT_DATE")]
-            if has_index:
-                first_cols.append("_ORIG_INDEX_DATE")
-                second_cols.append("_ORIG_INDEX_DATE")
-            first_table = table.select(*first_cols)
-            second_table = table.select(*second_cols)
-            join_pred = [first_table.PERSON_ID == second_table.PERSON_ID]
-            if has_index:
-                join_pred.append(
-                    first_table._ORIG_INDEX_DATE == second_table._ORIG_INDEX_DATE
-                )
-            table = first_table.join(second_table, join_pred)
-
-            table = table.filter(table.INDEX_DATE <= table.EVENT_DATE)
-            # perform relative time range filtering; the first date is the anchor ('index_date')
-            table = self.relative_time_range.filter(table)
-
-            select_base = ["PERSON_ID"]
-            if has_index:
-                select_base.append("_ORIG_INDEX_DATE")
-            if self.component_date_select == "first":
-                table = table.select(*select_base, "INDEX_DATE").rename(
-                    {"EVENT_DATE": "INDEX_DATE"}
-                )
-            elif self.component_date_select == "second":
-                table = table.select(*select_base, "EVENT_DATE")
-            if has_index:
-                table = table.rename({"INDEX_DATE": "_ORIG_INDEX_DATE"})
-        return table
+        """
+        Keep the distinct event dates that form a pair with another event date (or themselves, if zero days are allowed) whose distance in days satisfies relative_time_range. With component_date_select='second' a date is kept if an earlier date lies the right number of days before it; with 'first' if a later date lies the right number of days after it.
+
+        Rather than self-joining all pairs of dates, the partner dates are counted in a range-framed window over the day number of each event, which is a single sorted pass per patient.
+        """
+        if self.relative_time_range is None:
+            return table
+        # the second event never precedes the first, so at least zero days apart
+        min_days, max_days = _get_inclusive_day_bounds(
+            self.relative_time_range.min_days, self.relative_time_range.max_days
+        )
+        if max_days is not None and min_days > max_days:
+            return table.filter(ibis.literal(False))
+
+        table = table.filter(table.EVENT_DATE.notnull())
+        table = table.mutate(_DAY_NUMBER=_get_day_number(table.EVENT_DATE))
+        if self.component_date_select == "second":
+            # partner dates lie between max_days and min_days before
+            frame = (None if max_days is None else -max_days, -min_days)
+        else:
+            # partner dates lie between min_days and max_days after
+            frame = (min_days, max_days)
+        window = ibis.window(
+            group_by=_get_join_keys(table),
+            order_by=table._DAY_NUMBER,
+            range=frame,
+        )
+        table = table.mutate(_N_PARTNERS=table._DAY_NUMBER.count().over(window))
+        table = table.filter(table._N_PARTNERS > 0)
+        return table.drop("_DAY_NUMBER", "_N_PARTNERS")
 
-    def _perform_date_selection(self, table, reduce=True):
+    def _perform_date_selection(self, table):
         if self.return_date is None or self.return_date == "all":
             return table
         agg_index = _get_join_keys(table)
+        # dates are distinct per group, so without reducing exactly one row
+        # (carrying VALUE along) is selected per group
         if self.return_date == "first":
-            aggregator = First(reduce=reduce, aggregation_index=agg_index)
+            aggregator = First(aggregation_index=agg_index)
         elif self.return_date == "last":
-            aggregator = Last(reduce=reduce, aggregation_index=agg_index)
+            aggregator = Last(aggregation_index=agg_index)
         else:
             raise ValueError(f"Unknown return_date: {self.return_date}")
-        table = aggregator.aggregate(table)
-        return table.select([*agg_index, "EVENT_DATE"])
+        return aggregator.aggregate(table)
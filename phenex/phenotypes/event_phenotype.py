@@ -3,7 +3,7 @@ from phenex.phenotypes.phenotype import Phenotype
 from phenex.filters.relative_time_range_filter import RelativeTimeRangeFilter
 from phenex.filters.date_filter import DateFilter
 from phenex.filters.categorical_filter import CategoricalFilter
-from phenex.aggregators import First, Last
+from phenex.aggregators import First, Last, Nearest
 from phenex.tables import is_phenex_code_table, PhenotypeTable
 from phenex.phenotypes.functions import select_phenotype_columns, _get_join_keys
 
@@ -69,12 +69,20 @@ class EventPhenotype(Phenotype):
                         self.add_children(rtr.anchor_phenotype)
 
     def _execute(self, tables) -> PhenotypeTable:
-        code_table = tables[self.domain]
-        return self._execute_from_filtered_table(code_table, tables)
-
-    def _execute_from_filtered_table(self, code_table, tables) -> PhenotypeTable:
+        code_table, date_range_pushed_down = self._perform_date_pushdown(
+            tables[self.domain]
+        )
+        return self._execute_from_filtered_table(
+            code_table, tables, date_range_pushed_down=date_range_pushed_down
+        )
+
+    def _execute_from_filtered_table(
+        self, code_table, tables, date_range_pushed_down=False
+    ) -> PhenotypeTable:
         code_table = self._perform_categorical_filtering(code_table, tables)
-        code_table = self._perform_time_filtering(code_table)
+        code_table = self._perform_time_filtering(
+            code_table, include_date_range=not date_range_pushed_down
+        )
         code_table = self._perform_date_selection(code_table)
         code_table = self._perform_value_selection(code_table)
         code_table = select_phenotype_columns(code_table)
@@ -87,14 +95,38 @@ class EventPhenotype(Phenotype):
             code_table = self.categorical_filter.autojoin_filter(code_table, tables)
         return code_table
 
-    def _perform_time_filtering(self, code_table):
-        if self.date_range is not None:
+    def _can_push_down_date_range(self, code_table) -> bool:
+        """
+        The absolute date_range can be applied to the domain table before any codelist or categorical autojoin if the filtered column already exists on the domain table itself. Otherwise (e.g. EVENT_DATE is only reachable through an autojoin), the date_range is applied after the joins.
+        """
+        return (
+            self.date_range is not None
+            and self.date_range.column_name in code_table.columns
+        )
+
+    def _perform_date_pushdown(self, code_table):
+        """
+        Apply the absolute date_range to the earliest scan of the domain table, i.e. before codelist filtering and before any PhenexTable.join autojoin path, so that the joins only see rows within the date bounds.
+
+        Returns the (possibly filtered) table and whether the date_range was applied, in which case it must not be applied again in _perform_time_filtering.
+        """
+        if self._can_push_down_date_range(code_table):
+            return self.date_range.filter(code_table), True
+        return code_table, False
+
+    def _perform_time_filtering(self, code_table, include_date_range=True):
+        if self.date_range is not None and include_date_range:
             code_table = self.date_range.filter(code_table)
         if self.relative_time_range is not None:
             for rtr in self.relative_time_range:
                 code_table = rtr.filter(code_table)
         return code_table
 
+    @property
+    def has_one_row_per_index(self) -> bool:
+        # first / last without return_value reduce to a single row per index
+        return self.return_date in ["first", "last"] and self.return_value is None
+
     def _perform_date_selection(self, code_table):
         if self.return_date is None or self.return_date == "all":
             return code_table
@@ -108,7 +140,7 @@ class EventPhenotype(Phenotype):
         elif self.return_date == "last":
             aggregator = Last(reduce=reduce, aggregation_index=agg_index)
         elif self.return_date == "nearest":
-            raise NotImplementedError("Nearest aggregation not yet implemented")
+            aggregator = Nearest(reduce=reduce, aggregation_index=agg_index)
         else:
             raise ValueError(f"Unknown return_date: {self.return_date}")
 
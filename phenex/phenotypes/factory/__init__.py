@@ -1,5 +1,9 @@
 from .isth_major_bleed import ISTHMajorBleedPhenotype, ISTHBleedComponents
-from .stackable_regimen import StackableRegimen
+from .stackable_regimen import (
+    StackableRegimen,
+    StackableRegimenMaskPhenotype,
+    StackableRegimenPhenotype,
+)
 from .treatment_pattern_analysis import TreatmentPatternAnalysis
 from .smart_codelist_phenotype import SmartCodelistPhenotype, CODETYPE_INFO
 from .chadsvasc import CHADSVASCPhenotype, CHADSVASCComponents
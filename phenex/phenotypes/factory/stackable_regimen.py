@@ -4,23 +4,124 @@ from itertools import combinations
 from functools import reduce
 import operator
 
+import ibis
+from ibis.expr.types.relations import Table
+
 from phenex.codelists import Codelist
-from phenex.phenotypes import (
-    LogicPhenotype,
-)
+from phenex.phenotypes.phenotype import Phenotype
+from phenex.phenotypes.functions import _get_join_keys
+from phenex.tables import PhenotypeTable
 
 from phenex.util import create_logger
 
 logger = create_logger(__name__)
 
 
+class StackableRegimenMaskPhenotype(Phenotype):
+    """
+    StackableRegimenMaskPhenotype pivots the input phenotypes of a StackableRegimen once into one row per patient (and index date) who fulfills at least one of them. The VALUE is an integer bitmask in which bit i is set if the i-th input phenotype is fulfilled; every regimen of the StackableRegimen is then a cheap filter on this mask (see StackableRegimenPhenotype).
+
+    DATE: The first event date among the fulfilled input phenotypes.
+    VALUE: The regimen bitmask.
+
+    Parameters:
+        phenotypes: The input phenotypes; at most 62 so that the mask fits in a signed 64 bit integer.
+        name: The name of the phenotype.
+    """
+
+    def __init__(self, phenotypes: List[Phenotype], **kwargs):
+        super(StackableRegimenMaskPhenotype, self).__init__(**kwargs)
+        if len(phenotypes) > 62:
+            raise ValueError(
+                "StackableRegimenMaskPhenotype supports at most 62 input phenotypes!"
+            )
+        self.phenotypes = phenotypes
+        self.add_children(phenotypes)
+
+    @property
+    def has_one_row_per_index(self) -> bool:
+        return True
+
+    def _execute(self, tables: Dict[str, Table]) -> PhenotypeTable:
+        join_keys = _get_join_keys(self.phenotypes[0].table)
+
+        # UNION ALL the fulfilled rows of all inputs, tagged with their bit
+        parts = []
+        for bit, pt in enumerate(self.phenotypes):
+            table = pt.table.filter(pt.table.BOOLEAN == True)
+            parts.append(
+                table.select(
+                    *join_keys,
+                    EVENT_DATE=table.EVENT_DATE.cast("date"),
+                    _BIT=ibis.literal(1 << bit, type="int64"),
+                )
+            )
+        long_table = ibis.union(*parts, distinct=False)
+
+        return long_table.group_by(join_keys).aggregate(
+            BOOLEAN=ibis.literal(True),
+            EVENT_DATE=long_table.EVENT_DATE.min(),
+            VALUE=long_table._BIT.bit_or(),
+        )
+
+
+class StackableRegimenPhenotype(Phenotype):
+    """
+    StackableRegimenPhenotype identifies patients whose regimen bitmask (see StackableRegimenMaskPhenotype) equals a given mask, i.e. patients who fulfill exactly the input phenotypes whose bits are set. A mask of 0 identifies the patients of the PERSON table who fulfill none of the input phenotypes.
+
+    DATE: The first event date among the input phenotypes of the regimen (null for mask 0).
+    VALUE: None
+
+    Parameters:
+        regimen_mask: The StackableRegimenMaskPhenotype computing the bitmask.
+        mask: The bitmask of the regimen.
+        name: The name of the phenotype.
+    """
+
+    def __init__(
+        self, regimen_mask: StackableRegimenMaskPhenotype, mask: int, **kwargs
+    ):
+        super(StackableRegimenPhenotype, self).__init__(**kwargs)
+        self.regimen_mask = regimen_mask
+        self.mask = mask
+        self.add_children(regimen_mask)
+
+    @property
+    def has_one_row_per_index(self) -> bool:
+        return True
+
+    def _execute(self, tables: Dict[str, Table]) -> PhenotypeTable:
+        mask_table = self.regimen_mask.table
+        if self.mask:
+            table = mask_table.filter(mask_table.VALUE == self.mask)
+        else:
+            person_table = tables.get("PERSON")
+            if person_table is None:
+                # like ~(c1 | c2 | ...) without a PERSON table to join on
+                table = mask_table.filter(ibis.literal(False))
+            else:
+                join_keys = [
+                    k for k in _get_join_keys(mask_table) if k in person_table.columns
+                ]
+                table = (
+                    person_table.select(join_keys)
+                    .distinct()
+                    .anti_join(mask_table, join_keys)
+                    .mutate(
+                        BOOLEAN=ibis.literal(True),
+                        EVENT_DATE=ibis.null().cast("date"),
+                    )
+                )
+        return table.mutate(VALUE=ibis.null().cast("float64"))
+
+
 class StackableRegimen:
     def __init__(
         self,
         phenotypes: List[Any],
         regimen_keys: Optional[List[str]] = None,
         name: str = "sr",
-    ) -> List[LogicPhenotype]:
+    ) -> List[Phenotype]:
         """
         Often we want to see how drugs are utilized; are people taking a single drug, a combination, and if so, which ones? StackableRegimens can be used to answer this question. Given a list of input phenotypes, it generates a list of phenotypes computing all possible combinations of those inputs.
 
@@ -38,6 +139,8 @@ class StackableRegimen:
         |  | (c2 & c3) & ~c1 |
         | stack 3 phenotypes i.e. "triple" regimen | c1 & c2 & c3 |
 
+        The input phenotypes are pivoted only once, into a StackableRegimenMaskPhenotype holding a bitmask of the fulfilled inputs per patient; each regimen is a StackableRegimenPhenotype filtering that mask, e.g. c1 & ~(c2 | c3) is mask 0b001.
+
         To use, create a StackableRegimen class, passing it the input phenotypes. The stackable regimes are then accessible as properties of the StackableRegimen object as either a list or dictionary in output_phenotypes and output_phenotypes_dict, respectively.
 
         Parameters:
@@ -126,13 +229,11 @@ class StackableRegimen:
         regimen_keys: List[str],
         phenotypes_dict: Dict[str, Any],
         prefix: str,
-    ) -> Dict[str, List[LogicPhenotype]]:
+    ) -> Dict[str, List[StackableRegimenPhenotype]]:
         """
         Internal helper function to generate all possible combinations of regimens.
 
-        For each n-sized combination:
-        - All regimens in the combination must be active (using & operator)
-        - All regimens NOT in the combination must be inactive (using ~ and | operators)
+        For each n-sized combination, the regimen mask has the bits of all regimens in the combination set and the bits of all regimens NOT in the combination unset, i.e. it is equivalent to (A & B & C & ...) & ~(X | Y | Z | ...).
 
         Parameters:
             regimen_keys: List of regimen keys to combine
@@ -140,27 +241,27 @@ class StackableRegimen:
             prefix: Name prefix for the generated phenotypes
 
         Returns:
-            Dictionary mapping combination size prefixes to lists of LogicPhenotype objects.
+            Dictionary mapping combination size prefixes to lists of StackableRegimenPhenotype objects.
             This dictionary is flattened before being returned to the user by StackableRegimen.
         """
         # Use simple size prefixes in the format "s1", "s2", etc.
         n_regimens = len(regimen_keys)
         results = {}
 
+        # Pivot the input phenotypes once; bit i corresponds to regimen_keys[i]
+        regimen_mask = StackableRegimenMaskPhenotype(
+            name=f"{prefix}_MASK",
+            phenotypes=[phenotypes_dict[r] for r in regimen_keys],
+        )
+
         # Generate combinations for each size from 1 to n_regimens
         for size in range(1, n_regimens + 1):
             phenotype_list = []
             stack_key = f"stack{size}"  # Simple prefix format: s1, s2, etc.
 
             # Use the python itertools combination function. Generate all combinations of the given size
-            for combo in combinations(regimen_keys, size):
-                # combo is a tuple; convert to list
-                regimen_combo = list(combo)
-
-                # Get regimens NOT in the combination
-                other_regimen_keys = [
-                    key for key in regimen_keys if key not in regimen_combo
-                ]
+            for combo in combinations(range(n_regimens), size):
+                regimen_combo = [regimen_keys[i] for i in combo]
 
                 # Create name based on combination size and regimen names
                 if (
@@ -174,25 +275,12 @@ class StackableRegimen:
                     ]
                     name = f"{prefix}_{stack_key}_" + "_".join(processed_names)
 
-                # Build the logic expression:
-                # 1. AND together all regimens in the combination
-                included_logic = reduce(
-                    operator.and_, [phenotypes_dict[r] for r in regimen_combo]
-                )
-
-                # 2. OR together all regimens NOT in the combination (if any)
-                if other_regimen_keys:
-                    excluded_logic = reduce(
-                        operator.or_, [phenotypes_dict[r] for r in other_regimen_keys]
-                    )
-                    # Final logic: (A & B & C & ...) & ~(X | Y | Z | ...)
-                    logic = included_logic & ~excluded_logic
-                else:
-                    # If all regimens are included in the combination, there's nothing to exclude
-                    logic = included_logic
-
                 # Create the phenotype and add to the list
-                phenotype = LogicPhenotype(name=name, expression=logic)
+                phenotype = StackableRegimenPhenotype(
+                    name=name,
+                    regimen_mask=regimen_mask,
+                    mask=reduce(operator.or_, [1 << i for i in combo]),
+                )
                 if size == 1:
                     phenotype.display_name = f"{regimen_combo[0]} only"
                 else:
@@ -203,8 +291,9 @@ class StackableRegimen:
             results[stack_key] = phenotype_list
 
         # Add "none" category: patients with none of the regimens active
-        all_combined = reduce(operator.or_, [phenotypes_dict[r] for r in regimen_keys])
-        none_phenotype = LogicPhenotype(name=f"{prefix}_NONE", expression=~all_combined)
+        none_phenotype = StackableRegimenPhenotype(
+            name=f"{prefix}_NONE", regimen_mask=regimen_mask, mask=0
+        )
         none_phenotype.display_name = "None"
         results["none"] = [none_phenotype]
 
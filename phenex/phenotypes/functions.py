@@ -1,4 +1,5 @@
-from typing import List
+import math
+from typing import List, Optional
 from datetime import date, datetime
 from ibis.expr.types.relations import Table
 import ibis
@@ -15,6 +16,30 @@ def _get_join_keys(table=None):
     return ["PERSON_ID", "INDEX_DATE"]
 
 
+def _get_inclusive_day_bounds(min_days=None, max_days=None, lower_bound=0):
+    """
+    Translate min_days / max_days Values (operators >, >= and <, <=) into inclusive integer bounds on a number of days, e.g. for range-framed windows over day numbers. The lower bound is never below lower_bound; the upper bound is None if unbounded.
+    """
+    lower = lower_bound
+    if min_days is not None:
+        if min_days.operator == ">":
+            lower = max(lower, math.floor(min_days.value) + 1)
+        else:
+            lower = max(lower, math.ceil(min_days.value))
+    upper = None
+    if max_days is not None:
+        if max_days.operator == "<":
+            upper = math.ceil(max_days.value) - 1
+        else:
+            upper = math.floor(max_days.value)
+    return lower, upper
+
+
+def _get_day_number(date_column):
+    """Days since 1970-01-01, an integer usable as the ordering of a range-framed window."""
+    return date_column.delta(ibis.date(1970, 1, 1), "day")
+
+
 def attach_anchor_and_get_reference_date(table, anchor_phenotype=None):
     # Unwrap PhenexTable so all joins are done at the raw ibis level.
     # PhenexTable.join would re-wrap the join result through __init__ which
@@ -134,11 +159,16 @@ def hstack(phenotypes: List["Phenotype"], join_table: Table = None) -> Table:
     return join_table
 
 
-def hstack_boolean(phenotypes: List["Phenotype"], join_table: Table = None) -> Table:
+def hstack_boolean(
+    phenotypes: List["Phenotype"],
+    join_table: Table = None,
+    join_keys: Optional[List[str]] = None,
+) -> Table:
     """
     Efficiently stacks only the BOOLEAN column from multiple phenotypes into a wide table
     using UNION ALL + GROUP BY with filtered aggregation.
-    Groups by (PERSON_ID, INDEX_DATE) when INDEX_DATE is present, otherwise PERSON_ID only.
+    Groups by (PERSON_ID, INDEX_DATE) when INDEX_DATE is present, otherwise PERSON_ID only,
+    unless join_keys are given explicitly.
     """
     t0 = datetime.now()
     logger.info(
@@ -149,7 +179,8 @@ def hstack_boolean(phenotypes: List["Phenotype"], join_table: Table = None) -> T
         join_table = join_table.table
 
     # Detect join keys from the first phenotype's table
-    join_keys = _get_join_keys(phenotypes[0].table)
+    if join_keys is None:
+        join_keys = _get_join_keys(phenotypes[0].table)
 
     # Step 1: UNION ALL — stack each phenotype's (keys, BOOLEAN) with a tag column
     unioned_tables = []
@@ -2,9 +2,12 @@ from typing import Union, List, Optional
 from phenex.phenotypes.phenotype import Phenotype
 from phenex.filters.relative_time_range_filter import RelativeTimeRangeFilter
 from phenex.filters.date_filter import DateFilter
-from phenex.aggregators import First, Last
+from phenex.aggregators import First, Last, Nearest
 from phenex.tables import PhenotypeTable
-from phenex.phenotypes.functions import select_phenotype_columns
+from phenex.phenotypes.functions import (
+    select_phenotype_columns,
+    attach_anchor_and_get_reference_date,
+)
 from phenex.util import create_logger
 
 logger = create_logger(__name__)
@@ -29,8 +32,9 @@ class FurtherValueFilterPhenotype(Phenotype):
         date_range (DateFilter): A date range filter to apply.
         relative_time_range (RelativeTimeRangeFilter): A relative time range filter
             or list of filters to apply.
-        return_date (str): Specifies whether to return the 'first', 'last', or 'all'
-            event date(s). Default is 'all'.
+        return_date (str): Specifies whether to return the 'first', 'last', 'nearest',
+            or 'all' event date(s). 'nearest' is measured from the anchor of the first
+            relative_time_range and therefore requires one. Default is 'all'.
     """
 
     output_display_type = "value"
@@ -67,6 +71,10 @@ class FurtherValueFilterPhenotype(Phenotype):
         if isinstance(relative_time_range, RelativeTimeRangeFilter):
             relative_time_range = [relative_time_range]
         self.relative_time_range = relative_time_range
+        if self.return_date == "nearest" and self.relative_time_range is None:
+            raise ValueError(
+                f"return_date='nearest' requires a relative_time_range to define the anchor date the nearest event is measured from ({self.name})"
+            )
 
         if self.relative_time_range is not None:
             for rtr in self.relative_time_range:
@@ -91,6 +99,17 @@ class FurtherValueFilterPhenotype(Phenotype):
                 table = rtr.filter(table)
         return table
 
+    def _get_nearest_aggregator(self, table, **kwargs):
+        """
+        Nearest is measured from the anchor of the first relative_time_range: the EVENT_DATE of its anchor_phenotype if set, otherwise INDEX_DATE.
+        """
+        table, reference_column = attach_anchor_and_get_reference_date(
+            table, self.relative_time_range[0].anchor_phenotype
+        )
+        return table, Nearest(
+            reference_date_column=reference_column.get_name(), **kwargs
+        )
+
     def _perform_date_selection(self, table):
         if self.return_date is None or self.return_date == "all":
             return table
@@ -102,7 +121,7 @@ class FurtherValueFilterPhenotype(Phenotype):
         elif self.return_date == "last":
             aggregator = Last(reduce=reduce)
         elif self.return_date == "nearest":
-            raise NotImplementedError("Nearest aggregation not yet implemented")
+            table, aggregator = self._get_nearest_aggregator(table, reduce=reduce)
         else:
             raise ValueError(f"Unknown return_date: {self.return_date}")
 
@@ -3,10 +3,15 @@ from phenex.phenotypes import MeasurementPhenotype, Phenotype
 from phenex.filters.value import Value, GreaterThanOrEqualTo
 from phenex.filters.value_filter import ValueFilter
 from phenex.tables import PhenotypeTable
-from phenex.phenotypes.functions import select_phenotype_columns
+from phenex.phenotypes.functions import (
+    select_phenotype_columns,
+    _get_join_keys,
+    _get_inclusive_day_bounds,
+    _get_day_number,
+)
 from phenex.aggregators.aggregator import First, Last, ValueAggregator, DailyMedian
 
-from ibis import _
+import ibis
 
 
 class MeasurementChangePhenotype(Phenotype):
@@ -79,85 +84,58 @@ class MeasurementChangePhenotype(Phenotype):
 
     def _execute(self, tables) -> PhenotypeTable:
         # Execute the child phenotype to get the initial filtered table
-        phenotype_table_1 = self.phenotype.table
-        phenotype_table_2 = self.phenotype.table.view()
-        # Create a self-join to compare each measurement with every other measurement
-        join_predicates = [
-            phenotype_table_1.PERSON_ID == phenotype_table_2.PERSON_ID,
-            (phenotype_table_1.EVENT_DATE != phenotype_table_2.EVENT_DATE)
-            | (phenotype_table_1.VALUE != phenotype_table_2.VALUE),
-        ]
-        if "INDEX_DATE" in phenotype_table_1.columns:
-            join_predicates.append(
-                phenotype_table_1.INDEX_DATE == phenotype_table_2.INDEX_DATE
-            )
-        joined_table = phenotype_table_1.join(
-            phenotype_table_2,
-            join_predicates,
-            lname="{name}_1",
-            rname="{name}_2",
-        ).filter(_.EVENT_DATE_1 < _.EVENT_DATE_2)
-        # Calculate the change in value and the days apart
-        days_between = joined_table.EVENT_DATE_2.delta(joined_table.EVENT_DATE_1, "day")
-        value_change = joined_table.VALUE_2 - joined_table.VALUE_1
-        joined_table = joined_table.mutate(
-            VALUE_CHANGE=value_change, DAYS_BETWEEN=days_between
-        )
-
-        # Filter to keep only those with at least min_change and within max_days_apart
-        if self.direction == "decrease":
-            if self.min_change:
-                max_change = Value(
-                    operator=self.min_change.operator.replace(">", "<"),
-                    value=-self.min_change.value,
-                )
-            else:
-                max_change = None
-            if self.max_change:
-                min_change = Value(
-                    operator=self.max_change.operator.replace("<", ">"),
-                    value=-self.max_change.value,
-                )
-            else:
-                min_change = None
-        else:
-            min_change = self.min_change
-            max_change = self.max_change
-
-        value_filter = ValueFilter(
-            min_value=min_change, max_value=max_change, column_name="VALUE_CHANGE"
+        measurements = self.phenotype.table
+        keys = _get_join_keys(measurements)
+        measurements = measurements.select(*keys, "EVENT_DATE", "VALUE")
+        measurements = measurements.filter(measurements.EVENT_DATE.notnull())
+        measurements = measurements.mutate(
+            _DAY_NUMBER=_get_day_number(measurements.EVENT_DATE)
         )
-        filtered_table = value_filter.filter(joined_table)
-        time_filter = ValueFilter(
-            min_value=self.min_days_between,
-            max_value=self.max_days_between,
-            column_name="DAYS_BETWEEN",
+        min_change, max_change = self._get_change_bounds()
+        # measurements on the same day cannot be compared, so pairs are at least one day apart
+        min_days, max_days = _get_inclusive_day_bounds(
+            self.min_days_between, self.max_days_between, lower_bound=1
         )
-        filtered_table = time_filter.filter(filtered_table)
+        if max_days is not None and min_days > max_days:
+            return self._empty_table(measurements)
 
-        # Determine the return date based on the return_date attribute
-        if self.component_date_select == "first":
-            filtered_table = filtered_table.mutate(
-                EVENT_DATE=filtered_table.EVENT_DATE_1,
-            )
-        elif self.component_date_select == "second":
-            filtered_table = filtered_table.mutate(
-                EVENT_DATE=filtered_table.EVENT_DATE_2,
-            )
+        # Find the measurements that can be the selected component of a pair
+        # with windows, before pairing them up with their partners
+        candidates = self._get_candidates(
+            measurements, keys, min_change, max_change, min_days, max_days
+        )
+        if self.return_date in ["first", "last"] and (
+            min_change is None or max_change is None
+        ):
+            # with at most one bound on the change the candidates are exact, so
+            # only those on the returned date need to be paired
+            candidates = self._select_date(candidates)
 
-        # Select the required columns
-        mutate_kwargs = dict(
-            PERSON_ID="PERSON_ID_1", VALUE="VALUE_CHANGE", BOOLEAN=True
+        # Pair each candidate with its partners within the allowed number of days
+        partners = measurements.view()
+        if self.component_date_select == "second":
+            first, second = partners, candidates
+        else:
+            first, second = candidates, partners
+        days_between = second._DAY_NUMBER - first._DAY_NUMBER
+        join_predicates = [first[key] == second[key] for key in keys] + [
+            days_between >= min_days
+        ]
+        if max_days is not None:
+            join_predicates.append(days_between <= max_days)
+        selected = second if self.component_date_select == "second" else first
+        pairs = first.join(second, join_predicates).select(
+            *[selected[key] for key in keys],
+            EVENT_DATE=selected.EVENT_DATE,
+            VALUE=second.VALUE - first.VALUE,
         )
-        if "INDEX_DATE_1" in filtered_table.columns:
-            mutate_kwargs["INDEX_DATE"] = "INDEX_DATE_1"
-        filtered_table = filtered_table.mutate(**mutate_kwargs)
+        value_filter = ValueFilter(
+            min_value=min_change, max_value=max_change, column_name="VALUE"
+        )
+        filtered_table = value_filter.filter(pairs)
 
         # Handle the return_date attribute for each PERSON_ID using window functions
-        if self.return_date == "first":
-            filtered_table = First(reduce=False).aggregate(filtered_table)
-        elif self.return_date == "last":
-            filtered_table = Last(reduce=False).aggregate(filtered_table)
+        filtered_table = self._select_date(filtered_table)
 
         if self.return_value is not None:
             filtered_table = self.return_value.aggregate(filtered_table)
@@ -165,3 +143,70 @@ class MeasurementChangePhenotype(Phenotype):
         filtered_table = filtered_table.mutate(BOOLEAN=True)
         filtered_table = select_phenotype_columns(filtered_table)
         return filtered_table.distinct()
+
+    def _get_change_bounds(self):
+        """
+        Bounds on the change (second value minus first value), with a decrease expressed as a negative change.
+        """
+        if self.direction == "increase":
+            return self.min_change, self.max_change
+        max_change = None
+        if self.min_change:
+            max_change = Value(
+                operator=self.min_change.operator.replace(">", "<"),
+                value=-self.min_change.value,
+            )
+        min_change = None
+        if self.max_change:
+            min_change = Value(
+                operator=self.max_change.operator.replace("<", ">"),
+                value=-self.max_change.value,
+            )
+        return min_change, max_change
+
+    def _get_candidates(
+        self, measurements, keys, min_change, max_change, min_days, max_days
+    ):
+        """
+        Keep the measurements that may be the selected component of a qualifying pair. For each measurement, the minimum and maximum value of its partners (the measurements min_days to max_days before it when component_date_select='second', after it when 'first') are tracked in a range-framed window. This bounds the change it can take part in. With at most one bound on the change, this check is exact; with both, it only prunes.
+        """
+        if self.component_date_select == "second":
+            frame = (None if max_days is None else -max_days, -min_days)
+        else:
+            frame = (min_days, max_days)
+        window = ibis.window(
+            group_by=keys, order_by=measurements._DAY_NUMBER, range=frame
+        )
+        partner_min = measurements.VALUE.min().over(window)
+        partner_max = measurements.VALUE.max().over(window)
+        value = measurements.VALUE
+        if self.component_date_select == "second":
+            largest_change, smallest_change = value - partner_min, value - partner_max
+        else:
+            largest_change, smallest_change = partner_max - value, partner_min - value
+        candidates = measurements.mutate(
+            _N_PARTNERS=measurements._DAY_NUMBER.count().over(window),
+            _LARGEST_CHANGE=largest_change,
+            _SMALLEST_CHANGE=smallest_change,
+        )
+        candidates = candidates.filter(candidates._N_PARTNERS > 0)
+        if min_change is not None:
+            candidates = ValueFilter(
+                min_value=min_change, column_name="_LARGEST_CHANGE"
+            ).filter(candidates)
+        if max_change is not None:
+            candidates = ValueFilter(
+                max_value=max_change, column_name="_SMALLEST_CHANGE"
+            ).filter(candidates)
+        return candidates.drop("_N_PARTNERS", "_LARGEST_CHANGE", "_SMALLEST_CHANGE")
+
+    def _select_date(self, table):
+        if self.return_date == "first":
+            return First(reduce=False).aggregate(table)
+        elif self.return_date == "last":
+            return Last(reduce=False).aggregate(table)
+        return table
+
+    def _empty_table(self, measurements):
+        table = measurements.filter(ibis.literal(False)).mutate(BOOLEAN=True)
+        return select_phenotype_columns(table)
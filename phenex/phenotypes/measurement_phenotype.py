@@ -106,13 +106,17 @@ class MeasurementPhenotype(CodelistPhenotype):
         # perform value aggreation
         # perform value filter
         # perform value and dateaggregation
-        code_table = tables[self.domain]
+        code_table, date_range_pushed_down = self._perform_date_pushdown(
+            tables[self.domain]
+        )
         code_table = self._perform_codelist_filtering(code_table, tables)
         code_table = self._perform_categorical_filtering(code_table, tables)
         code_table = self._perform_null_value_filtering(code_table)
         code_table = self._perform_value_casting(code_table)
         code_table = self._perform_nonphysiological_value_filtering(code_table)
-        code_table = self._perform_time_filtering(code_table)
+        code_table = self._perform_time_filtering(
+            code_table, include_date_range=not date_range_pushed_down
+        )
         code_table = self._perform_date_selection(code_table)
         code_table = self._perform_value_aggregation(code_table)
         code_table = self._perform_value_filtering(code_table)
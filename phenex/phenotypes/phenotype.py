@@ -8,6 +8,7 @@ from phenex.tables import (
     is_phenex_phenotype_table,
 )
 from phenex.util import create_logger
+from phenex.util.person_set import PersonSet
 from phenex.util.serialization.to_dict import to_dict
 from phenex.node import Node
 
@@ -88,6 +89,28 @@ class Phenotype(Node):
             new_column_names["INDEX_DATE"] = "INDEX_DATE"
         return self.table.rename(new_column_names)
 
+    @property
+    def person_set(self) -> PersonSet:
+        """
+        The distinct PERSON_IDs of the phenotype table as a compressed, in-memory PersonSet. It is fetched from the database on first access and cached until the phenotype is executed again, so that set algebra between phenotypes (intersections, differences, counts) needs no further SQL joins.
+
+        Returns:
+            person_set (PersonSet): The patients fulfilling the phenotype.
+        """
+        if self.table is None:
+            raise ValueError("Phenotype has not been executed yet.")
+        if getattr(self, "_person_set_table", None) is not self.table:
+            self._person_set = PersonSet.from_table(self.table)
+            self._person_set_table = self.table
+        return self._person_set
+
+    @property
+    def has_one_row_per_index(self) -> bool:
+        """
+        Whether the phenotype table is guaranteed to have at most one row per (PERSON_ID, INDEX_DATE). Such phenotypes can be pivoted into a wide table without changing the result of joining them (see ComputationGraphPhenotype.use_leaf_matrix). Conservatively False unless a subclass knows better.
+        """
+        return False
+
     def _execute(self, tables: Dict[str, Table]):
         """
         Executes the phenotype processing logic.
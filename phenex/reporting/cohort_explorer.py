@@ -15,6 +15,7 @@ Usage:
     explorer.to_html("output/dashboard.html")  # Export to HTML
 """
 
+import ibis
 import numpy as np
 import pandas as pd
 from typing import Optional, Dict, List, Any
@@ -71,6 +72,7 @@ class CohortExplorer(Reporter):
         show_correlation: bool = True,
         show_phenotype_explorer: bool = True,
         show_counts: bool = True,
+        max_sample_rows: Optional[int] = 100_000,
     ):
         """
         Initialize Interactive Cohort Explorer.
@@ -85,6 +87,7 @@ class CohortExplorer(Reporter):
             show_correlation: Include correlation heatmap (default: True)
             show_phenotype_explorer: Include interactive phenotype explorer (default: True)
             show_counts: Include counts table for inclusion/exclusion criteria (default: True)
+            max_sample_rows: Histograms, timelines and correlations are computed in the database as grouped aggregates. Raw rows are only fetched if this is not possible (e.g. the backend does not support an aggregate); a table is then fetched as a random sample of at most max_sample_rows rows. None fetches all rows (default: 100,000)
         """
         super().__init__(decimal_places=decimal_places)
         self.title = title
@@ -97,6 +100,7 @@ class CohortExplorer(Reporter):
         self.show_correlation = show_correlation
         self.show_phenotype_explorer = show_phenotype_explorer
         self.show_counts = show_counts
+        self.max_sample_rows = max_sample_rows
 
         # Data containers
         self.cohort = None
@@ -188,20 +192,38 @@ class CohortExplorer(Reporter):
                     )
                     continue
 
-                # Convert to pandas DataFrame for analysis
-                if hasattr(phenotype.table, "to_pandas"):
-                    df = phenotype.table.to_pandas()
+                table = phenotype.table
+                if isinstance(table, pd.DataFrame):
+                    n_patients = (
+                        table["PERSON_ID"].nunique()
+                        if "PERSON_ID" in table.columns
+                        else 0
+                    )
+                    n_events = len(table)
                 else:
-                    df = phenotype.table
+                    n_patients, n_events = self._count_patients_and_events(table)
 
-                if len(df) == 0:
+                if n_events == 0:
                     logger.warning(
                         f"Phenotype {phenotype.name} has empty table - skipping"
                     )
                     continue
 
                 # Pre-compute all visualization types for this phenotype
-                viz_data = self._compute_phenotype_visualizations(df, phenotype)
+                if isinstance(table, pd.DataFrame):
+                    viz_data = self._compute_phenotype_visualizations(table, phenotype)
+                else:
+                    try:
+                        viz_data = self._compute_phenotype_visualizations_in_database(
+                            table, phenotype
+                        )
+                    except Exception as e:
+                        logger.debug(
+                            f"Could not aggregate {phenotype.name} in the database, using a sample: {e}"
+                        )
+                        viz_data = self._compute_phenotype_visualizations(
+                            self._to_pandas(table), phenotype
+                        )
 
                 # Determine phenotype role
                 role = self._get_phenotype_role(phenotype)
@@ -210,17 +232,15 @@ class CohortExplorer(Reporter):
                     "display_name": getattr(phenotype, "display_name", phenotype.name),
                     "type": type(phenotype).__name__,
                     "role": role,
-                    "n_patients": (
-                        df["PERSON_ID"].nunique() if "PERSON_ID" in df.columns else 0
-                    ),
-                    "n_events": len(df),
+                    "n_patients": n_patients,
+                    "n_events": n_events,
                     "has_values": len(viz_data["value_hist"]["values"]) > 0,
                     "has_dates": len(viz_data["timeline"]["x"]) > 0,
                     "viz_data": viz_data,
                 }
 
                 logger.debug(
-                    f"Processed {phenotype.name}: {len(df)} events, "
+                    f"Processed {phenotype.name}: {n_events} events, "
                     f"values={self.phenotype_data[phenotype.name]['has_values']}, "
                     f"dates={self.phenotype_data[phenotype.name]['has_dates']}"
                 )
@@ -265,18 +285,7 @@ class CohortExplorer(Reporter):
         This is key to working JavaScript callbacks - all data is computed
         in Python and passed to JavaScript via CustomJS args.
         """
-        viz_data = {
-            "value_hist": {
-                "values": [],
-                "counts": [],
-                "labels": [],
-                "is_categorical": False,
-            },
-            "value_hist_std": {"values": [], "counts": []},
-            "timeline": {"x": [], "y": []},
-            "relative_time": {"values": [], "counts": []},
-            "summary": {"mean": 0, "std": 0, "min": 0, "max": 0, "count": 0},
-        }
+        viz_data = self._empty_visualizations()
 
         # 1. VALUE COLUMN HISTOGRAM (main visualization)
         if "VALUE" in df.columns:
@@ -403,10 +412,7 @@ class CohortExplorer(Reporter):
                     and entry_criterion.table is not None
                 ):
                     # Get entry criterion table
-                    if hasattr(entry_criterion.table, "to_pandas"):
-                        entry_df = entry_criterion.table.to_pandas()
-                    else:
-                        entry_df = entry_criterion.table
+                    entry_df = self._to_pandas(entry_criterion.table)
 
                     # Ensure we have required columns
                     if (
@@ -464,6 +470,202 @@ class CohortExplorer(Reporter):
 
         return viz_data
 
+    def _empty_visualizations(self) -> Dict[str, Any]:
+        return {
+            "value_hist": {
+                "values": [],
+                "counts": [],
+                "labels": [],
+                "is_categorical": False,
+            },
+            "value_hist_std": {"values": [], "counts": []},
+            "timeline": {"x": [], "y": []},
+            "relative_time": {"values": [], "counts": []},
+            "summary": {"mean": 0, "std": 0, "min": 0, "max": 0, "count": 0},
+        }
+
+    def _to_pandas(self, table) -> pd.DataFrame:
+        """Fetch a table, or a random sample of at most max_sample_rows rows of it."""
+        if isinstance(table, pd.DataFrame):
+            return table
+        if self.max_sample_rows is not None:
+            n_rows = table.count().execute()
+            if n_rows > self.max_sample_rows:
+                logger.info(
+                    f"Sampling {self.max_sample_rows} of {n_rows} rows for the cohort explorer"
+                )
+                table = table.sample(self.max_sample_rows / n_rows, seed=0).limit(
+                    self.max_sample_rows
+                )
+        return table.to_pandas()
+
+    def _count_patients_and_events(self, table):
+        if "PERSON_ID" not in table.columns:
+            return 0, table.count().execute()
+        df = table.aggregate(
+            N_PATIENTS=table.PERSON_ID.nunique(), N_EVENTS=table.count()
+        ).execute()
+        return int(df.N_PATIENTS[0]), int(df.N_EVENTS[0])
+
+    def _histogram_in_database(self, values, lower, upper, n_bins):
+        """
+        Count the values of a single column table in n_bins equal-width bins between lower and upper, the last bin being closed, as np.histogram does. Returns the bin centers and counts.
+        """
+        if lower == upper:
+            lower, upper = lower - 0.5, upper + 0.5
+        width = (upper - lower) / n_bins
+        bins = ibis.least(
+            ((values.X - lower) / width).floor().cast("int64"), n_bins - 1
+        )
+        df = values.group_by(BIN=bins).aggregate(N=values.count()).execute()
+        counts = np.zeros(n_bins, dtype=int)
+        counts[df.BIN.astype(int).to_numpy()] = df.N.to_numpy()
+        edges = np.linspace(lower, upper, n_bins + 1)
+        return ((edges[:-1] + edges[1:]) / 2).tolist(), counts.tolist()
+
+    def _compute_phenotype_visualizations_in_database(
+        self, table, phenotype
+    ) -> Dict[str, Any]:
+        """
+        Compute the same visualization data as _compute_phenotype_visualizations, but as grouped aggregates in the database, so that only the bin counts are fetched rather than the phenotype table.
+        """
+        viz_data = self._empty_visualizations()
+
+        # 1. VALUE COLUMN HISTOGRAM (main visualization)
+        if "VALUE" in table.columns:
+            values = table.filter(table.VALUE.notnull())
+            value_type = table.VALUE.type()
+            is_categorical = not value_type.is_numeric()
+            if value_type.is_numeric():
+                x = values.VALUE.cast("float64")
+                stats = values.aggregate(
+                    COUNT=values.count(),
+                    N_UNIQUE=values.VALUE.nunique(),
+                    N_NON_INTEGER=(x != x.floor()).cast("int64").sum(),
+                    MIN=x.min(),
+                    MAX=x.max(),
+                    MEAN=x.mean(),
+                    STD=x.std(),
+                ).execute()
+                stats = stats.iloc[0]
+                # Discrete data with few unique values is treated as categorical
+                is_categorical = (
+                    stats.COUNT > 0
+                    and stats.N_UNIQUE < 15
+                    and (pd.isna(stats.N_NON_INTEGER) or stats.N_NON_INTEGER == 0)
+                )
+
+            if is_categorical:
+                value_counts = (
+                    values.group_by("VALUE")
+                    .aggregate(N=values.count())
+                    .order_by("VALUE")
+                    .execute()
+                )
+                if len(value_counts) > 0:
+                    viz_data["value_hist"] = {
+                        "values": list(range(len(value_counts))),
+                        "counts": value_counts.N.tolist(),
+                        "labels": [str(label) for label in value_counts.VALUE],
+                        "is_categorical": True,
+                    }
+                    viz_data["summary"] = {
+                        "mean": 0,
+                        "std": 0,
+                        "min": 0,
+                        "max": 0,
+                        "count": int(value_counts.N.sum()),
+                        "n_categories": len(value_counts),
+                    }
+            elif stats.COUNT > 0:
+                x_table = values.select(X=x)
+                n_unique = int(stats.N_UNIQUE)
+                n_bins = min(25, n_unique if n_unique < 50 else 25)
+                centers, counts = self._histogram_in_database(
+                    x_table, stats.MIN, stats.MAX, n_bins
+                )
+                viz_data["value_hist"] = {
+                    "values": centers,
+                    "counts": counts,
+                    "labels": [],
+                    "is_categorical": False,
+                }
+
+                # Standardized histogram (0-1 scale for cross-phenotype comparison)
+                if not pd.isna(stats.STD) and stats.STD > 0:
+                    _, counts_std = self._histogram_in_database(
+                        x_table, stats.MIN, stats.MAX, 20
+                    )
+                    edges_std = np.linspace(0, 1, 21)
+                    viz_data["value_hist_std"] = {
+                        "values": ((edges_std[:-1] + edges_std[1:]) / 2).tolist(),
+                        "counts": counts_std,
+                    }
+
+                viz_data["summary"] = {
+                    "mean": float(stats.MEAN),
+                    "std": float(stats.STD) if not pd.isna(stats.STD) else np.nan,
+                    "min": float(stats.MIN),
+                    "max": float(stats.MAX),
+                    "count": int(stats.COUNT),
+                }
+
+        if "EVENT_DATE" not in table.columns:
+            return viz_data
+
+        # 2. TIMELINE VISUALIZATION (events per month)
+        dates = table.filter(table.EVENT_DATE.notnull())
+        monthly = (
+            dates.group_by(MONTH=dates.EVENT_DATE.truncate("M"))
+            .aggregate(N=dates.count())
+            .order_by("MONTH")
+            .execute()
+        )
+        if len(monthly) > 0:
+            viz_data["timeline"] = {
+                # milliseconds since epoch for JavaScript/Bokeh datetime compatibility
+                "x": [pd.Timestamp(month).value // 1000000 for month in monthly.MONTH],
+                "y": monthly.N.tolist(),
+            }
+
+        # 3. TIME RELATIVE TO INDEX (if entry criterion available)
+        entry_criterion = getattr(self.cohort, "entry_criterion", None)
+        entry_table = getattr(entry_criterion, "table", None)
+        if (
+            entry_table is not None
+            and "PERSON_ID" in table.columns
+            and "EVENT_DATE" in entry_table.columns
+        ):
+            entry_table = entry_table.select(
+                PERSON_ID=entry_table.PERSON_ID,
+                INDEX_DATE=entry_table.EVENT_DATE,
+            )
+            entry_table = entry_table.filter(entry_table.INDEX_DATE.notnull())
+            joined = dates.select("PERSON_ID", "EVENT_DATE").join(
+                entry_table, "PERSON_ID"
+            )
+            days = joined.select(
+                X=joined.EVENT_DATE.cast("date").delta(
+                    joined.INDEX_DATE.cast("date"), "day"
+                )
+            )
+            stats = days.aggregate(
+                COUNT=days.count(),
+                N_UNIQUE=days.X.nunique(),
+                MIN=days.X.min(),
+                MAX=days.X.max(),
+            ).execute()
+            stats = stats.iloc[0]
+            if stats.COUNT > 0:
+                n_unique = int(stats.N_UNIQUE)
+                n_bins = min(30, n_unique if n_unique < 50 else 30)
+                centers, counts = self._histogram_in_database(
+                    days, float(stats.MIN), float(stats.MAX), n_bins
+                )
+                viz_data["relative_time"] = {"values": centers, "counts": counts}
+
+        return viz_data
+
     def _generate_waterfall_data(self):
         """Generate waterfall/attrition analysis data."""
         try:
@@ -531,37 +733,60 @@ class CohortExplorer(Reporter):
             if not self.cohort.characteristics:
                 return pd.DataFrame()
 
-            # Collect numeric characteristic data
-            char_data = {}
+            # One value per patient and numeric characteristic, stacked
+            names, tables = [], []
             for char in self.cohort.characteristics:
                 if not hasattr(char, "table") or char.table is None:
                     continue
+                table = char.table
+                if "VALUE" not in table.columns or "PERSON_ID" not in table.columns:
+                    continue
+                if not table.VALUE.type().is_numeric():
+                    continue
+                tables.append(
+                    table.filter(table.VALUE.notnull()).select(
+                        PERSON_ID=table.PERSON_ID,
+                        _CHARACTERISTIC=ibis.literal(len(names), type="int64"),
+                        VALUE=table.VALUE.cast("float64"),
+                    )
+                )
+                names.append(char.name)
 
-                df = char.table.to_pandas()
-
-                if "VALUE" in df.columns and "PERSON_ID" in df.columns:
-                    # Try to convert to numeric
-                    values = pd.to_numeric(df["VALUE"], errors="coerce")
-                    if values.notna().sum() > 0:
-                        # Take first value per patient
-                        char_values = df.groupby("PERSON_ID")["VALUE"].first()
-                        char_values = pd.to_numeric(
-                            char_values, errors="coerce"
-                        ).dropna()
-                        if len(char_values) > 0:
-                            char_data[char.name] = char_values
-
-            if len(char_data) < 2:
+            if len(names) < 2:
                 logger.info("Not enough numeric characteristics for correlation matrix")
                 return pd.DataFrame()
 
-            # Create DataFrame and compute correlations
-            df_chars = pd.DataFrame(char_data)
-            corr_matrix = df_chars.corr()
+            # Pivot to one column per characteristic (the smallest value if a patient
+            # has several) and compute all pairwise correlations in one aggregate
+            stacked = ibis.union(*tables)
+            wide = stacked.group_by("PERSON_ID").aggregate(
+                **{
+                    f"_V{i}": stacked.VALUE.min(where=stacked._CHARACTERISTIC == i)
+                    for i in range(len(names))
+                }
+            )
+            aggregates = {f"_N{i}": wide[f"_V{i}"].count() for i in range(len(names))}
+            for i in range(len(names)):
+                for j in range(i, len(names)):
+                    aggregates[f"_C{i}_{j}"] = wide[f"_V{i}"].corr(
+                        wide[f"_V{j}"], how="pop"
+                    )
+            result = wide.aggregate(**aggregates).execute().iloc[0]
 
-            logger.debug(
-                f"Computed correlation matrix for {len(char_data)} characteristics"
+            keep = [i for i in range(len(names)) if result[f"_N{i}"] > 0]
+            if len(keep) < 2:
+                logger.info("Not enough numeric characteristics for correlation matrix")
+                return pd.DataFrame()
+            corr_matrix = pd.DataFrame(
+                np.nan, index=[names[i] for i in keep], columns=[names[i] for i in keep]
             )
+            for i in keep:
+                for j in keep:
+                    value = result[f"_C{min(i, j)}_{max(i, j)}"]
+                    corr_matrix.loc[names[i], names[j]] = (
+                        np.nan if pd.isna(value) else float(value)
+                    )
+            logger.debug(f"Computed correlation matrix for {len(keep)} characteristics")
             return corr_matrix
 
         except Exception as e:
@@ -1188,13 +1413,21 @@ class CohortExplorer(Reporter):
                 hasattr(self.cohort, "index_table")
                 and self.cohort.index_table is not None
             ):
-                if hasattr(self.cohort.index_table, "to_pandas"):
-                    df = self.cohort.index_table.to_pandas()
-                else:
-                    df = self.cohort.index_table
-
-                if "INDEX_DATE" in df.columns:
-                    dates = pd.to_datetime(df["INDEX_DATE"], errors="coerce").dropna()
+                index_table = self.cohort.index_table
+                if "INDEX_DATE" in index_table.columns:
+                    if isinstance(index_table, pd.DataFrame):
+                        dates = pd.to_datetime(
+                            index_table["INDEX_DATE"], errors="coerce"
+                        ).dropna()
+                        dates = pd.Series([dates.min(), dates.max()]).dropna()
+                    else:
+                        dates = index_table.aggregate(
+                            MIN=index_table.INDEX_DATE.min(),
+                            MAX=index_table.INDEX_DATE.max(),
+                        ).execute()
+                        dates = pd.to_datetime(
+                            pd.Series([dates.MIN[0], dates.MAX[0]])
+                        ).dropna()
                     if len(dates) > 0:
                         min_date = dates.min().strftime("%Y-%m-%d")
                         max_date = dates.max().strftime("%Y-%m-%d")
@@ -41,9 +41,29 @@ class Reporter:
         """Name of the reporter, used for identification and output file naming."""
         return self._name or self.__class__.__name__
 
+    # Results of execute() besides self.df that the export methods need
+    _result_attributes = ()
+
     def to_dict(self) -> dict:
         return _to_dict(self)
 
+    def get_results(self) -> Dict[str, Any]:
+        """
+        Return the results of the last call to execute(): self.df and the attributes named in _result_attributes. With set_results(), this allows persisting an executed report (e.g. the reporter nodes of a cohort under lazy execution) and restoring it without executing the reporter again.
+        """
+        return {
+            attr: getattr(self, attr, None)
+            for attr in ("df",) + tuple(self._result_attributes)
+        }
+
+    def set_results(self, cohort, results: Dict[str, Any]):
+        """
+        Restore results returned by get_results() for the given cohort, as if execute(cohort) had been called.
+        """
+        self.cohort = cohort
+        for attr, value in results.items():
+            setattr(self, attr, value)
+
     def execute(self, cohort) -> Union[pd.DataFrame, Dict[str, Any]]:
         """
         Execute the reporter analysis on a cohort.
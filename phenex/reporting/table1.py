@@ -1,3 +1,4 @@
+import ibis
 import pandas as pd
 
 from phenex.reporting.reporter import Reporter
@@ -46,6 +47,8 @@ class Table1(Reporter):
             expansion.  Set to a large number (e.g. 100) to include all levels.
     """
 
+    _result_attributes = ("_value_distributions", "characteristic_sections")
+
     def __init__(self, include_component_phenotypes_level=None, **kwargs):
         super().__init__(**kwargs)
         self.include_component_phenotypes_level = include_component_phenotypes_level
@@ -174,20 +177,51 @@ class Table1(Reporter):
     def _get_categorical_characteristics(self):
         return [x for x in self._phenotypes if x.output_display_type == "categorical"]
 
-    def _get_boolean_count_for_phenotype(self, phenotype):
-        result = (
-            phenotype.table.select(["PERSON_ID", "BOOLEAN"])
-            .distinct()["BOOLEAN"]
-            .sum()
-            .execute()
-        )
-        # Return 0 if result is None or NaN (no rows with BOOLEAN=True)
+    @staticmethod
+    def _union_by_phenotype(tables):
+        """
+        Stack (UNION ALL) the given tables into one, tagging the rows of the i-th table with _PHENOTYPE = i, so that the statistics of all phenotypes can be computed by a single grouped aggregation.
+        """
+        tagged = [
+            t.mutate(_PHENOTYPE=ibis.literal(i, type="int64"))
+            for i, t in enumerate(tables)
+        ]
+        return ibis.union(*tagged) if len(tagged) > 1 else tagged[0]
+
+    @staticmethod
+    def _distinct_values(phenotype):
+        """
+        The VALUE of each distinct (PERSON_ID, VALUE) pair of a value phenotype, as float.
+        """
+        # Cast VALUE to float to avoid integer-overflow in variance/std
+        # computations on fixed-precision backends (e.g. Snowflake computes
+        # SUM(VALUE^2), which overflows NUMBER(38,0) for large values).
         return (
-            0
-            if result is None or (isinstance(result, float) and pd.isna(result))
-            else int(result)
+            phenotype.table.select(["PERSON_ID", "VALUE"])
+            .distinct()
+            .select(VALUE=_.VALUE.cast("float64"))
         )
 
+    def _get_boolean_counts(self, phenotypes):
+        """
+        Get the number of patients with BOOLEAN = True for each of the given phenotypes in one query.
+        """
+        table = self._union_by_phenotype(
+            [
+                pt.table.select(["PERSON_ID", "BOOLEAN"])
+                .distinct()
+                .select(BOOLEAN=_.BOOLEAN.cast("boolean"))
+                for pt in phenotypes
+            ]
+        )
+        df = table.group_by("_PHENOTYPE").aggregate(N=table.BOOLEAN.sum()).execute()
+        counts = df.set_index("_PHENOTYPE")["N"]
+        # phenotypes without any row with BOOLEAN=True have a count of 0
+        return [
+            int(counts[i]) if i in counts.index and not pd.isna(counts[i]) else 0
+            for i in range(len(phenotypes))
+        ]
+
     def _report_boolean_columns(self):
         # get list of all boolean columns
         boolean_phenotypes = self._get_boolean_characteristics()
@@ -198,10 +232,7 @@ class Table1(Reporter):
             return None
         # get count of 'Trues' in the boolean columns i.e. the phenotype counts
         df_t1 = pd.DataFrame()
-        df_t1["N"] = [
-            self._get_boolean_count_for_phenotype(phenotype)
-            for phenotype in boolean_phenotypes
-        ]
+        df_t1["N"] = self._get_boolean_counts(boolean_phenotypes)
         df_t1.index = [x.display_name for x in boolean_phenotypes]
         df_t1["inex_order"] = [
             self.cohort_names_in_order.index(x.name) for x in boolean_phenotypes
@@ -218,35 +249,35 @@ class Table1(Reporter):
         if len(value_phenotypes) == 0:
             return None
 
-        names = []
-        dfs = []
-        for phenotype in value_phenotypes:
-            _table = phenotype.table.select(["PERSON_ID", "VALUE"]).distinct()
-            # Cast VALUE to float to avoid integer-overflow in variance/std
-            # computations on fixed-precision backends (e.g. Snowflake computes
-            # SUM(VALUE^2), which overflows NUMBER(38,0) for large values).
-            _value = _table["VALUE"].cast("float64")
-            d = {
-                "N": self._get_boolean_count_for_phenotype(phenotype),
-                "Mean": _value.mean().execute(),
-                "STD": _value.std().execute(),
-                "Min": _value.min().execute(),
-                "P10": _value.quantile(0.10).execute(),
-                "P25": _value.quantile(0.25).execute(),
-                "Median": _value.median().execute(),
-                "P75": _value.quantile(0.75).execute(),
-                "P90": _value.quantile(0.90).execute(),
-                "Max": _value.max().execute(),
-                "inex_order": self.cohort_names_in_order.index(phenotype.name),
-                "_level": getattr(phenotype, "_level", 0),
-            }
-            dfs.append(pd.DataFrame.from_dict([d]))
-            names.append(phenotype.display_name)
-        if len(dfs) == 1:
-            df = dfs[0]
-        else:
-            df = pd.concat(dfs)
-        df.index = names
+        table = self._union_by_phenotype(
+            [self._distinct_values(pt) for pt in value_phenotypes]
+        )
+        _value = table["VALUE"]
+        df_stats = (
+            table.group_by("_PHENOTYPE")
+            .aggregate(
+                Mean=_value.mean(),
+                STD=_value.std(),
+                Min=_value.min(),
+                P10=_value.quantile(0.10),
+                P25=_value.quantile(0.25),
+                Median=_value.median(),
+                P75=_value.quantile(0.75),
+                P90=_value.quantile(0.90),
+                Max=_value.max(),
+            )
+            .execute()
+            .set_index("_PHENOTYPE")
+            .reindex(range(len(value_phenotypes)))
+        )
+        df = pd.DataFrame({"N": self._get_boolean_counts(value_phenotypes)})
+        for column in df_stats.columns:
+            df[column] = df_stats[column].values
+        df["inex_order"] = [
+            self.cohort_names_in_order.index(x.name) for x in value_phenotypes
+        ]
+        df["_level"] = [getattr(x, "_level", 0) for x in value_phenotypes]
+        df.index = [x.display_name for x in value_phenotypes]
         return df
 
     def _report_categorical_columns(self):
@@ -256,26 +287,46 @@ class Table1(Reporter):
         )
         if len(categorical_phenotypes) == 0:
             return None
+
+        # Get counts for each category, in one query per VALUE type so that the
+        # category labels are formatted exactly as the values of each phenotype.
+        cat_counts = {}
+        by_type = {}
+        for i, phenotype in enumerate(categorical_phenotypes):
+            value_type = str(phenotype.table.schema()["VALUE"])
+            by_type.setdefault(value_type, []).append(i)
+        for indices in by_type.values():
+            table = self._union_by_phenotype(
+                [
+                    categorical_phenotypes[i]
+                    .table.select(["PERSON_ID", "VALUE"])
+                    .distinct()
+                    .select("VALUE")
+                    for i in indices
+                ]
+            )
+            df = (
+                table.group_by(["_PHENOTYPE", "VALUE"]).aggregate(N=_.count()).execute()
+            )
+            for j, i in enumerate(indices):
+                cat_counts[i] = df[df["_PHENOTYPE"] == j]
+
         dfs = []
         names = []
-        for phenotype in categorical_phenotypes:
+        for i, phenotype in enumerate(categorical_phenotypes):
             name = phenotype.display_name
-            _table = phenotype.table.select(["PERSON_ID", "VALUE"])
-            # Get counts for each category.
             # Keep the raw VALUE (which may carry a "NNNN_" sort prefix from
             # BinPhenotype) in the index so that the final sort_values("Name")
             # in execute() orders bins correctly. The prefix is stripped there.
-            cat_counts = (
-                _table.distinct().group_by("VALUE").aggregate(N=_.count()).execute()
-            )
-            cat_counts.index = [
-                f"{name}={v if v is not None else 'None'}" for v in cat_counts["VALUE"]
+            index = [
+                f"{name}={v if v is not None else 'None'}"
+                for v in cat_counts[i]["VALUE"]
             ]
-            _df = pd.DataFrame(cat_counts["N"])
+            _df = pd.DataFrame({"N": cat_counts[i]["N"].values}, index=index)
             _df["inex_order"] = self.cohort_names_in_order.index(phenotype.name)
             _df["_level"] = getattr(phenotype, "_level", 0)
             dfs.append(_df)
-            names.extend(cat_counts.index)
+            names.extend(index)
         if len(dfs) == 1:
             df = dfs[0]
         else:
@@ -289,43 +340,92 @@ class Table1(Reporter):
         Stores ``{"x": [...], "y": [...]}`` per phenotype where *y* is
         normalised so the peak equals 100.  This is far more compact than
         raw patient-level values and avoids binning decisions at display time.
+
+        The values are not fetched: the database returns the count of each
+        distinct value, or, for phenotypes with more than N_BINS distinct values,
+        the counts of N_BINS equal-width bins. The curves are the sums of the
+        Gaussian kernels (with the bandwidth gaussian_kde would choose) at these
+        values, weighted by the counts, which is exactly the gaussian_kde curve
+        for counts per distinct value.
         """
         import numpy as np
-        from scipy.stats import gaussian_kde
 
         N_POINTS = 200
+        N_BINS = 1024
         PADDING = 0.10  # 10% range padding on each side
 
         value_phenotypes = self._get_value_characteristics()
-        distributions = {}
-        for phenotype in value_phenotypes:
-            try:
-                values = np.array(
-                    phenotype.table.select(["PERSON_ID", "VALUE"])
-                    .distinct()["VALUE"]
-                    .execute()
-                    .dropna()
-                    .tolist(),
-                    dtype=float,
+        if len(value_phenotypes) == 0:
+            return {}
+        try:
+            values = [
+                self._distinct_values(pt).filter(_.VALUE.notnull())
+                for pt in value_phenotypes
+            ]
+            table = self._union_by_phenotype(values)
+            _value = table["VALUE"]
+            _nearest_integer = _value.round(0)
+            df_stats = (
+                table.group_by("_PHENOTYPE")
+                .aggregate(
+                    N=_value.count(),
+                    N_UNIQUE=_value.nunique(),
+                    N_NON_INTEGER=(
+                        (_value - _nearest_integer).abs()
+                        > 1e-8 + 1e-5 * _nearest_integer.abs()
+                    )
+                    .cast("int64")
+                    .sum(),
+                    VAR=_value.var(),
+                    Min=_value.min(),
+                    Max=_value.max(),
                 )
-                if len(values) < 2:
-                    continue
-                # For integer-valued data, widen the bandwidth to avoid
-                # spiky peaks at each integer and produce smooth plateaus.
-                is_integer = np.allclose(values, np.round(values))
-                bw = 1.5 if is_integer else None
-                kde = gaussian_kde(values, bw_method=bw)
-                lo, hi = float(values.min()), float(values.max())
-                pad = (hi - lo) * PADDING if hi > lo else 1.0
-                x = np.linspace(lo - pad, hi + pad, N_POINTS)
-                y = kde(x)
-                y = y / y.max() * 100  # normalise peak to 100
-                distributions[phenotype.display_name] = {
-                    "x": np.round(x, 4).tolist(),
-                    "y": np.round(y, 2).tolist(),
-                }
-            except Exception:
-                pass
+                .execute()
+                .set_index("_PHENOTYPE")
+            )
+            # gaussian_kde needs at least two values with a non-zero variance
+            df_stats = df_stats[(df_stats.N >= 2) & (df_stats.VAR > 0)]
+            if len(df_stats) == 0:
+                return {}
+
+            # count per distinct value or per bin, for all phenotypes in one query
+            indices = list(df_stats.index)
+            binned = []
+            for i in indices:
+                stats = df_stats.loc[i]
+                x = values[i].VALUE
+                if stats.N_UNIQUE > N_BINS:
+                    lo = float(stats.Min)
+                    width = (float(stats.Max) - lo) / N_BINS
+                    bins = ibis.least(((x - lo) / width).floor(), N_BINS - 1)
+                    x = lo + (bins + 0.5) * width
+                binned.append(values[i].select(X=x))
+            table = self._union_by_phenotype(binned)
+            df_counts = (
+                table.group_by(["_PHENOTYPE", "X"]).aggregate(N=table.count()).execute()
+            )
+        except Exception as e:
+            logger.debug(f"Could not compute value distributions: {e}")
+            return {}
+
+        distributions = {}
+        for j, counts in df_counts.groupby("_PHENOTYPE"):
+            stats = df_stats.loc[indices[j]]
+            # For integer-valued data, widen the bandwidth to avoid
+            # spiky peaks at each integer and produce smooth plateaus.
+            is_integer = stats.N_NON_INTEGER == 0
+            factor = 1.5 if is_integer else stats.N ** (-1 / 5)  # Scott's rule
+            bandwidth = factor * np.sqrt(stats.VAR)
+            lo, hi = float(stats.Min), float(stats.Max)
+            pad = (hi - lo) * PADDING if hi > lo else 1.0
+            x = np.linspace(lo - pad, hi + pad, N_POINTS)
+            z = (x[:, None] - counts.X.to_numpy(dtype=float)[None, :]) / bandwidth
+            y = np.exp(-0.5 * z**2) @ counts.N.to_numpy(dtype=float)
+            y = y / y.max() * 100  # normalise peak to 100
+            distributions[value_phenotypes[indices[j]].display_name] = {
+                "x": np.round(x, 4).tolist(),
+                "y": np.round(y, 2).tolist(),
+            }
         return distributions
 
     def get_pretty_display(self) -> pd.DataFrame:
@@ -110,13 +110,8 @@ class Table2(Reporter):
         for phenotype in self.right_censor_phenotypes:
             phenotype.execute(cohort.subset_tables_index)
 
-        # Analyze each outcome at each time point
-        results_list = []
-        for outcome in self.outcomes:
-            for time_point in self.time_points:
-                result = self._calculate_aggregate_time_under_risk(outcome, time_point)
-                if result is not None:
-                    results_list.append(result)
+        # Analyze all outcomes at all time points in one query
+        results_list = self._calculate_aggregate_time_under_risk()
 
         # Combine results
         if results_list:
@@ -127,58 +122,112 @@ class Table2(Reporter):
         logger.info("Completed Table2 analysis")
         return self.df
 
-    def _calculate_aggregate_time_under_risk(
-        self, outcome: Phenotype, time_point: int
-    ) -> Optional[dict]:
+    def _calculate_aggregate_time_under_risk(self) -> List[dict]:
         """
-        Calculate the total time under risk for single outcome at a specific time point.
+        Calculate the total time under risk for all outcomes at all time points.
 
-        Expected input columns:
-        - cohort.table: PERSON_ID, EVENT_DATE (index date)
-        - outcome.table: PERSON_ID, EVENT_DATE (outcome event date)
-
-        Args:
-            outcome: Phenotype outcome to analyze
-            time_point: Number of days from index to analyze
+        Rather than one query per outcome and time point, the computation is done in long format: the censoring dates are resolved once per patient, the first post-index date of every outcome is stacked into one table (_OUTCOME, PERSON_ID, OUTCOME_DATE), and the (outcome, time point) grid is cross-joined as a small literal table. A single grouped aggregate then returns N_Events, N_Censored and the follow-up time of every grid cell.
 
         Returns:
-            Dictionary with aggregated analysis results, or None if no data available:
-            - "Outcome": str - Name of the outcome phenotype
-            - "Time_Point": int - Days from index date analyzed
-            - "N_Events": int - Number of events observed in the cohort
-            - "N_Censored": int - Number of patients censored before time_point
-            - "Time_Under_Risk": float - Total follow-up time in patient-years (rounded to decimal_places)
-            - "Incidence_Rate": float - Events per 100 patient-years (rounded to decimal_places)
+            List of dictionaries, one per outcome and time point with data (see _summarize_time_under_risk), ordered by outcome and time point.
         """
-        # Get per-patient followup data
-        followup_table = self._calculate_per_patient_time_under_risk(
-            outcome, time_point
+        if not self.outcomes:
+            return []
+        index_table = self._calculate_censoring(self._get_index_table())
+
+        # first post-index date of each outcome, stacked in long format
+        outcome_dates = None
+        for i, outcome in enumerate(self.outcomes):
+            outcome_table = outcome.table.select(["PERSON_ID", "EVENT_DATE"]).mutate(
+                _OUTCOME=ibis.literal(i, type="int64")
+            )
+            outcome_dates = (
+                outcome_table
+                if outcome_dates is None
+                else outcome_dates.union(outcome_table)
+            )
+        outcome_dates = outcome_dates.join(
+            index_table.select(["PERSON_ID", "INDEX_DATE"]), "PERSON_ID"
+        )
+        outcome_dates = (
+            outcome_dates.filter(outcome_dates.EVENT_DATE >= outcome_dates.INDEX_DATE)
+            .group_by(["PERSON_ID", "_OUTCOME"])
+            .aggregate(OUTCOME_DATE=_.EVENT_DATE.min())
         )
 
-        # Aggregate to get summary statistics
-        summary = followup_table.aggregate(
-            [
-                _.HAS_EVENT.sum().name("N_Events"),
-                _.IS_CENSORED.sum().name("N_Censored"),
-                _.FOLLOWUP_TIME.sum().name("Total_Followup_Days"),
-            ]
+        grid = ibis.memtable(
+            pd.DataFrame(
+                [
+                    (i, time_point)
+                    for i in range(len(self.outcomes))
+                    for time_point in self.time_points
+                ],
+                columns=["_OUTCOME", "TIME_POINT"],
+            )
+        )
+        followup_table = index_table.join(grid, how="cross")
+        followup_table = followup_table.left_join(
+            outcome_dates, ["PERSON_ID", "_OUTCOME"]
+        ).select(followup_table.columns + ["OUTCOME_DATE"])
+        followup_table = followup_table.mutate(
+            DAYS_TO_EVENT=(
+                followup_table.OUTCOME_DATE.cast("date")
+                - followup_table.INDEX_DATE.cast("date")
+            ).cast(int)
+        )
+        followup_table = self._calculate_followup(
+            followup_table, followup_table.TIME_POINT
         )
 
-        # Convert to pandas only at the very end for final calculations
-        summary_df = summary.execute()
+        summary_df = (
+            followup_table.group_by(["_OUTCOME", "TIME_POINT"])
+            .aggregate(
+                N_Events=_.HAS_EVENT.sum(),
+                N_Censored=_.IS_CENSORED.sum(),
+                Total_Followup_Days=_.FOLLOWUP_TIME.sum(),
+            )
+            .execute()
+            .set_index(["_OUTCOME", "TIME_POINT"])
+        )
 
-        if len(summary_df) == 0:
-            logger.warning(f"No data for {outcome.name} at {time_point} days")
-            return None
+        results = []
+        for i, outcome in enumerate(self.outcomes):
+            for time_point in self.time_points:
+                if (i, time_point) not in summary_df.index:
+                    logger.warning(f"No data for {outcome.name} at {time_point} days")
+                    continue
+                row = summary_df.loc[(i, time_point)]
+                results.append(
+                    self._summarize_time_under_risk(
+                        outcome,
+                        time_point,
+                        int(row["N_Events"]),
+                        int(row["N_Censored"]),
+                        float(row["Total_Followup_Days"]),
+                    )
+                )
+        return results
 
-        row = summary_df.iloc[0]
-        if pd.isna(row["N_Events"]) or pd.isna(row["N_Censored"]):
-            logger.warning(f"No patients for {outcome.name} at {time_point} days")
-            return None
-        n_events = int(row["N_Events"])
-        n_censored = int(row["N_Censored"])
-        total_followup_days = float(row["Total_Followup_Days"])
+    def _summarize_time_under_risk(
+        self,
+        outcome: Phenotype,
+        time_point: int,
+        n_events: int,
+        n_censored: int,
+        total_followup_days: float,
+    ) -> dict:
+        """
+        Convert the aggregated counts of a single outcome at a specific time point into patient-years and incidence rates.
 
+        Returns:
+            Dictionary with aggregated analysis results:
+            - "Outcome": str - Name of the outcome phenotype
+            - "Time_Point": int - Days from index date analyzed
+            - "N_Events": int - Number of events observed in the cohort
+            - "N_Censored": int - Number of patients censored before time_point
+            - "Time_Under_Risk": float - Total follow-up time in patient-years (rounded to decimal_places)
+            - "Incidence_Rate": float - Events per 100 patient-years (rounded to decimal_places)
+        """
         # Convert to patient-years and calculate incidence rates
         time_years = total_followup_days / 365.25
         time_patient_months = total_followup_days / 30.4375
@@ -232,6 +281,23 @@ class Table2(Reporter):
         Returns:
             Ibis table with per-patient followup data
         """
+        index_table = self._get_index_table()
+
+        # Calculate time to first outcome event
+        index_table = self._calculate_time_to_first_post_index_event(
+            index_table, [outcome], "OUTCOME_DATE", "DAYS_TO_EVENT"
+        )
+
+        index_table = self._calculate_censoring(index_table)
+        return self._calculate_followup(index_table, time_point)
+
+    def _get_index_table(self):
+        """
+        Get the index date of each patient of the cohort.
+
+        Returns:
+            Ibis table with columns PERSON_ID, INDEX_DATE
+        """
         # Get cohort index table
         index_table = self.cohort.index_table
 
@@ -241,15 +307,18 @@ class Table2(Reporter):
 
         # Deduplicate to one row per patient (earliest index date) to avoid
         # fan-out when entry criterion returns multiple rows per patient
-        index_table = index_table.group_by("PERSON_ID").aggregate(
+        return index_table.group_by("PERSON_ID").aggregate(
             INDEX_DATE=index_table.INDEX_DATE.min()
         )
 
-        # Calculate time to first outcome event
-        index_table = self._calculate_time_to_first_post_index_event(
-            index_table, [outcome], "OUTCOME_DATE", "DAYS_TO_EVENT"
-        )
+    def _calculate_censoring(self, index_table):
+        """
+        Add the censoring date of each patient, the first post-index right censoring event or the end of the study period, whichever comes first.
 
+        Output columns added:
+        - CENSOR_DATE: Date of censoring event (null if no censoring)
+        - DAYS_TO_CENSOR: Days from index date to censoring event
+        """
         # Calculate censoring time from right-censoring phenotypes
         index_table = self._calculate_time_to_first_post_index_event(
             index_table, self.right_censor_phenotypes, "CENSOR_DATE", "DAYS_TO_CENSOR"
@@ -291,6 +360,17 @@ class Table2(Reporter):
                 .end(),
             ).drop("DAYS_TO_END_STUDY")
 
+        return index_table
+
+    def _calculate_followup(self, index_table, time_point):
+        """
+        Add the follow-up columns of each row at the given time point. time_point is either a number of days or a column holding it.
+
+        Output columns added:
+        - HAS_EVENT: 1 if valid event within time window, 0 otherwise
+        - FOLLOWUP_TIME: Actual follow-up time accounting for censoring
+        - IS_CENSORED: 1 if patient was censored before time_point, 0 otherwise
+        """
         # Filter to valid events within time window (after censoring)
         # FIXME need to be careful about ties!
         index_table = index_table.mutate(
@@ -43,21 +43,27 @@ class TimeToEvent(Reporter):
             Suggested are death and end of followup.
         end_of_study_period: A datetime defining the end of study period.
         decimal_places: Number of decimal places for rounding survival probabilities. Default: 4
+        aggregate_in_database: If True, the number of events and censorings of each outcome per day of follow-up are counted in the database and only these counts are fetched; the Kaplan-Meier estimates are fitted on the weighted counts and are identical. The patient-level table (_tte_table) is then not fetched, which avoids transferring one row per patient for large cohorts. Default: False
     """
 
+    _result_attributes = ("_tte_table", "_event_counts", "_date_column_names")
+
     def __init__(
         self,
         right_censor_phenotypes: Optional[List["Phenotype"]] = None,
         end_of_study_period: Optional["datetime"] = None,
         decimal_places: int = 4,
         phenotype_names: Optional[List[str]] = None,
+        aggregate_in_database: bool = False,
     ):
         super().__init__(decimal_places=decimal_places)
         self.right_censor_phenotypes = right_censor_phenotypes
         self.end_of_study_period = end_of_study_period
         self.phenotype_names = phenotype_names
+        self.aggregate_in_database = aggregate_in_database
         self._date_column_names = None
         self._tte_table = None  # Private: patient-level time-to-event data
+        self._event_counts = None  # Private: event counts per outcome and day
 
     def execute(self, cohort: "Cohort") -> pd.DataFrame:
         """
@@ -83,17 +89,7 @@ class TimeToEvent(Reporter):
                 - Censored (int): Number of patients censored at this time point
         """
         self.cohort = cohort
-        if self.phenotype_names is not None:
-            self._outcomes = [
-                p for p in cohort.outcomes if p.name in self.phenotype_names
-            ]
-            missing = set(self.phenotype_names) - {p.name for p in self._outcomes}
-            if missing:
-                logger.warning(
-                    f"No matching outcome phenotypes found for: {sorted(missing)}"
-                )
-        else:
-            self._outcomes = cohort.outcomes
+        self._outcomes = self._get_outcomes(cohort)
         self._execute_right_censoring_phenotypes(self.cohort)
 
         # Build patient-level time-to-event table
@@ -103,9 +99,12 @@ class TimeToEvent(Reporter):
         table = self._append_date_events(table)
         table = self._append_days_to_event(table)
         table = self._append_date_and_days_to_first_event(table)
-        self._tte_table = table.execute()  # Convert to pandas DataFrame
+        if self.aggregate_in_database:
+            self._event_counts = self._count_events_in_database(table)
+        else:
+            self._tte_table = table.execute()  # Convert to pandas DataFrame
 
-        if self._tte_table.empty:
+        if not self._has_data():
             logger.warning("No patients in cohort; skipping time-to-event analysis.")
             self.df = pd.DataFrame()
             return self.df
@@ -117,6 +116,21 @@ class TimeToEvent(Reporter):
         self.plot_multiple_kaplan_meier()
         return self.df
 
+    def _get_outcomes(self, cohort):
+        if self.phenotype_names is None:
+            return cohort.outcomes
+        outcomes = [p for p in cohort.outcomes if p.name in self.phenotype_names]
+        missing = set(self.phenotype_names) - {p.name for p in outcomes}
+        if missing:
+            logger.warning(
+                f"No matching outcome phenotypes found for: {sorted(missing)}"
+            )
+        return outcomes
+
+    def set_results(self, cohort, results):
+        super().set_results(cohort, results)
+        self._outcomes = self._get_outcomes(cohort)
+
     def _execute_right_censoring_phenotypes(self, cohort):
         for phenotype in self.right_censor_phenotypes:
             if phenotype.table is None:
@@ -225,6 +239,36 @@ class TimeToEvent(Reporter):
             )
         return table
 
+    def _count_events_in_database(self, table) -> pd.DataFrame:
+        """
+        Count the patients of each outcome by days to first event and event indicator in a single grouped aggregate, stacking the DAYS_FIRST_EVENT_* and INDICATOR_* columns of all outcomes in long format.
+
+        Returns:
+            DataFrame with columns OUTCOME, DURATION, EVENT and N
+        """
+        counts = None
+        for phenotype in self._outcomes:
+            name = phenotype.name.upper()
+            _counts = table.select(
+                OUTCOME=ibis.literal(phenotype.name),
+                DURATION=table[f"DAYS_FIRST_EVENT_{name}"],
+                EVENT=table[f"INDICATOR_{name}"],
+            )
+            counts = _counts if counts is None else counts.union(_counts)
+        if counts is None:
+            return pd.DataFrame(columns=["OUTCOME", "DURATION", "EVENT", "N"])
+        counts = counts.filter(counts.DURATION.notnull() & counts.EVENT.notnull())
+        return (
+            counts.group_by(["OUTCOME", "DURATION", "EVENT"])
+            .aggregate(N=counts.count())
+            .execute()
+        )
+
+    def _has_data(self) -> bool:
+        if self._event_counts is not None:
+            return not self._event_counts.empty
+        return self._tte_table is not None and not self._tte_table.empty
+
     def plot_multiple_kaplan_meier(
         self,
         xlim: Optional[List[int]] = None,
@@ -237,7 +281,7 @@ class TimeToEvent(Reporter):
         For each outcome, plot a kaplan meier curve.
         """
         # subset for current codelist
-        if self._tte_table is None or self._tte_table.empty:
+        if not self._has_data():
             return
         phenotypes = self._outcomes
         if outcome_indices is not None:
@@ -316,14 +360,24 @@ class TimeToEvent(Reporter):
         Returns:
             KaplanMeierFitter or None: Fitted KM model, or None if data is empty.
         """
-        indicator = f"INDICATOR_{phenotype.name.upper()}"
-        durations = f"DAYS_FIRST_EVENT_{phenotype.name.upper()}"
-        _df = self._tte_table[[indicator, durations]].dropna()
+        if self._event_counts is not None:
+            # each row stands for N patients with the same duration and indicator
+            _df = self._event_counts[self._event_counts.OUTCOME == phenotype.name]
+            durations, indicator, weights = "DURATION", "EVENT", "N"
+        else:
+            indicator = f"INDICATOR_{phenotype.name.upper()}"
+            durations = f"DAYS_FIRST_EVENT_{phenotype.name.upper()}"
+            _df = self._tte_table[[indicator, durations]].dropna()
+            weights = None
         if _df.empty:
             logger.warning(f"No data for outcome {phenotype.name}; skipping KM fit.")
             return None
         kmf = KaplanMeierFitter(label=phenotype.name)
-        kmf.fit(durations=_df[durations], event_observed=_df[indicator])
+        kmf.fit(
+            durations=_df[durations],
+            event_observed=_df[indicator],
+            weights=_df[weights] if weights is not None else None,
+        )
         return kmf
 
     def _build_aggregated_risk_table(self) -> pd.DataFrame:
@@ -451,7 +505,7 @@ class TimeToEvent(Reporter):
     def _render_km_images_html(self) -> list:
         """Render KM curves for all outcomes as base64-embedded HTML image divs."""
         images_html = []
-        if self._tte_table is None or self._tte_table.empty:
+        if not self._has_data():
             return images_html
         for i, phenotype in enumerate(self._outcomes):
             kmf = self.fit_kaplan_meier_for_phenotype(phenotype)
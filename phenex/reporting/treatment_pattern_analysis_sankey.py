@@ -1,4 +1,5 @@
 import base64
+import ibis
 import json
 import pandas as pd
 from pathlib import Path
@@ -86,61 +87,82 @@ class SankeyGenerator:
                 )
 
         # ------------------------------------------------------------------
-        # Collect patient ID sets from executed phenotype tables
+        # Stack the patients of all nodes as (PERSON_ID, NODE, STEP), with
+        # STEP the position of the node's period
         # ------------------------------------------------------------------
-        patient_sets = {}
-        for period_num, _, phenotypes in self.periods:
+        members = []
+        for step, (period_num, _, phenotypes) in enumerate(self.periods):
             for pt in phenotypes:
                 if pt.table is None:
                     logger.warning(
                         "Phenotype %s has no executed table; treating as empty set.",
                         pt.name,
                     )
-                    patient_sets[(period_num, pt.name)] = set()
                     continue
-                ids = (
-                    pt.table.select("PERSON_ID")
-                    .distinct()
-                    .execute()["PERSON_ID"]
-                    .tolist()
+                members.append(
+                    pt.table.select(
+                        PERSON_ID=pt.table.PERSON_ID,
+                        NODE=ibis.literal(
+                            node_index[(period_num, pt.name)], type="int64"
+                        ),
+                        STEP=ibis.literal(step, type="int64"),
+                    )
                 )
-                ids_set = set(ids)
-                patient_sets[(period_num, pt.name)] = ids_set
-                nodes[node_index[(period_num, pt.name)]]["value"] = len(ids_set)
 
         # ------------------------------------------------------------------
-        # Build links between consecutive periods via set intersection
+        # Count the patients of each node and, joining each period to the
+        # next one, the patients of each link, in one query
         # ------------------------------------------------------------------
         links = []
         link_rows = []
-        for i in range(len(self.periods) - 1):
-            p_from_num, _, pts_from = self.periods[i]
-            p_to_num, _, pts_to = self.periods[i + 1]
-            for pt_from in pts_from:
-                ids_from = patient_sets.get((p_from_num, pt_from.name), set())
-                if not ids_from:
+        if members:
+            stacked = ibis.union(*members).distinct()
+            stacked = stacked.filter(stacked.PERSON_ID.notnull())
+            node_counts = (
+                stacked.group_by("NODE")
+                .aggregate(N=stacked.count())
+                .select("NODE", TARGET=ibis.null("int64"), N="N")
+            )
+            to = stacked.select(
+                PERSON_ID=stacked.PERSON_ID,
+                TARGET=stacked.NODE,
+                TO_STEP=stacked.STEP,
+            )
+            flows = stacked.join(
+                to,
+                [stacked.PERSON_ID == to.PERSON_ID, to.TO_STEP == stacked.STEP + 1],
+            )
+            link_counts = flows.group_by(["NODE", "TARGET"]).aggregate(
+                N=flows.count()
+            )
+            df = (
+                node_counts.union(link_counts)
+                .execute()
+                .sort_values(["NODE", "TARGET"], na_position="first")
+            )
+
+            for row in df.itertuples(index=False):
+                if pd.isna(row.TARGET):
+                    nodes[int(row.NODE)]["value"] = int(row.N)
                     continue
-                for pt_to in pts_to:
-                    ids_to = patient_sets.get((p_to_num, pt_to.name), set())
-                    flow = len(ids_from & ids_to)
-                    if flow > 0:
-                        links.append(
-                            {
-                                "source": node_index[(p_from_num, pt_from.name)],
-                                "target": node_index[(p_to_num, pt_to.name)],
-                                "value": flow,
-                            }
-                        )
-                        link_rows.append(
-                            {
-                                "tpa_name": self.tpa_name,
-                                "from_period": p_from_num,
-                                "to_period": p_to_num,
-                                "from_regimen": pt_from.display_name,
-                                "to_regimen": pt_to.display_name,
-                                "n_patients": flow,
-                            }
-                        )
+                source, target = nodes[int(row.NODE)], nodes[int(row.TARGET)]
+                links.append(
+                    {
+                        "source": int(row.NODE),
+                        "target": int(row.TARGET),
+                        "value": int(row.N),
+                    }
+                )
+                link_rows.append(
+                    {
+                        "tpa_name": self.tpa_name,
+                        "from_period": source["period"],
+                        "to_period": target["period"],
+                        "from_regimen": source["display_name"],
+                        "to_regimen": target["display_name"],
+                        "n_patients": int(row.N),
+                    }
+                )
 
         self.nodes = nodes
         self.links = links
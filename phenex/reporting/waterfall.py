@@ -1,3 +1,4 @@
+import ibis
 import pandas as pd
 import numpy as np
 
@@ -39,58 +40,39 @@ class Waterfall(Reporter):
         self.cohort = cohort
         logger.debug(f"Beginning execution of waterfall. Calculating N patents")
         final_table = cohort.index_table.filter(cohort.index_table.BOOLEAN == True)
-        N = self._count_persons(final_table)
-        N_events = self._count_events(final_table)
+        N, N_events = self._count_persons_and_events(final_table)
         logger.debug(f"Cohort has {N} patients")
-        # create info dictionaries for each phenotype containing counts
-        self.ds = []
-        # Derive a multi-index-aware running table keyed on (PERSON_ID, INDEX_DATE).
+        # Derive a multi-index-aware table keyed on (PERSON_ID, INDEX_DATE).
         # The entry criterion exposes EVENT_DATE; treat it as the INDEX_DATE so that
         # each candidate index date is counted as a distinct event.
         table = cohort.entry_criterion.table
         if "INDEX_DATE" not in table.columns and "EVENT_DATE" in table.columns:
             table = table.mutate(INDEX_DATE=table.EVENT_DATE)
         table = table.select(self._index_keys(table))
-        N_entry = self._count_persons(table)
-        N_events_entry = self._count_events(table)
-        index = 1
-        self.ds.append(
+
+        # rows (type, phenotype, level, index) after the entry criterion in display order
+        rows = []
+        if self.include_component_phenotypes_level is not None:
+            self._append_components_recursively(cohort.entry_criterion, rows, "1")
+        rows += self._criteria_rows(cohort.inclusions, cohort.exclusions, index=1)
+
+        remaining = self._count_remaining(table, cohort.inclusions, cohort.exclusions)
+        N_entry, N_events_entry = remaining[0]
+
+        # create info dictionaries for each phenotype containing counts
+        self.ds = [
             {
                 "Type": "entry",
                 "Level": 0,
-                "Index": str(index),
-                "Name": (cohort.entry_criterion.display_name),
+                "Index": "1",
+                "Name": cohort.entry_criterion.display_name,
                 "N": N_entry,
                 "N_events": N_events_entry,
                 "Remaining": N_entry,
                 "N_events_remaining": N_events_entry,
             }
-        )
-
-        if self.include_component_phenotypes_level is not None:
-            self._append_components_recursively(
-                cohort.entry_criterion, table, parent_index=str(index)
-            )
-
-        for inclusion in cohort.inclusions:
-            index += 1
-            table = self.append_phenotype_to_waterfall(
-                table, inclusion, "inclusion", level=0, index=index
-            )
-            if self.include_component_phenotypes_level is not None:
-                self._append_components_recursively(
-                    inclusion, table, parent_index=str(index)
-                )
-
-        for exclusion in cohort.exclusions:
-            index += 1
-            table = self.append_phenotype_to_waterfall(
-                table, exclusion, "exclusion", level=0, index=index
-            )
-            if self.include_component_phenotypes_level is not None:
-                self._append_components_recursively(
-                    exclusion, table, parent_index=str(index)
-                )
+        ]
+        self._append_rows(rows, remaining)
 
         # Calculate deltas before adding first/last rows
         self.ds = self.append_delta(self.ds)
@@ -221,78 +203,144 @@ class Waterfall(Reporter):
 
         return str(filepath.absolute())
 
+    def _criteria_rows(self, inclusions, exclusions, index):
+        """
+        Return the waterfall rows (type, phenotype, level, index) of the given inclusions and exclusions, followed each by their components if requested, numbering the criteria from index + 1.
+        """
+        rows = []
+        criteria = list(inclusions) + list(exclusions)
+        for step, phenotype in enumerate(criteria, start=1):
+            type = "inclusion" if step <= len(inclusions) else "exclusion"
+            rows.append((type, phenotype, 0, index + step))
+            if self.include_component_phenotypes_level is not None:
+                self._append_components_recursively(phenotype, rows, str(index + step))
+        return rows
+
     def _append_components_recursively(
-        self, current_phenotype, table, level=1, parent_index=""
+        self, current_phenotype, rows, parent_index, level=1
     ):
         if level <= self.include_component_phenotypes_level:
             for i, child in enumerate(current_phenotype.children):
                 current_index = f"{parent_index}.{i+1}"
-                current_name = child.display_name
-                self.append_phenotype_to_waterfall(
-                    table,
-                    child,
-                    "component",
-                    full_name=current_name,
-                    index=current_index,
-                    level=level,
-                )
+                rows.append(("component", child, level, current_index))
                 self._append_components_recursively(
-                    child, table, level + 1, parent_index=current_index
+                    child, rows, current_index, level + 1
                 )
 
-    def append_phenotype_to_waterfall(
-        self, table, phenotype, type, level, index=None, full_name=None
-    ):
-        if type == "inclusion":
-            keys = self._join_keys(table, phenotype.table)
-            table = table.inner_join(phenotype.table.select(keys).distinct(), keys)
-        elif type == "exclusion":
-            keys = self._join_keys(table, phenotype.table)
-            table = table.anti_join(phenotype.table.select(keys).distinct(), keys)
-        elif type == "component":
-            table = table
-        else:
-            raise ValueError("type must be either inclusion or exclusion")
-        logger.debug(f"Starting {type} criteria {phenotype.name}")
-
-        if full_name is None:
-            full_name = phenotype.display_name
+    def _append_rows(self, rows, remaining):
+        """
+        Append the given rows (type, phenotype, level, index) to the waterfall. remaining are the counts returned by _count_remaining for the criteria of these rows; components do not modify the cohort and have no remaining counts.
+        """
+        step = 0
+        for (type, phenotype, level, index), (N, N_events) in zip(
+            rows, self._count_phenotypes([row[1] for row in rows])
+        ):
+            if type == "component":
+                N_remaining, N_events_remaining = np.nan, np.nan
+            else:
+                step += 1
+                N_remaining, N_events_remaining = remaining[step]
+            self.ds.append(
+                {
+                    "Type": type,
+                    "Name": phenotype.display_name,
+                    "Level": level,
+                    "Index": index,
+                    "N": N,
+                    "N_events": N_events,
+                    "Remaining": N_remaining,
+                    "N_events_remaining": N_events_remaining,
+                }
+            )
+            logger.debug(
+                f"Finished {type} criteria {phenotype.name}: N = {N} waterfall = {N_remaining}"
+            )
 
-        table = table.select(self._index_keys(table))
-        is_component = type == "component"
-
-        # Components do not modify the running table, so leave it untouched. For
-        # inclusion/exclusion steps, materialize the running table to break the
-        # query lineage. Each step otherwise stacks another phenotype subquery
-        # onto the previous one; after a few criteria (especially in the detailed
-        # waterfall, where phenotype tables are themselves complex multi-joins)
-        # the nested SQL grows large enough to fail compilation on some backends
-        # (e.g. Snowflake's "unexpected 'ANTI'" syntax error). Caching forces the
-        # backend to evaluate and store the intermediate result so the next join
-        # starts from a flat table reference.
-        if not is_component:
-            table = self._materialize(table)
-
-        self.ds.append(
-            {
-                "Type": type,
-                "Name": full_name,
-                "Level": level,
-                "Index": index if index is not None else str(level),
-                "N": phenotype.table.select("PERSON_ID").distinct().count().execute(),
-                "N_events": phenotype.table.count().execute(),
-                "Remaining": (
-                    self._count_persons(table) if not is_component else np.nan
-                ),
-                "N_events_remaining": (
-                    self._count_events(table) if not is_component else np.nan
-                ),
-            }
+    def _count_phenotypes(self, phenotypes):
+        """
+        Count the patients (N) and rows (N_events) of each of the given phenotypes in a single UNION ALL + GROUP BY query. Returns a list of (N, N_events) in the order of the phenotypes.
+        """
+        if not phenotypes:
+            return []
+        long_table = ibis.union(
+            *[
+                pt.table.select("PERSON_ID").mutate(
+                    _PHENOTYPE=ibis.literal(i, type="int64")
+                )
+                for i, pt in enumerate(phenotypes)
+            ]
         )
-        logger.debug(
-            f"Finished {type} criteria {phenotype.name}: N = {self.ds[-1]['N']} waterfall = {self.ds[-1]['Remaining']}"
+        df = (
+            long_table.group_by("_PHENOTYPE")
+            .aggregate(N=long_table.PERSON_ID.nunique(), N_events=long_table.count())
+            .execute()
+            .set_index("_PHENOTYPE")
         )
-        return table
+        # phenotypes with an empty table do not appear in the result
+        return [
+            (int(df.N[i]), int(df.N_events[i])) if i in df.index else (0, 0)
+            for i in range(len(phenotypes))
+        ]
+
+    def _count_remaining(self, table, inclusions, exclusions):
+        """
+        Count the patients and events remaining after sequentially applying the inclusions and then the exclusions to the events (PERSON_ID, INDEX_DATE) in table.
+
+        Rather than joining the phenotypes one by one onto a running table, the criteria are pivoted onto the events as a boolean matrix (one column per criterion, UNION ALL + GROUP BY as in hstack_boolean). The first criterion each event fails is computed per row and all counts are produced by one aggregate: an event remains after step k if it fails no criterion up to k.
+
+        Returns:
+            A list of (Remaining, N_events_remaining), the first entry being the counts before any criterion is applied.
+        """
+        criteria = list(inclusions) + list(exclusions)
+        table = table.select(self._index_keys(table)).distinct()
+        # pivot the criteria onto the events; INDEX_DATE is only used when
+        # both the entry events and the phenotype table expose it
+        pivots = {}
+        for i, phenotype in enumerate(criteria):
+            keys = tuple(self._join_keys(table, phenotype.table))
+            pivots.setdefault(keys, []).append(i)
+        for keys, indices in pivots.items():
+            long_table = ibis.union(
+                *[
+                    criteria[i]
+                    .table.select(list(keys))
+                    .mutate(_CRITERION=ibis.literal(i, type="int64"))
+                    for i in indices
+                ]
+            )
+            wide_table = long_table.group_by(list(keys)).aggregate(
+                **{f"_C{i}": (long_table._CRITERION == i).any() for i in indices}
+            )
+            table = table.left_join(wide_table, list(keys)).select(
+                table.columns + [f"_C{i}" for i in indices]
+            )
+
+        # step at which each event leaves the cohort (len(criteria) + 1 if it remains)
+        first_failed_step = ibis.literal(len(criteria) + 1)
+        if criteria:
+            first_failed_step = ibis.case()
+            for i in range(len(criteria)):
+                fulfilled = table[f"_C{i}"].fill_null(False)
+                failed = ~fulfilled if i < len(inclusions) else fulfilled
+                first_failed_step = first_failed_step.when(failed, i + 1)
+            first_failed_step = first_failed_step.else_(len(criteria) + 1).end()
+        table = table.mutate(_FIRST_FAILED_STEP=first_failed_step)
+
+        remains = [table._FIRST_FAILED_STEP > step for step in range(len(criteria) + 1)]
+        df = table.aggregate(
+            **{
+                f"N_{step}": table.PERSON_ID.nunique(where=remains[step])
+                for step in range(len(remains))
+            },
+            **{
+                f"N_events_{step}": table.count(where=remains[step])
+                for step in range(len(remains))
+            },
+        ).execute()
+        return [
+            (int(df[f"N_{step}"][0]), int(df[f"N_events_{step}"][0]))
+            for step in range(len(remains))
+        ]
 
     def get_pretty_display(self) -> pd.DataFrame:
         """
@@ -584,27 +632,13 @@ class Waterfall(Reporter):
             keys.append("INDEX_DATE")
         return keys
 
-    def _count_persons(self, table):
-        """Count distinct patients in a table."""
-        return table.select("PERSON_ID").distinct().count().execute()
-
-    def _count_events(self, table):
-        """Count distinct events, i.e. distinct (PERSON_ID, INDEX_DATE) pairs when
-        INDEX_DATE is present, otherwise distinct patients."""
-        return table.select(self._index_keys(table)).distinct().count().execute()
-
-    def _materialize(self, table):
-        """Materialize an intermediate ibis table to break its query lineage.
-
-        Chaining many joins produces deeply nested SQL that can exceed backend
-        compiler limits. ``cache()`` evaluates and stores the result so downstream
-        operations reference a flat table. If the backend does not support caching
-        the original (lazy) expression is returned unchanged."""
-        try:
-            return table.cache()
-        except Exception as e:
-            logger.debug(f"Could not materialize intermediate waterfall table: {e}")
-            return table
+    def _count_persons_and_events(self, table):
+        """Count distinct patients and distinct events, i.e. distinct (PERSON_ID, INDEX_DATE) pairs when INDEX_DATE is present, otherwise distinct patients, in one query."""
+        events = table.select(self._index_keys(table)).distinct()
+        df = events.aggregate(
+            N=events.PERSON_ID.nunique(), N_events=events.count()
+        ).execute()
+        return int(df.N[0]), int(df.N_events[0])
 
     def append_delta(self, ds):
         ds[0]["Delta"] = np.nan
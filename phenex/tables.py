@@ -9,6 +9,9 @@ logger = logging.getLogger(__name__)
 
 from phenex.util.serialization.to_dict import to_dict
 
+# Autojoin paths resolved by PhenexTable._find_path, keyed by (left table class, right table class)
+_AUTOJOIN_PATH_CACHE = {}
+
 
 class PhenexTable:
     """
@@ -353,55 +356,16 @@ class PhenexTable:
 
         for right_table_class_name in self._find_path(other):
             # get the next right table
-            right_table_search_results = [
-                v
-                for k, v in domains.items()
-                if v.__class__.__name__ == right_table_class_name
-            ]
-            logger.debug(
-                f"Searching for {right_table_class_name} in domains: {list(domains.keys())}"
-            )
-            logger.debug(
-                f"Found {len(right_table_search_results)} matches for {right_table_class_name}"
-            )
-
-            if len(right_table_search_results) != 1:
-                raise ValueError(
-                    f"Unable to find unqiue {right_table_class_name} required to join {other.__class__.__name__}"
-                )
-            right_table = right_table_search_results[0]
+            right_table = self._get_domain_table(right_table_class_name, domains, other)
             print(
                 f"\tJoining : {current_left_table.__class__.__name__} to {right_table.__class__.__name__}"
             )
 
             # join keys are defined by the left table; in theory should enforce symmetry
             join_keys = current_left_table.JOIN_KEYS[right_table_class_name]
-
-            # Build join predicate(s) - supports symmetric and asymmetric joins
-            # Symmetric: ["COLUMN"] or ["COL1", "COL2"] - same column names in both tables
-            # Asymmetric: [("LEFT_COL", "RIGHT_COL")] - different column names
-            # Mixed: ["COL1", ("LEFT_COL", "RIGHT_COL")]
-            predicates = []
-            for join_key in join_keys:
-                if isinstance(join_key, str):
-                    # Symmetric: column exists in both tables with same name
-                    predicates.append(joined_table[join_key] == right_table[join_key])
-                elif isinstance(join_key, (tuple, list)) and len(join_key) == 2:
-                    # Asymmetric: (left_col, right_col) - different column names
-                    left_col, right_col = join_key
-                    predicates.append(joined_table[left_col] == right_table[right_col])
-                else:
-                    raise ValueError(
-                        f"Invalid join key format: {join_key}. Must be either a string or a 2-element tuple/list."
-                    )
-
-            # Combine all predicates with AND
-            if len(predicates) == 1:
-                join_predicate = predicates[0]
-            else:
-                join_predicate = predicates[0]
-                for pred in predicates[1:]:
-                    join_predicate = join_predicate & pred
+            join_predicate = self._build_join_predicate(
+                joined_table, right_table, join_keys
+            )
 
             columns = list(set(joined_table.columns + right_table.columns))
             # subset columns, making sure to set type of table to the very left table (self)
@@ -411,10 +375,103 @@ class PhenexTable:
             current_left_table = right_table
         return joined_table
 
+    def semi_join(self, other: "PhenexTable", *args, domains=None, **kwargs):
+        """
+        Keep only the rows of this table that have a match in other. Columns of other are never added and rows of this table are never duplicated.
+
+        If other is a PhenexTable and no predicates are passed, the autojoin path used by join() is followed in reverse: other (typically already filtered, e.g. a concept table filtered by a codelist) is semi-joined into the last intermediate table of the path, the result into the one before, and so on back to this table. This filters the small side first and avoids materializing the full join when the joined tables only contribute a filter.
+        """
+        if isinstance(other, Table):
+            return type(self)(self.table.semi_join(other, *args, **kwargs))
+
+        if not isinstance(other, PhenexTable):
+            raise TypeError(f"Expected a PhenexTable instance, got {type(other)}")
+        if len(args):
+            return type(self)(self.table.semi_join(other.table, *args, **kwargs))
+
+        path = self._find_path(other)
+        # chain of tables along the path: self -> intermediate tables -> other
+        chain = (
+            [self]
+            + [self._get_domain_table(name, domains, other) for name in path[:-1]]
+            + [other]
+        )
+        logger.debug(
+            f"Starting autojoin semi-join from {other.__class__.__name__} back to {self.__class__.__name__}"
+        )
+
+        reduced_table = other.table
+        for left_table, right_table_class_name in reversed(list(zip(chain, path))):
+            logger.debug(
+                f"Semi-joining {left_table.__class__.__name__} to {right_table_class_name}"
+            )
+            join_keys = left_table.JOIN_KEYS[right_table_class_name]
+            join_predicate = self._build_join_predicate(
+                left_table, reduced_table, join_keys
+            )
+            reduced_table = left_table.table.semi_join(reduced_table, join_predicate)
+        return type(self)(reduced_table)
+
+    @staticmethod
+    def _get_domain_table(class_name, domains, other=None):
+        """
+        Find the unique table of the given class name in the domains dictionary; used to look up the intermediate tables of an autojoin path.
+        """
+        if other is not None and other.__class__.__name__ == class_name:
+            return other
+        search_results = [
+            v for k, v in domains.items() if v.__class__.__name__ == class_name
+        ]
+        logger.debug(f"Searching for {class_name} in domains: {list(domains.keys())}")
+        logger.debug(f"Found {len(search_results)} matches for {class_name}")
+
+        if len(search_results) != 1:
+            raise ValueError(
+                f"Unable to find unqiue {class_name} required to join {other.__class__.__name__}"
+            )
+        return search_results[0]
+
+    @staticmethod
+    def _build_join_predicate(left_table, right_table, join_keys):
+        """
+        Build join predicate(s) - supports symmetric and asymmetric joins
+            Symmetric: ["COLUMN"] or ["COL1", "COL2"] - same column names in both tables
+            Asymmetric: [("LEFT_COL", "RIGHT_COL")] - different column names
+            Mixed: ["COL1", ("LEFT_COL", "RIGHT_COL")]
+        All predicates are combined with AND.
+        """
+        predicates = []
+        for join_key in join_keys:
+            if isinstance(join_key, str):
+                # Symmetric: column exists in both tables with same name
+                predicates.append(left_table[join_key] == right_table[join_key])
+            elif isinstance(join_key, (tuple, list)) and len(join_key) == 2:
+                # Asymmetric: (left_col, right_col) - different column names
+                left_col, right_col = join_key
+                predicates.append(left_table[left_col] == right_table[right_col])
+            else:
+                raise ValueError(
+                    f"Invalid join key format: {join_key}. Must be either a string or a 2-element tuple/list."
+                )
+
+        join_predicate = predicates[0]
+        for pred in predicates[1:]:
+            join_predicate = join_predicate & pred
+        return join_predicate
+
     def mutate(self, *args, **kwargs):
         return type(self)(self.table.mutate(*args, **kwargs), name=self.NAME_TABLE)
 
     def _find_path(self, other):
+        """
+        Find the autojoin path (list of table class names) from this table to other. Paths only depend on the class-level JOIN_KEYS and PATHS, so each path is resolved once per pair of table classes and cached.
+        """
+        cache_key = (type(self), type(other))
+        if cache_key not in _AUTOJOIN_PATH_CACHE:
+            _AUTOJOIN_PATH_CACHE[cache_key] = self._resolve_path(other)
+        return list(_AUTOJOIN_PATH_CACHE[cache_key])
+
+    def _resolve_path(self, other):
         start_name = self.__class__.__name__
         end_name = other.__class__.__name__
 
@@ -0,0 +1,157 @@
+import pytest
+import ibis
+import pandas as pd
+from datetime import date
+
+from ibis.common.exceptions import IbisError
+
+import phenex.aggregators.aggregator as aggregator_module
+from phenex.aggregators import First, Last, Nearest
+
+INDEX = date(2022, 1, 10)
+
+
+def _events():
+    """
+    P1 : events before and after index, two rows on the first date
+    P2 : equidistant events around index
+    P3 : only null dates
+    P4 : null date plus one event
+    P5 : two index dates
+    """
+    rows = [
+        ("P1", INDEX, date(2022, 1, 1), 1),
+        ("P1", INDEX, date(2022, 1, 1), 2),
+        ("P1", INDEX, date(2022, 1, 12), 3),
+        ("P1", INDEX, date(2022, 2, 1), 4),
+        ("P2", INDEX, date(2022, 1, 5), 5),
+        ("P2", INDEX, date(2022, 1, 15), 6),
+        ("P3", INDEX, None, 7),
+        ("P3", INDEX, None, 8),
+        ("P4", INDEX, None, 9),
+        ("P4", INDEX, date(2022, 1, 20), 10),
+        ("P5", INDEX, date(2022, 1, 3), 11),
+        ("P5", date(2022, 3, 1), date(2022, 1, 3), 12),
+        ("P5", date(2022, 3, 1), date(2022, 2, 27), 13),
+    ]
+    df = pd.DataFrame(rows, columns=["PERSON_ID", "INDEX_DATE", "EVENT_DATE", "ROW"])
+    return ibis.memtable(
+        df,
+        schema={
+            "PERSON_ID": "string",
+            "INDEX_DATE": "date",
+            "EVENT_DATE": "date",
+            "ROW": "int64",
+        },
+    )
+
+
+def _result(table, columns):
+    df = table.to_pandas()[columns]
+    return sorted(
+        tuple(None if pd.isnull(v) else v for v in row)
+        for row in df.itertuples(index=False)
+    )
+
+
+@pytest.mark.parametrize(
+    "aggregator_class,expected_rows",
+    [
+        (First, [1, 2, 5, 10, 11, 12]),
+        (Last, [4, 6, 10, 11, 13]),
+        (Nearest, [3, 5, 10, 11, 13]),
+    ],
+)
+@pytest.mark.parametrize("strategy", ["qualify", "group_by"])
+def test_selected_rows(aggregator_class, expected_rows, strategy):
+    aggregator = aggregator_class(
+        aggregation_index=["PERSON_ID"], reduce=False, strategy=strategy
+    )
+    result = aggregator.aggregate(_events())
+    assert sorted(result.ROW.to_pandas().tolist()) == expected_rows
+
+
+@pytest.mark.parametrize("aggregator_class", [First, Last, Nearest])
+@pytest.mark.parametrize("reduce", [True, False])
+@pytest.mark.parametrize("preserve_nulls", [True, False])
+def test_strategies_agree(aggregator_class, reduce, preserve_nulls):
+    columns = ["PERSON_ID", "INDEX_DATE", "EVENT_DATE"]
+    if not reduce:
+        columns.append("ROW")
+    results = [
+        _result(
+            aggregator_class(
+                reduce=reduce, preserve_nulls=preserve_nulls, strategy=strategy
+            ).aggregate(_events()),
+            columns,
+        )
+        for strategy in ["qualify", "group_by"]
+    ]
+    assert results[0] == results[1]
+
+
+def test_preserve_nulls_keeps_all_null_partitions():
+    result = First(preserve_nulls=True, strategy="group_by").aggregate(_events())
+    assert sorted(result.filter(result.PERSON_ID == "P3").ROW.to_pandas()) == [7, 8]
+
+
+def test_reduce_returns_one_row_per_group():
+    result = First(reduce=True).aggregate(_events())
+    assert list(result.columns) == ["PERSON_ID", "INDEX_DATE", "EVENT_DATE", "VALUE"]
+    # P3 only has null dates and is dropped
+    assert result.count().to_pandas() == 5
+
+
+def test_auto_strategy():
+    events = _events()
+    assert First(reduce=True)._resolve_strategy(events) == "group_by"
+    assert First(reduce=False)._resolve_strategy(events) == "group_by"
+
+
+def test_auto_strategy_qualify_backend(monkeypatch):
+    monkeypatch.setattr(aggregator_module, "QUALIFY_STRATEGY_BACKENDS", ("duckdb",))
+    events = _events()
+    assert First(reduce=False)._resolve_strategy(events) == "qualify"
+    # reducing always uses a pure GROUP BY
+    assert First(reduce=True)._resolve_strategy(events) == "group_by"
+
+
+def test_auto_strategy_without_backend(monkeypatch):
+    def _raise(*args, **kwargs):
+        raise IbisError("Multiple backends found for this expression")
+
+    events = _events()
+    monkeypatch.setattr(type(events), "_find_backend", _raise)
+    assert First(reduce=False)._resolve_strategy(events) == "group_by"
+
+
+@pytest.mark.parametrize("aggregator_class", [First, Last, Nearest])
+@pytest.mark.parametrize("reduce", [True, False])
+def test_qualify_strategy_on_snowflake(aggregator_class, reduce):
+    result = aggregator_class(reduce=reduce, strategy="qualify").aggregate(_events())
+    sql = ibis.to_sql(result, dialect="snowflake")
+    assert "QUALIFY" in sql
+    assert ("ROW_NUMBER()" if reduce else "RANK()") in sql
+    assert "MIN_BY" not in sql
+
+
+def test_group_by_semi_join_predicates():
+    sql = ibis.to_sql(First(strategy="group_by").aggregate(_events()), dialect="duckdb")
+    assert "SEMI JOIN" in sql
+    assert "IS NOT DISTINCT FROM" not in sql
+    sql = ibis.to_sql(
+        First(strategy="group_by", preserve_nulls=True).aggregate(_events()),
+        dialect="duckdb",
+    )
+    # only the date is matched null-safely
+    assert sql.count("IS NOT DISTINCT FROM") == 1
+
+
+def test_unknown_strategy():
+    with pytest.raises(ValueError):
+        First(strategy="window")
+
+
+def test_nearest_requires_reference_date():
+    with pytest.raises(ValueError):
+        Nearest().aggregate(_events().drop("INDEX_DATE"))
@@ -47,7 +47,7 @@ def _make_tables(con):
     return {"PERSON": person_table, "DRUG_EXPOSURE": drug_table}
 
 
-def _make_cohort(pre_entry_dt_name, post_entry_dt_name):
+def _make_cohort(pre_entry_dt_name, post_entry_dt_name, prune_unused_domains=False):
     entry = CodelistPhenotype(
         name="entry",
         return_date="first",
@@ -74,6 +74,7 @@ def _make_cohort(pre_entry_dt_name, post_entry_dt_name):
         entry_criterion=entry,
         derived_tables=[pre_entry_dt],
         derived_tables_post_entry=[post_entry_dt],
+        prune_unused_domains=prune_unused_domains,
     )
 
 
@@ -102,6 +103,18 @@ class TestCohortDerivedTableSubsetKeys:
         assert self.pre_entry_name in self.cohort.subset_tables_index
 
 
+def test_unused_derived_table_not_subset():
+    """A pre-entry derived table that no phenotype reads is not subset by default."""
+    con = ibis.duckdb.connect()
+    cohort = _make_cohort("PRE_ENTRY_DT", "POST_ENTRY_DT", prune_unused_domains=True)
+    cohort.execute(tables=_make_tables(con))
+    assert "PRE_ENTRY_DT" not in cohort.subset_tables_entry
+    assert "PRE_ENTRY_DT" not in cohort.subset_tables_index
+    # the post-entry derived table reads DRUG_EXPOSURE from the entry subset
+    assert "DRUG_EXPOSURE" in cohort.subset_tables_entry
+    assert "POST_ENTRY_DT" in cohort.subset_tables_entry
+
+
 if __name__ == "__main__":
     t = TestCohortDerivedTableSubsetKeys()
     t.setup_method()
@@ -488,6 +488,38 @@ class TestCohortLazyExecution(unittest.TestCase):
                     f"Expected report file {fname} not found after cached execution.",
                 )
 
+    def test_06_reporter_outputs_restored_for_new_cohort_object(self):
+        """A rebuilt cohort restores the reporter outputs from the cache, also if unrelated cohort attributes changed."""
+        self.cohort.execute(
+            tables=self.tables,
+            con=self.con,
+            overwrite=True,
+            lazy_execution=True,
+        )
+        cohort, _ = _build_cohort(self.tables)
+        cohort.description = "reporters do not read the description"
+        with _ExecutionTracker() as tracker:
+            cohort.execute(
+                tables=self.tables,
+                con=self.con,
+                overwrite=True,
+                lazy_execution=True,
+            )
+        self.assertFalse(tracker.has_table1_execution())
+        self.assertFalse(tracker.has_tte_execution())
+
+        self.assertIn("Age", cohort.table1_node.reporter._value_distributions)
+        self.assertEqual(
+            cohort.table1_node.reporter._value_distributions,
+            self.cohort.table1_node.reporter._value_distributions,
+        )
+        tte, cached_tte = self.cohort.custom_reporters[0], cohort.custom_reporters[0]
+        pd.testing.assert_frame_equal(cached_tte.df, tte.df)
+        pd.testing.assert_frame_equal(cached_tte._tte_table, tte._tte_table)
+        self.assertEqual(
+            [p.name for p in cached_tte._outcomes], [p.name for p in tte._outcomes]
+        )
+
 
 class TestSubcohortLazyExecution(unittest.TestCase):
     """Test that subcohort execution works correctly with lazy execution."""
@@ -0,0 +1,84 @@
+"""
+Test that the sampler and data period filter are fused into the entry subset tables
+"""
+
+import datetime
+import pandas as pd
+from phenex.core.cohort import Cohort
+from phenex.core.database import Database
+from phenex.phenotypes import CodelistPhenotype
+from phenex.codelists import Codelist
+from phenex.filters import DateFilter
+from phenex.filters.date_filter import AfterOrOn, BeforeOrOn
+from phenex.ibis_connect import DuckDBConnector
+from phenex.util.database_sampler import DatabaseSampler
+from phenex.test.cohort.test_mappings import (
+    PersonTableForTests,
+    DrugExposureTableForTests,
+)
+
+
+def _make_tables(con):
+    patids = [f"P{i}" for i in range(40)]
+    df_person = pd.DataFrame({"PATID": patids, "YOB": 1980, "GENDER": 1})
+    person_table = PersonTableForTests(
+        con.dest_connection.create_table(
+            "PERSON", df_person, schema={"PATID": str, "YOB": int, "GENDER": int}
+        )
+    )
+    df_drug = pd.DataFrame(
+        {
+            "PATID": patids * 3,
+            "PRODCODEID": ["entry"] * 40 + ["other"] * 80,
+            "ISSUEDATE": [datetime.date(2020, 1, 1)] * 40
+            + [datetime.date(2019, 6, 1)] * 40
+            + [datetime.date(2022, 6, 1)] * 40,
+        }
+    )
+    drug_table = DrugExposureTableForTests(
+        con.dest_connection.create_table(
+            "DRUG_EXPOSURE",
+            df_drug,
+            schema={"PATID": str, "PRODCODEID": str, "ISSUEDATE": datetime.date},
+        )
+    )
+    return {"PERSON": person_table, "DRUG_EXPOSURE": drug_table}
+
+
+def _execute(write_prefilter_tables):
+    con = DuckDBConnector()
+    cohort = Cohort(
+        name="prefilter",
+        entry_criterion=CodelistPhenotype(
+            name="entry",
+            codelist=Codelist(["entry"]).copy(use_code_type=False),
+            domain="DRUG_EXPOSURE",
+        ),
+        database=Database(
+            data_period=DateFilter(
+                min_date=AfterOrOn("2019-01-01"), max_date=BeforeOrOn("2021-12-31")
+            ),
+            sampler=DatabaseSampler(fraction=0.5, seed=1),
+        ),
+        write_prefilter_tables=write_prefilter_tables,
+    )
+    cohort.execute(tables=_make_tables(con), con=con, overwrite=True)
+    written = [t.upper() for t in con.dest_connection.list_tables()]
+    return cohort, written
+
+
+def _subset_entry(cohort):
+    df = cohort.subset_tables_entry["DRUG_EXPOSURE"].table.to_pandas()
+    return df.sort_values(list(df.columns)).reset_index(drop=True)
+
+
+def test_prefilter_matches_staged_pipeline():
+    fused, fused_tables = _execute(write_prefilter_tables=False)
+    staged, staged_tables = _execute(write_prefilter_tables=True)
+
+    pd.testing.assert_frame_equal(_subset_entry(fused), _subset_entry(staged))
+    # the data period removed the 2022 records, the sampler about half the patients
+    assert len(_subset_entry(fused)) < 80
+    assert not any("SAMPLER" in t or "DATA_PERIOD" in t for t in fused_tables)
+    assert any("SAMPLER" in t for t in staged_tables)
+    assert any("DATA_PERIOD" in t for t in staged_tables)
@@ -0,0 +1,153 @@
+"""
+Test that the cohort only subsets the domains its phenotypes read
+"""
+
+import ibis
+import pandas as pd
+from phenex.core.cohort import Cohort
+from phenex.core.subcohort import Subcohort
+from phenex.phenotypes import CodelistPhenotype, UserDefinedPhenotype
+from phenex.codelists import Codelist
+from phenex.filters import CategoricalFilter
+from phenex.tables import CodeTable, PhenexPersonTable, PhenexTable
+
+
+class ConceptTableForTests(PhenexTable):
+    NAME_TABLE = "CONCEPT"
+
+
+class MappingTableForTests(PhenexTable):
+    NAME_TABLE = "MAPPING"
+
+
+class ObservationTableForTests(CodeTable):
+    NAME_TABLE = "OBSERVATION"
+    CODES_DEFINED_IN = "CONCEPT"
+    PATHS = {"ConceptTableForTests": ["MappingTableForTests"]}
+
+
+def _tables():
+    events = ibis.memtable(
+        pd.DataFrame(
+            {
+                "PERSON_ID": ["P1"],
+                "EVENT_DATE": [None],
+                "CODE": ["c1"],
+                "SOURCE": ["s"],
+                "UNUSED": ["u"],
+            }
+        )
+    )
+    return {
+        "PERSON": PhenexPersonTable(ibis.memtable(pd.DataFrame({"PERSON_ID": ["P1"]}))),
+        "DRUG_EXPOSURE": CodeTable(events),
+        "CONDITION_OCCURRENCE": CodeTable(events),
+        "OBSERVATION": ObservationTableForTests(events),
+        "MAPPING": MappingTableForTests(events),
+        "CONCEPT": ConceptTableForTests(events),
+    }
+
+
+def _phenotype(name, domain, **kwargs):
+    return CodelistPhenotype(
+        name=name,
+        codelist=Codelist(["c1"]).copy(use_code_type=False),
+        domain=domain,
+        **kwargs,
+    )
+
+
+def _subset_domains(nodes):
+    return sorted(node.domain for node in nodes)
+
+
+def test_unused_domains_are_not_subset():
+    cohort = Cohort(
+        name="prune",
+        entry_criterion=_phenotype("entry", "DRUG_EXPOSURE"),
+    )
+    cohort.build_stages(_tables())
+    assert _subset_domains(cohort.subset_tables_entry_nodes) == [
+        "DRUG_EXPOSURE",
+        "PERSON",
+    ]
+    assert _subset_domains(cohort.subset_tables_index_nodes) == [
+        "DRUG_EXPOSURE",
+        "PERSON",
+    ]
+
+
+def test_autojoined_domains_are_subset():
+    cohort = Cohort(
+        name="prune",
+        entry_criterion=_phenotype("entry", "DRUG_EXPOSURE"),
+        characteristics=[_phenotype("observation", "OBSERVATION")],
+    )
+    cohort.build_stages(_tables())
+    assert _subset_domains(cohort.subset_tables_index_nodes) == [
+        "CONCEPT",
+        "DRUG_EXPOSURE",
+        "MAPPING",
+        "OBSERVATION",
+        "PERSON",
+    ]
+
+
+def test_subcohort_domains_are_subset():
+    cohort = Cohort(
+        name="prune",
+        entry_criterion=_phenotype("entry", "DRUG_EXPOSURE"),
+    )
+    Subcohort(
+        name="sub",
+        cohort=cohort,
+        inclusions=[_phenotype("condition", "CONDITION_OCCURRENCE")],
+    )
+    cohort.build_stages(_tables())
+    assert "CONDITION_OCCURRENCE" in _subset_domains(cohort.subset_tables_index_nodes)
+
+
+def test_undeclared_domains_subset_all():
+    cohort = Cohort(
+        name="prune",
+        entry_criterion=_phenotype("entry", "DRUG_EXPOSURE"),
+        characteristics=[
+            UserDefinedPhenotype(name="udf", function=lambda tables: tables["PERSON"])
+        ],
+    )
+    cohort.build_stages(_tables())
+    assert len(cohort.subset_tables_index_nodes) == len(_tables())
+
+
+def test_prune_unused_domains_false():
+    cohort = Cohort(
+        name="prune",
+        entry_criterion=_phenotype("entry", "DRUG_EXPOSURE"),
+        prune_unused_domains=False,
+    )
+    cohort.build_stages(_tables())
+    assert len(cohort.subset_tables_entry_nodes) == len(_tables())
+
+
+def test_unused_columns_are_not_subset():
+    cohort = Cohort(
+        name="prune",
+        entry_criterion=_phenotype("entry", "DRUG_EXPOSURE"),
+        inclusions=[
+            _phenotype(
+                "condition",
+                "CONDITION_OCCURRENCE",
+                categorical_filter=CategoricalFilter(
+                    column_name="SOURCE", allowed_values=["s"]
+                ),
+            )
+        ],
+    )
+    cohort.build_stages(_tables())
+    columns = {node.domain: node.columns for node in cohort.subset_tables_entry_nodes}
+    # the column named by the categorical filter is kept, the unused one is not
+    assert "SOURCE" in columns["CONDITION_OCCURRENCE"]
+    assert "UNUSED" not in columns["CONDITION_OCCURRENCE"]
+    assert "CODE" in columns["DRUG_EXPOSURE"]
+    # the index stage reads the already projected entry subset
+    assert all(node.columns is None for node in cohort.subset_tables_index_nodes)
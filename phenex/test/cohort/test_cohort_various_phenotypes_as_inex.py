@@ -11,6 +11,7 @@ from phenex.phenotypes import (
     CategoricalPhenotype,
     CodelistPhenotype,
     LogicPhenotype,
+    ScorePhenotype,
     TimeRangePhenotype,
     SexPhenotype,
     UserDefinedPhenotype,
@@ -1036,6 +1037,82 @@ class CohortWithLogicPhenotypeAsInclusionTestGenerator(CohortTestGenerator):
         return {"index": df_expected_index}
 
 
+class CohortWithSharedLeafMatrixTestGenerator(
+    CohortWithLogicPhenotypeAsInclusionTestGenerator
+):
+    """
+    Cohort where several computation graph phenotypes of the index stage, and of the
+    reporting stage, share their leaf phenotypes, so that each stage pivots the leaves
+    once into a LeafMatrixNode. Patients P2 and P6 are born in 2010.
+
+    | **PATID** | **entry** | **YOB** | **Expected** |
+    | --- | --- | --- | --- |
+    | **P0** | d1 | 1980 | COHORT |
+    | **P2** | d1 | 2010 | EXCLUDED (minor with prior drug) |
+    | **P4** | d1 | 1980 | COHORT |
+    | **P6** | d1 | 2010 | EXCLUDED (minor with prior drug) |
+    """
+
+    def define_cohort(self):
+        entry = CodelistPhenotype(
+            name="entry_drug_d1",
+            return_date="first",
+            codelist=Codelist(["d1"]).copy(use_code_type=False),
+            domain="DRUG_EXPOSURE",
+        )
+        prior_drug_d1 = CodelistPhenotype(
+            name="prior_drug_d1",
+            return_date="first",
+            codelist=Codelist(["d1"]).copy(use_code_type=False),
+            domain="DRUG_EXPOSURE",
+            relative_time_range=RelativeTimeRangeFilter(
+                when="before", min_days=GreaterThanOrEqualTo(0)
+            ),
+        )
+        adult = AgePhenotype(
+            name="adult", value_filter=ValueFilter(min_value=GreaterThanOrEqualTo(18))
+        )
+        minor = AgePhenotype(
+            name="minor", value_filter=ValueFilter(max_value=LessThan(18))
+        )
+
+        return Cohort(
+            name="cohort_with_shared_leaf_matrix",
+            entry_criterion=entry,
+            inclusions=[
+                LogicPhenotype(
+                    name="prior_drug_and_any_age",
+                    expression=prior_drug_d1 & (adult | minor),
+                )
+            ],
+            exclusions=[
+                LogicPhenotype(
+                    name="minor_with_prior_drug", expression=minor & prior_drug_d1
+                )
+            ],
+            characteristics=[
+                ScorePhenotype(name="score", expression=prior_drug_d1 + adult),
+                LogicPhenotype(name="adult_or_minor", expression=adult | minor),
+            ],
+        )
+
+    def define_mapped_tables(self):
+        mapped_tables = super().define_mapped_tables()
+        df_person = mapped_tables["PERSON"].table.to_pandas()
+        df_person["YOB"] = [
+            2010 if int(patid[1:]) % 4 == 2 else 1980 for patid in df_person["PATID"]
+        ]
+        mapped_tables["PERSON"] = PersonTableForTests(
+            self.con.dest_connection.create_table("PERSON", df_person, overwrite=True)
+        )
+        return mapped_tables
+
+    def define_expected_output(self):
+        df_expected_index = pd.DataFrame()
+        df_expected_index["PERSON_ID"] = ["P0", "P4"]
+        return {"index": df_expected_index}
+
+
 class CohortWithNoneMinDateDataPeriodTestGenerator(CohortTestGenerator):
     """
     Regression test: Cohort with Database(data_period=DateFilter(min_date=None, max_date=...)).
@@ -1260,6 +1337,21 @@ def test_logic_phenotype_as_inclusion():
     g.run_tests()
 
 
+def test_shared_leaf_matrix():
+    g = CohortWithSharedLeafMatrixTestGenerator()
+    g.run_tests()
+    cohort = g.cohort
+    assert cohort.index_leaf_matrix_node is not None
+    assert cohort.reporting_leaf_matrix_node is not None
+    for pt in cohort.inclusions + cohort.exclusions:
+        assert pt.leaf_matrix is cohort.index_leaf_matrix_node
+    for pt in cohort.characteristics:
+        assert pt.leaf_matrix is cohort.reporting_leaf_matrix_node
+    score = cohort.characteristics[0].table.to_pandas()
+    assert sorted(score["PERSON_ID"]) == ["P0", "P4"]
+    assert set(score["VALUE"]) == {2}
+
+
 def test_data_period_none_min_date():
     """Regression test: DateFilter with min_date=None must not produce untyped NULL in SQL.
     The data period filter NULLs END_DATE values beyond max_date; without a typed null cast
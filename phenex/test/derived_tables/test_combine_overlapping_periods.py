@@ -99,5 +99,37 @@ def test_combine_overlapping_periods():
     check_start_end_date_equality(result, expected_table)
 
 
+def test_combine_overlapping_periods_duplicated_periods_after_gap():
+    # identical periods that start a new period after a gap must be combined
+    # into that period, not the one before the gap
+    con = ibis.duckdb.connect()
+    df_input = pd.DataFrame.from_records(
+        [
+            ("P1", "2022-01-01", "2022-01-03"),
+            ("P1", "2022-01-10", "2022-01-12"),
+            ("P1", "2022-01-10", "2022-01-12"),
+            ("P1", "2022-01-10", "2022-01-12"),
+            ("P1", "2022-01-11", "2022-01-20"),
+        ],
+        columns=["PERSON_ID", "START_DATE", "END_DATE"],
+    )
+    df_expected = pd.DataFrame.from_records(
+        [
+            ("P1", "2022-01-01", "2022-01-03"),
+            ("P1", "2022-01-10", "2022-01-20"),
+        ],
+        columns=["PERSON_ID", "START_DATE", "END_DATE"],
+    )
+    for df in [df_input, df_expected]:
+        df["START_DATE"] = pd.to_datetime(df["START_DATE"])
+        df["END_DATE"] = pd.to_datetime(df["END_DATE"])
+
+    result = CombineOverlappingPeriods(name="EXPOSURE", domain="EXPOSURE").execute(
+        tables={"EXPOSURE": con.create_table("EXPOSURE", df_input)}
+    )
+
+    check_start_end_date_equality(result, con.create_table("EXPECTED", df_expected))
+
+
 if __name__ == "__main__":
     test_combine_overlapping_periods()
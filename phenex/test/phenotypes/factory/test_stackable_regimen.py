@@ -1,8 +1,12 @@
 import datetime, os
+import operator
+from functools import reduce
+import ibis
 import pandas as pd
 
-from phenex.phenotypes import CodelistPhenotype
+from phenex.phenotypes import CodelistPhenotype, LogicPhenotype
 from phenex.phenotypes.factory import StackableRegimen
+from phenex.tables import CodeTable, PhenexPersonTable
 
 from phenex.codelists import LocalCSVCodelistFactory, Codelist
 from phenex.filters.date_filter import DateFilter
@@ -225,6 +229,55 @@ class StackableRegimenTestGenerator_4(PhenotypeTestGenerator):
         return test_infos
 
 
+def test_stack_matches_logic_phenotypes():
+    """
+    Each regimen is equivalent to the LogicPhenotype (c1 & c2) & ~(c3 | c4), including the returned dates, and all regimens share a single mask.
+    """
+    g = StackableRegimenTestGenerator_4()
+    df_condition_occurrence, df_person = [
+        info["df"] for info in g.define_input_tables()
+    ]
+    # spread the events so that the first date differs between phenotypes
+    df_condition_occurrence["EVENT_DATE"] = [
+        datetime.date(2021, 1, 1) + datetime.timedelta(days=i)
+        for i in range(len(df_condition_occurrence))
+    ]
+    tables = {
+        "CONDITION_OCCURRENCE": CodeTable(ibis.memtable(df_condition_occurrence)),
+        "PERSON": PhenexPersonTable(ibis.memtable(df_person)),
+    }
+
+    keys = ["c1", "c2", "c3", "c4"]
+    pts = {
+        cl: CodelistPhenotype(
+            name=cl, domain="CONDITION_OCCURRENCE", codelist=Codelist([cl])
+        )
+        for cl in keys
+    }
+    stackable_regimen = StackableRegimen(phenotypes=list(pts.values()))
+    masks = {id(pt.regimen_mask) for pt in stackable_regimen.output_phenotypes}
+    assert len(masks) == 1
+
+    def result(phenotype):
+        phenotype.execute(tables)
+        df = phenotype.table.to_pandas()[["PERSON_ID", "EVENT_DATE"]]
+        return df.sort_values("PERSON_ID").reset_index(drop=True)
+
+    for regimen in stackable_regimen.output_phenotypes:
+        included = [k for i, k in enumerate(keys) if regimen.mask & (1 << i)]
+        excluded = [k for k in keys if k not in included]
+        if not included:
+            expression = ~reduce(operator.or_, [pts[k] for k in excluded])
+        elif not excluded:
+            expression = reduce(operator.and_, [pts[k] for k in included])
+        else:
+            expression = reduce(operator.and_, [pts[k] for k in included]) & ~reduce(
+                operator.or_, [pts[k] for k in excluded]
+            )
+        expected = result(LogicPhenotype(name="expected", expression=expression))
+        pd.testing.assert_frame_equal(result(regimen), expected, check_dtype=False)
+
+
 def test_stack_3():
     g = StackableRegimenTestGenerator_3()
     g.run_tests()
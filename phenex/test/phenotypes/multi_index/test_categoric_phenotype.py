@@ -28,6 +28,8 @@ class MultiIndexCategoricalPhenotypeWithDateTestGenerator(
             "single_flag": ["P0", "P1", "P2", "P3"],
             "two_categorical_filter_or": ["P0", "P1", "P2", "P3", "P6", "P7"],
             "two_categorical_filter_and": [],
+            # every event lies more than 10 days before the shifted index
+            "nearest_to_index": [],
         }
 
         for test in tests:
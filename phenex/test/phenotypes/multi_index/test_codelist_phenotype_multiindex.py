@@ -195,6 +195,12 @@ class MultiIndexReturnDateTestGenerator(
                 info["dates"] = orig_dates + sd
                 info["index_dates"] = [idx1] * n + [idx2] * len(sp)
 
+            elif name in ("nearest_prior", "nearest_all"):
+                # return_date="nearest", before → events[7] (on shifted index)
+                info["persons"] = orig_persons + ["P0"]
+                info["dates"] = orig_dates + [self.event_dates[7]]
+                info["index_dates"] = [idx1] * n + [idx2]
+
         return tests
 
 
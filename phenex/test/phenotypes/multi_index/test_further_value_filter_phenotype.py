@@ -71,7 +71,13 @@ class MultiIndexFurtherValueFilterRelativeTimeRangeTestGenerator(
         tests = FurtherValueFilterRelativeTimeRangeTestGenerator.define_phenotype_tests(
             self
         )
-        return self._duplicate_expected(tests, self._index_date)
+        tests = self._duplicate_expected(tests, self._index_date)
+        # With the index shifted to 2022-08-30 the post-index measurement
+        # (2022-12-01) is nearer than the pre-index one (2022-01-01)
+        for test in tests:
+            if test["name"] == "nearest_to_index":
+                test["values"] = [1, 2, 3, 4] + [11, 12, 13, 14]
+        return tests
 
 
 class MultiIndexFurtherValueFilterReturnDateTestGenerator(
@@ -1,5 +1,6 @@
 import datetime, os
 import pandas as pd
+import pytest
 
 from phenex.phenotypes.categorical_phenotype import CategoricalPhenotype
 from phenex.filters import CategoricalFilter, RelativeTimeRangeFilter
@@ -170,7 +171,24 @@ class CategoricalPhenotypeWithDateTestGenerator(PhenotypeTestGenerator):
             ),
         }
 
-        test_infos = [c1, c2, c3]
+        c4 = {
+            "name": "nearest_to_index",
+            "persons": [f"P{i}" for i in range(4)],
+            "phenotype": CategoricalPhenotype(
+                name="categoric_pt",
+                domain="person",
+                categorical_filter=CategoricalFilter(
+                    allowed_values=["z1"],
+                    column_name="z",
+                ),
+                relative_time_range=RelativeTimeRangeFilter(
+                    when="before", min_days=None, max_days=LessThanOrEqualTo(10)
+                ),
+                return_date="nearest",
+            ),
+        }
+
+        test_infos = [c1, c2, c3, c4]
         for test_info in test_infos:
             test_info["phenotype"].name = test_info["name"]
 
@@ -187,6 +205,18 @@ def test_categorical_phenotype_with_time():
     spg.run_tests()
 
 
+def test_categorical_phenotype_nearest_requires_anchor():
+    with pytest.raises(ValueError, match="nearest"):
+        CategoricalPhenotype(
+            name="categoric_pt",
+            domain="person",
+            categorical_filter=CategoricalFilter(
+                allowed_values=["z1"], column_name="z"
+            ),
+            return_date="nearest",
+        )
+
+
 if __name__ == "__main__":
     # test_categorical_phenotype()
     test_categorical_phenotype_with_time()
@@ -486,8 +486,6 @@ class CodelistPhenotypeReturnDateFilterTestGenerator(PhenotypeTestGenerator):
             ),
         }
 
-        # TODO implement nearest
-
         t10 = {
             "name": "nearest_prior",
             "return_date": "nearest",
@@ -508,7 +506,7 @@ class CodelistPhenotypeReturnDateFilterTestGenerator(PhenotypeTestGenerator):
             ),
         }
 
-        test_infos = [t1, t2, t3, t4, t5, t6, t7, t8, t9]  # , t10, t11]
+        test_infos = [t1, t2, t3, t4, t5, t6, t7, t8, t9, t10, t11]
         codelist_factory = LocalCSVCodelistFactory(
             path=os.path.join(os.path.dirname(__file__), "../util/dummy/codelists.csv")
         )
@@ -529,6 +527,73 @@ class CodelistPhenotypeReturnDateFilterTestGenerator(PhenotypeTestGenerator):
 from phenex.tables import CodeTable, PhenexTable
 
 
+class CodelistPhenotypeReturnDateNearestTestGenerator(PhenotypeTestGenerator):
+    name_space = "clpt_return_date_nearest"
+    test_date = True
+
+    def define_input_tables(self):
+        index_date = datetime.date(2022, 1, 1)
+        day = datetime.timedelta(days=1)
+
+        """
+        P0 : after event is closer                  -> idx+5
+        P1 : equidistant before/after, earlier wins -> idx-5
+        P2 : single prior event                     -> idx-30
+        P3 : event on index date                    -> idx
+        P4 : two events on the nearest date (c1,c2) -> idx+2, kept once
+        """
+        rows = [
+            ("P0", "c1", index_date - 10 * day),
+            ("P0", "c1", index_date + 5 * day),
+            ("P1", "c1", index_date - 5 * day),
+            ("P1", "c1", index_date + 5 * day),
+            ("P2", "c1", index_date - 30 * day),
+            ("P3", "c1", index_date),
+            ("P3", "c1", index_date + 1 * day),
+            ("P4", "c1", index_date + 2 * day),
+            ("P4", "c2", index_date + 2 * day),
+            ("P4", "c1", index_date + 3 * day),
+        ]
+        df = pd.DataFrame(rows, columns=["PERSON_ID", "CODE", "EVENT_DATE"])
+        df["CODE_TYPE"] = "ICD10CM"
+        df["INDEX_DATE"] = index_date
+        self.index_date = index_date
+        self.day = day
+
+        return [{"name": "CONDITION_OCCURRENCE", "df": df}]
+
+    def define_phenotype_tests(self):
+        idx, day = self.index_date, self.day
+
+        t1 = {
+            "name": "nearest",
+            "persons": ["P0", "P1", "P2", "P3", "P4"],
+            "dates": [idx + 5 * day, idx - 5 * day, idx - 30 * day, idx, idx + 2 * day],
+        }
+
+        t2 = {
+            "name": "nearest_prior",
+            "persons": ["P0", "P1", "P2", "P3"],
+            "dates": [idx - 10 * day, idx - 5 * day, idx - 30 * day, idx],
+            "relative_time_range": RelativeTimeRangeFilter(
+                when="before", min_days=GreaterThanOrEqualTo(0)
+            ),
+        }
+
+        test_infos = [t1, t2]
+        for test_info in test_infos:
+            test_info["column_types"] = {f"{test_info['name']}_date": "date"}
+            test_info["phenotype"] = CodelistPhenotype(
+                name=test_info["name"],
+                domain="CONDITION_OCCURRENCE",
+                codelist=Codelist(["c1", "c2"]),
+                relative_time_range=test_info.get("relative_time_range"),
+                return_date="nearest",
+            )
+
+        return test_infos
+
+
 class DummyConditionOccurenceTable(CodeTable):
     NAME_TABLE = "DIAGNOSIS"
     JOIN_KEYS = {
@@ -1192,6 +1257,11 @@ def test_return_date():
     tg.run_tests()
 
 
+def test_return_date_nearest():
+    tg = CodelistPhenotypeReturnDateNearestTestGenerator()
+    tg.run_tests()
+
+
 def test_anchor_phenotype():
     tg = CodelistPhenotypeAnchorPhenotypeRelativeTimeRangeFilterTestGenerator()
     tg.run_tests()
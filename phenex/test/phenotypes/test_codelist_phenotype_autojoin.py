@@ -12,13 +12,16 @@ Table structure:
 
 import os
 import datetime
+import ibis
 import pandas as pd
 
 from phenex.phenotypes.codelist_phenotype import CodelistPhenotype
 from phenex.codelists import LocalCSVCodelistFactory
 from phenex.test.phenotype_test_generator import PhenotypeTestGenerator
 from phenex.filters.relative_time_range_filter import RelativeTimeRangeFilter
+from phenex.filters.date_filter import DateFilter, AfterOrOn, BeforeOrOn
 from phenex.filters.value import *
+from phenex.filters.categorical_filter import CategoricalFilter
 from phenex.tables import CodeTable, PhenexTable
 
 
@@ -406,6 +409,199 @@ class CodelistPhenotypeAutojoinTimeRangeTestGenerator(PhenotypeTestGenerator):
         return test_infos
 
 
+class CodelistPhenotypeAutojoinDateRangeTestGenerator(PhenotypeTestGenerator):
+    """
+    Test that an absolute date_range is pushed down to the scan of the event
+    table, i.e. applied BEFORE the autojoin to the mapping and concept tables.
+    """
+
+    name_space = "clpt_autojoin_daterange"
+
+    def define_input_tables(self):
+        """
+        One c1 event per patient, with event dates spread around the year 2021.
+        """
+        event_dates = [
+            datetime.date(2020, 12, 31),  # P0 before range
+            datetime.date(2021, 1, 1),  # P1 on min_date
+            datetime.date(2021, 6, 1),  # P2 within range
+            datetime.date(2021, 12, 31),  # P3 on max_date
+            datetime.date(2022, 1, 1),  # P4 after range
+        ]
+        N = len(event_dates)
+
+        df_concept = pd.DataFrame(
+            {"CONCEPTID": [1], "CODE": ["c1"], "CODE_TYPE": ["ICD10CM"]}
+        )
+        df_mapping = pd.DataFrame(
+            {"EVENTMAPPINGID": list(range(1, N + 1)), "CONCEPTID": [1] * N}
+        )
+        df_event = pd.DataFrame(
+            {
+                "PERSON_ID": [f"P{x}" for x in range(N)],
+                "EVENT_DATE": event_dates,
+                "EVENTMAPPINGID": list(range(1, N + 1)),
+            }
+        )
+
+        return [
+            {"name": "event", "df": df_event, "type": DummyEventWithoutCodesTable},
+            {"name": "event_mapping", "df": df_mapping, "type": DummyEventMappingTable},
+            {"name": "concept", "df": df_concept, "type": DummyConceptTable},
+        ]
+
+    def define_phenotype_tests(self):
+        codelist_factory = LocalCSVCodelistFactory(
+            path=os.path.join(os.path.dirname(__file__), "../util/dummy/codelists.csv")
+        )
+        t1 = {
+            "name": "date_range_2021",
+            "persons": ["P1", "P2", "P3"],
+            "phenotype": CodelistPhenotype(
+                name="date_range_2021",
+                codelist=codelist_factory.get_codelist("c1"),
+                domain="event",
+                date_range=DateFilter(
+                    min_date=AfterOrOn("2021-01-01"),
+                    max_date=BeforeOrOn("2021-12-31"),
+                ),
+            ),
+        }
+        return [t1]
+
+
+def _assert_date_filter_below_joins(sql):
+    """
+    The date predicate must appear exactly once in the compiled SQL and be
+    nested inside the scan of the event table, i.e. before the first JOIN.
+    """
+    predicate = '"EVENT_DATE" >= MAKE_DATE(2021, 1, 1)'
+    assert sql.count(predicate) == 1, sql
+    assert sql.index(predicate) < sql.index("JOIN"), sql
+
+
+def test_autojoin_date_range():
+    tg = CodelistPhenotypeAutojoinDateRangeTestGenerator()
+    tg.run_tests()
+
+
+def test_autojoin_date_range_pushed_below_joins():
+    tg = CodelistPhenotypeAutojoinDateRangeTestGenerator()
+    tg.run_tests()
+    for test_info in tg.test_infos:
+        sql = str(ibis.to_sql(test_info["phenotype"].table, dialect="duckdb"))
+        _assert_date_filter_below_joins(sql)
+
+
+class DummyDatelessEventTable(CodeTable):
+    """
+    Event table carrying codes but no EVENT_DATE; the date lives on the visit
+    the event belongs to and is only reachable through a categorical autojoin.
+    """
+
+    NAME_TABLE = "EVENT_DATELESS"
+    JOIN_KEYS = {
+        "DummyDatedVisitTable": ["VISITID"],
+    }
+    KNOWN_FIELDS = ["PERSON_ID", "CODE", "CODE_TYPE", "VISITID"]
+    DEFAULT_MAPPING = {
+        "PERSON_ID": "PERSON_ID",
+        "CODE": "CODE",
+        "CODE_TYPE": "CODE_TYPE",
+        "VISITID": "VISITID",
+    }
+
+
+class DummyDatedVisitTable(PhenexTable):
+    NAME_TABLE = "VISIT_DATED"
+    JOIN_KEYS = {
+        "DummyDatelessEventTable": ["VISITID"],
+    }
+    KNOWN_FIELDS = ["VISITID", "EVENT_DATE", "VISIT_TYPE"]
+    DEFAULT_MAPPING = {
+        "VISITID": "VISITID",
+        "EVENT_DATE": "EVENT_DATE",
+        "VISIT_TYPE": "VISIT_TYPE",
+    }
+
+
+class CodelistPhenotypeAutojoinDateRangeWithoutDateColumnTestGenerator(
+    PhenotypeTestGenerator
+):
+    """
+    Test that a date_range whose column only exists after a categorical autojoin
+    is not pushed down, but still applied after the join.
+    """
+
+    name_space = "clpt_autojoin_daterange_nodate"
+
+    def define_input_tables(self):
+        """
+        P0 : inpatient visit before the date range
+        P1 : inpatient visit within the date range
+        P2 : outpatient visit within the date range
+        P3 : inpatient visit after the date range
+        """
+        df_visit = pd.DataFrame(
+            {
+                "VISITID": [1, 2, 3, 4],
+                "EVENT_DATE": [
+                    datetime.date(2020, 12, 31),
+                    datetime.date(2021, 6, 1),
+                    datetime.date(2021, 6, 1),
+                    datetime.date(2022, 2, 1),
+                ],
+                "VISIT_TYPE": ["IP", "IP", "OP", "IP"],
+            }
+        )
+        df_event = pd.DataFrame(
+            {
+                "PERSON_ID": ["P0", "P1", "P2", "P3"],
+                "CODE": ["c1"] * 4,
+                "CODE_TYPE": ["ICD10CM"] * 4,
+                "VISITID": [1, 2, 3, 4],
+            }
+        )
+        return [
+            {"name": "event", "df": df_event, "type": DummyDatelessEventTable},
+            {"name": "visit", "df": df_visit, "type": DummyDatedVisitTable},
+        ]
+
+    def define_phenotype_tests(self):
+        codelist_factory = LocalCSVCodelistFactory(
+            path=os.path.join(os.path.dirname(__file__), "../util/dummy/codelists.csv")
+        )
+        t1 = {
+            "name": "inpatient_2021",
+            "persons": ["P1"],
+            "phenotype": CodelistPhenotype(
+                name="inpatient_2021",
+                codelist=codelist_factory.get_codelist("c1"),
+                domain="event",
+                categorical_filter=CategoricalFilter(
+                    column_name="VISIT_TYPE", allowed_values=["IP"], domain="visit"
+                ),
+                date_range=DateFilter(
+                    min_date=AfterOrOn("2021-01-01"),
+                    max_date=BeforeOrOn("2021-12-31"),
+                ),
+            ),
+        }
+        return [t1]
+
+
+def test_autojoin_date_range_not_pushed_down_without_column():
+    """
+    If the date column only exists after the autojoin, the date_range cannot be
+    pushed down and is applied after the joins instead.
+    """
+    tg = CodelistPhenotypeAutojoinDateRangeWithoutDateColumnTestGenerator()
+    tg.run_tests()
+    phenotype = tg.test_infos[0]["phenotype"]
+    _, pushed = phenotype._perform_date_pushdown(tg.domains["event"])
+    assert not pushed
+
+
 # ============================================================================
 # Test Registration
 # ============================================================================
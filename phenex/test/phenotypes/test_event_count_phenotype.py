@@ -172,7 +172,56 @@ class EventCountTestGenerator(PhenotypeTestGenerator):
             ),
         }
 
-        test_infos = [t1, t2, t3, t4, t5, t6, t7]
+        t8 = {
+            "name": "consecutive_days_second_event",
+            "persons": ["P1", "P1"],
+            "dates": [
+                self.index_date - 9 * self.one_day,
+                self.index_date,
+            ],
+            "phenotype": EventCountPhenotype(
+                phenotype=pt1_prior,
+                relative_time_range=RelativeTimeRangeFilter(
+                    min_days=GreaterThan(0),
+                    max_days=LessThanOrEqualTo(1),
+                ),
+                return_date="all",
+            ),
+        }
+
+        t9 = {
+            "name": "consecutive_days_first_event",
+            "persons": ["P1", "P1"],
+            "dates": [
+                self.index_date - 10 * self.one_day,
+                self.index_date - self.one_day,
+            ],
+            "phenotype": EventCountPhenotype(
+                phenotype=pt1_prior,
+                relative_time_range=RelativeTimeRangeFilter(
+                    min_days=GreaterThan(0),
+                    max_days=LessThan(2),
+                ),
+                return_date="all",
+                component_date_select="first",
+            ),
+        }
+
+        t10 = {
+            "name": "no_pair_in_range",
+            "persons": [],
+            "dates": [],
+            "phenotype": EventCountPhenotype(
+                phenotype=pt1_prior,
+                relative_time_range=RelativeTimeRangeFilter(
+                    min_days=GreaterThan(1),
+                    max_days=LessThan(2),
+                ),
+                return_date="all",
+            ),
+        }
+
+        test_infos = [t1, t2, t3, t4, t5, t6, t7, t8, t9, t10]
 
         for test_info in test_infos:
             test_info["phenotype"].name = test_info["name"]
@@ -1,6 +1,7 @@
 import datetime, os
 import pandas as pd
 import copy
+import pytest
 
 from phenex.filters.value import (
     GreaterThan,
@@ -10,7 +11,7 @@ from phenex.filters.value import (
 )
 from phenex.phenotypes.measurement_phenotype import MeasurementPhenotype
 from phenex.phenotypes.further_value_filter_phenotype import FurtherValueFilterPhenotype
-from phenex.codelists import LocalCSVCodelistFactory
+from phenex.codelists import LocalCSVCodelistFactory, Codelist
 from phenex.filters.value_filter import ValueFilter
 from phenex.filters.date_filter import DateFilter, After, Before
 from phenex.aggregators import *
@@ -339,7 +340,22 @@ class FurtherValueFilterRelativeTimeRangeTestGenerator(PhenotypeTestGenerator):
             ),
         }
 
-        test_infos = [c1, c2, c3]
+        # Pre and post values within a year of index; the pre-index value is nearer
+        c4 = {
+            "name": "nearest_to_index",
+            "persons": [f"P{x}" for x in range(4)],
+            "values": [1, 2, 3, 4],
+            "phenotype": FurtherValueFilterPhenotype(
+                name="nearest_to_index",
+                phenotype=source_phenotype,
+                relative_time_range=RelativeTimeRangeFilter(
+                    min_days=None, max_days=LessThanOrEqualTo(365), when="before"
+                ),
+                return_date="nearest",
+            ),
+        }
+
+        test_infos = [c1, c2, c3, c4]
         return test_infos
 
 
@@ -436,6 +452,20 @@ def test_further_value_filter_return_date():
     spg.run_tests()
 
 
+def test_further_value_filter_nearest_requires_anchor():
+    source_phenotype = MeasurementPhenotype(
+        name="all_values",
+        codelist=Codelist(["c1"]),
+        domain="MEASUREMENT",
+    )
+    with pytest.raises(ValueError, match="nearest"):
+        FurtherValueFilterPhenotype(
+            name="nearest_without_anchor",
+            phenotype=source_phenotype,
+            return_date="nearest",
+        )
+
+
 if __name__ == "__main__":
     test_further_value_filter_basic()
     test_further_value_filter_aggregation()
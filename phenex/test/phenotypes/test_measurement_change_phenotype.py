@@ -68,12 +68,12 @@ def measurement_changes_pandas(
         filtered_x.loc[:, "EVENT_DATE"] = filtered_x["EVENT_DATE_2"]
     if return_date == "first":
         filtered_x.loc[:, "rank"] = filtered_x.groupby("PERSON_ID")["EVENT_DATE"].rank(
-            method="first"
+            method="min"
         )
         filtered_x = filtered_x[filtered_x["rank"] == 1].reset_index(drop=True)
     elif return_date == "last":
         filtered_x.loc[:, "rank"] = filtered_x.groupby("PERSON_ID")["EVENT_DATE"].rank(
-            method="first", ascending=False
+            method="min", ascending=False
         )
         filtered_x = filtered_x[filtered_x["rank"] == 1].reset_index(drop=True)
 
@@ -202,6 +202,66 @@ class MeasurementChangePhenotypeTestGenerator(PhenotypeTestGenerator):
         return test_infos
 
 
+class MeasurementChangePhenotypeReturnDateTestGenerator(
+    MeasurementChangePhenotypeTestGenerator
+):
+    name_space = "mcp_return_date_test"
+
+    def define_phenotype_tests(self):
+        measurement_phenotype = MeasurementPhenotype(
+            name="measurement",
+            codelist=Codelist(["c1"]),
+            domain="MEASUREMENT",
+            return_date="all",
+        )
+
+        test_infos = []
+        for j, (
+            min_change,
+            max_change,
+            max_days_between,
+            component_date_select,
+            return_date,
+        ) in enumerate(
+            itertools.product(
+                [GreaterThanOrEqualTo(2), None],
+                [LessThanOrEqualTo(3), None],
+                [LessThan(4), None],
+                ["first", "second"],
+                ["first", "last"],
+            )
+        ):
+            df = measurement_changes_pandas(
+                self.df,
+                min_change,
+                max_change,
+                GreaterThan(0),
+                max_days_between,
+                component_date_select=component_date_select,
+                return_date=return_date,
+            )
+            df = df[["PERSON_ID", "EVENT_DATE", "VALUE"]].drop_duplicates()
+            if len(df):
+                test_infos.append(
+                    {
+                        "name": f"return_date_{j}",
+                        "persons": df.PERSON_ID,
+                        "values": df.VALUE,
+                        "dates": df.EVENT_DATE,
+                        "phenotype": MeasurementChangePhenotype(
+                            name=f"return_date_{j}",
+                            phenotype=measurement_phenotype,
+                            min_change=min_change,
+                            max_change=max_change,
+                            max_days_between=max_days_between,
+                            component_date_select=component_date_select,
+                            return_date=return_date,
+                        ),
+                    }
+                )
+        return test_infos
+
+
 class MeasurementChangeIncreaseDecreasePhenotypeTestGenerator(PhenotypeTestGenerator):
     name_space = "mcpt_increasedecrease"
 
@@ -500,6 +560,11 @@ def test_measurement_change_phenotype():
     spg.run_tests()
 
 
+def test_measurement_change_phenotype_return_date():
+    tg = MeasurementChangePhenotypeReturnDateTestGenerator()
+    tg.run_tests()
+
+
 def test_measurement_change_phenotype_increase_decrease():
     spg = MeasurementChangeIncreaseDecreasePhenotypeTestGenerator()
     spg.run_tests()
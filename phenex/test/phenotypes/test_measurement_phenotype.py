@@ -186,7 +186,20 @@ class MeasurementPhenotypeRelativeTimeRangeFilterTestGenerator(PhenotypeTestGene
             ),
         }
 
-        test_infos = [c1, c2]
+        c3 = {
+            "name": "nearest",
+            "persons": [f"P{x}" for x in range(5)],
+            "dates": [datetime.date(2022, 1, 1)] * 5,
+            "values": list(range(5)),
+            "phenotype": MeasurementPhenotype(
+                name="nearest",
+                return_date="nearest",
+                codelist=codelist_factory.get_codelist("c1"),
+                domain="MEASUREMENT",
+            ),
+        }
+
+        test_infos = [c1, c2, c3]
         return test_infos
 
 
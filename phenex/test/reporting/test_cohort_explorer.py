@@ -0,0 +1,130 @@
+"""
+Unit tests for the in-database aggregations of the CohortExplorer.
+"""
+
+import datetime
+from unittest.mock import Mock
+
+import ibis
+import numpy as np
+import pandas as pd
+import pytest
+
+from phenex.reporting.cohort_explorer import CohortExplorer
+
+
+def _phenotype(name, df):
+    phenotype = Mock()
+    phenotype.name = name
+    phenotype.table = ibis.memtable(df)
+    return phenotype
+
+
+@pytest.fixture
+def cohort():
+    rng = np.random.default_rng(0)
+    n = 300
+    person_ids = rng.integers(0, 100, n)
+    dates = [
+        datetime.date(2019, 1, 1) + datetime.timedelta(days=int(d))
+        for d in rng.integers(0, 900, n)
+    ]
+    entry = _phenotype(
+        "entry",
+        pd.DataFrame(
+            {
+                "PERSON_ID": np.arange(100),
+                "EVENT_DATE": [
+                    datetime.date(2020, 1, 1) + datetime.timedelta(days=int(d))
+                    for d in rng.integers(0, 60, 100)
+                ],
+            }
+        ),
+    )
+    cohort = Mock()
+    cohort.entry_criterion = entry
+    cohort.characteristics = [
+        _phenotype(
+            "age",
+            pd.DataFrame(
+                {
+                    "PERSON_ID": person_ids,
+                    "EVENT_DATE": dates,
+                    "VALUE": rng.normal(50, 10, n),
+                }
+            ),
+        ),
+        _phenotype(
+            "score",
+            pd.DataFrame(
+                {
+                    "PERSON_ID": person_ids,
+                    "EVENT_DATE": dates,
+                    "VALUE": rng.integers(0, 5, n),
+                }
+            ),
+        ),
+        _phenotype(
+            "sex",
+            pd.DataFrame(
+                {
+                    "PERSON_ID": person_ids,
+                    "EVENT_DATE": dates,
+                    "VALUE": rng.choice(["F", "M"], n),
+                }
+            ),
+        ),
+        _phenotype(
+            "constant",
+            pd.DataFrame({"PERSON_ID": person_ids, "EVENT_DATE": dates, "VALUE": 1.5}),
+        ),
+    ]
+    return cohort
+
+
+def _assert_visualizations_equal(actual, expected):
+    assert actual.keys() == expected.keys()
+    for key in expected:
+        for field, value in expected[key].items():
+            if isinstance(value, list) and value and isinstance(value[0], float):
+                np.testing.assert_allclose(actual[key][field], value)
+            elif isinstance(value, float):
+                assert actual[key][field] == pytest.approx(value, nan_ok=True)
+            else:
+                assert actual[key][field] == value, (key, field)
+
+
+@pytest.mark.parametrize("name", ["age", "score", "sex", "constant"])
+def test_visualizations_match_pandas(cohort, name):
+    explorer = CohortExplorer()
+    explorer.cohort = cohort
+    phenotype = next(c for c in cohort.characteristics if c.name == name)
+
+    actual = explorer._compute_phenotype_visualizations_in_database(
+        phenotype.table, phenotype
+    )
+    expected = explorer._compute_phenotype_visualizations(
+        phenotype.table.to_pandas(), phenotype
+    )
+    _assert_visualizations_equal(actual, expected)
+
+
+def test_correlation_matrix(cohort):
+    explorer = CohortExplorer()
+    explorer.cohort = cohort
+    actual = explorer._compute_correlation_matrix()
+
+    expected = pd.DataFrame(
+        {
+            c.name: c.table.to_pandas().groupby("PERSON_ID").VALUE.min()
+            for c in cohort.characteristics
+            if c.name != "sex"
+        }
+    ).corr()
+    pd.testing.assert_frame_equal(actual, expected, check_names=False)
+
+
+def test_sample_is_bounded(cohort):
+    explorer = CohortExplorer(max_sample_rows=50)
+    df = explorer._to_pandas(cohort.characteristics[0].table)
+    assert 0 < len(df) <= 50
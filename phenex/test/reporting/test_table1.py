@@ -0,0 +1,121 @@
+"""
+Unit tests for the batched Table1 statistics.
+"""
+
+from unittest.mock import Mock
+
+import ibis
+import numpy as np
+import pandas as pd
+import pytest
+
+from phenex.reporting.table1 import Table1
+
+
+def _phenotype(name, output_display_type, df):
+    phenotype = Mock()
+    phenotype.name = name
+    phenotype.display_name = name
+    phenotype.output_display_type = output_display_type
+    phenotype.table = ibis.memtable(df)
+    return phenotype
+
+
+@pytest.fixture
+def phenotypes():
+    rng = np.random.default_rng(0)
+    person_ids = rng.integers(0, 50, 120)
+    values = rng.integers(0, 30, 120).astype(float)
+    categories = rng.choice(["a", "b"], 120)
+    return {
+        "flag": _phenotype(
+            "flag", "boolean", pd.DataFrame({"PERSON_ID": person_ids, "BOOLEAN": True})
+        ),
+        "never": _phenotype(
+            "never",
+            "boolean",
+            pd.DataFrame({"PERSON_ID": pd.Series([], dtype=int), "BOOLEAN": True}),
+        ),
+        "age": _phenotype(
+            "age",
+            "value",
+            pd.DataFrame({"PERSON_ID": person_ids, "BOOLEAN": True, "VALUE": values}),
+        ),
+        "sex": _phenotype(
+            "sex",
+            "categorical",
+            pd.DataFrame(
+                {"PERSON_ID": person_ids, "BOOLEAN": True, "VALUE": categories}
+            ),
+        ),
+    }
+
+
+@pytest.fixture
+def cohort(phenotypes):
+    cohort = Mock()
+    cohort.characteristics = list(phenotypes.values())
+    cohort.index_table = ibis.memtable(
+        pd.DataFrame({"PERSON_ID": range(50), "BOOLEAN": True})
+    )
+    return cohort
+
+
+def test_table1_matches_per_phenotype_statistics(cohort, phenotypes):
+    df = Table1().execute(cohort).set_index("Name")
+
+    flag = phenotypes["flag"].table.execute()
+    assert df.loc["Cohort", "N"] == 50
+    assert df.loc["flag", "N"] == flag.PERSON_ID.nunique()
+    assert df.loc["never", "N"] == 0
+
+    age = phenotypes["age"].table.execute()[["PERSON_ID", "VALUE"]].drop_duplicates()
+    assert df.loc["age", "N"] == age.PERSON_ID.nunique()
+    assert df.loc["age", "Mean"] == pytest.approx(age.VALUE.mean())
+    assert df.loc["age", "STD"] == pytest.approx(age.VALUE.std())
+    assert df.loc["age", "Median"] == pytest.approx(age.VALUE.median())
+    assert df.loc["age", "Max"] == age.VALUE.max()
+
+    sex = phenotypes["sex"].table.execute()[["PERSON_ID", "VALUE"]].drop_duplicates()
+    counts = sex.VALUE.value_counts()
+    assert df.loc["sex=a", "N"] == counts["a"]
+    assert df.loc["sex=b", "N"] == counts["b"]
+    assert list(df.index) == ["Cohort", "flag", "never", "age", "sex=a", "sex=b"]
+
+
+def _gaussian_kde_curve(values):
+    from scipy.stats import gaussian_kde
+
+    is_integer = np.allclose(values, np.round(values))
+    kde = gaussian_kde(values, bw_method=1.5 if is_integer else None)
+    pad = (values.max() - values.min()) * 0.10
+    x = np.linspace(values.min() - pad, values.max() + pad, 200)
+    y = kde(x)
+    return x, y / y.max() * 100
+
+
+def test_value_distributions_match_gaussian_kde(cohort, phenotypes):
+    rng = np.random.default_rng(1)
+    lab = _phenotype(
+        "lab",
+        "value",
+        pd.DataFrame(
+            {"PERSON_ID": range(5000), "BOOLEAN": True, "VALUE": rng.gamma(2, 3, 5000)}
+        ),
+    )
+    cohort.characteristics.append(lab)
+    table1 = Table1()
+    table1.execute(cohort)
+    distributions = table1._value_distributions
+    assert set(distributions) == {"age", "lab"}
+
+    # counts per distinct value give the gaussian_kde curve
+    age = phenotypes["age"].table.execute()[["PERSON_ID", "VALUE"]].drop_duplicates()
+    x, y = _gaussian_kde_curve(age.VALUE.to_numpy())
+    np.testing.assert_allclose(distributions["age"]["x"], x, atol=1e-4)
+    np.testing.assert_allclose(distributions["age"]["y"], y, atol=0.01)
+
+    # more distinct values than bins are binned, which changes the curve very little
+    x, y = _gaussian_kde_curve(lab.table.execute().VALUE.to_numpy())
+    np.testing.assert_allclose(distributions["lab"]["x"], x, atol=1e-4)
+    np.testing.assert_allclose(distributions["lab"]["y"], y, atol=0.1)
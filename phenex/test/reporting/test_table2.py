@@ -1165,3 +1165,54 @@ class TestTable2:
         pretty = table2.get_pretty_display()
 
         assert "Incidence_Rate_Per_Patient_Month" in pretty.columns
+
+    def test_all_outcomes_match_per_patient_calculation(self):
+        """Test that the single query over all outcomes and time points agrees with the per-patient calculation of each outcome at each time point."""
+        base_date = pd.to_datetime("2020-01-01").date()
+        rng = np.random.default_rng(0)
+        cohort_data = pd.DataFrame(
+            {
+                "PERSON_ID": list(range(1, 101)),
+                "EVENT_DATE": [base_date] * 100,
+                "BOOLEAN": [True] * 100,
+            }
+        )
+
+        def random_events(n):
+            return pd.DataFrame(
+                {
+                    "PERSON_ID": rng.integers(1, 101, n),
+                    "EVENT_DATE": [
+                        base_date + timedelta(days=int(d))
+                        for d in rng.integers(-100, 800, n)
+                    ],
+                    "BOOLEAN": [True] * n,
+                }
+            )
+
+        outcomes = [MockPhenotype(f"outcome_{i}", random_events(60)) for i in range(3)]
+        death = MockPhenotype("death", random_events(20))
+        cohort = MockCohort(cohort_data, outcomes)
+
+        table2 = Table2(
+            time_points=[90, 365, 730],
+            right_censor_phenotypes=[death],
+            end_of_study_period=datetime(2021, 6, 30),
+        )
+        results = table2.execute(cohort)
+        assert len(results) == 9
+
+        for outcome in outcomes:
+            for time_point in table2.time_points:
+                followup_df = table2._calculate_per_patient_time_under_risk(
+                    outcome, time_point
+                ).execute()
+                result = results[
+                    (results["Outcome"] == outcome.name)
+                    & (results["Time_Point"] == time_point)
+                ].iloc[0]
+                assert result["N_Events"] == followup_df["HAS_EVENT"].sum()
+                assert result["N_Censored"] == followup_df["IS_CENSORED"].sum()
+                assert result["Time_Under_Risk"] == round(
+                    followup_df["FOLLOWUP_TIME"].sum() / 365.25, 3
+                )
@@ -915,3 +915,35 @@ class TestTimeToEventEmptyData:
         assert not result.empty
         assert "MI" not in result["Outcome"].values
         assert "Stroke" in result["Outcome"].values
+
+    def test_fit_kaplan_meier_from_event_counts(self):
+        """Test that fitting on counts aggregated in the database matches fitting on the patient-level table."""
+        tte_table = pd.DataFrame(
+            {
+                "INDICATOR_MI": [1, 0, 1, 0, 1, 0, 1, 1],
+                "DAYS_FIRST_EVENT_MI": [30, 60, 30, 90, 15, 60, 30, 90],
+            }
+        )
+        mock_phenotype = Mock()
+        mock_phenotype.name = "MI"
+        mock_phenotype.table = None
+        tte = TimeToEvent(right_censor_phenotypes=[])
+        tte._tte_table = tte_table
+        tte._outcomes = [mock_phenotype]
+        expected = tte._build_aggregated_risk_table()
+
+        tte = TimeToEvent(right_censor_phenotypes=[], aggregate_in_database=True)
+        tte._event_counts = (
+            tte_table.rename(
+                columns={"DAYS_FIRST_EVENT_MI": "DURATION", "INDICATOR_MI": "EVENT"}
+            )
+            .groupby(["DURATION", "EVENT"])
+            .size()
+            .reset_index(name="N")
+            .assign(OUTCOME="MI")
+        )
+        tte._outcomes = [mock_phenotype]
+        result = tte._build_aggregated_risk_table()
+
+        assert tte._tte_table is None
+        pd.testing.assert_frame_equal(result, expected)
@@ -5,8 +5,16 @@ Verifies the generated HTML contains the expected JS structure and embedded data
 """
 
 from pathlib import Path
+from unittest.mock import Mock
 
-from phenex.reporting.treatment_pattern_analysis_sankey import _build_sankey_html
+import ibis
+import numpy as np
+import pandas as pd
+
+from phenex.reporting.treatment_pattern_analysis_sankey import (
+    SankeyGenerator,
+    _build_sankey_html,
+)
 
 ARTIFACTS_DIR = Path(__file__).parent / "artifacts" / "treatment_pattern_sankey"
 
@@ -95,3 +103,37 @@ def test_sankey_html_from_inline_data():
 
     # Inline data structure is preserved in the embedded JSON
     assert _SANKEY_DATA[0]["tpa_name"] == "TP"
+
+
+def test_sankey_generator_matches_set_intersections():
+    rng = np.random.default_rng(0)
+    periods = []
+    for period_num in range(1, 4):
+        phenotypes = []
+        for regimen in ["A", "B", "C"]:
+            pt = Mock()
+            pt.name = f"TP_{regimen}_{period_num}"
+            pt.display_name = regimen
+            pt.table = ibis.memtable(
+                pd.DataFrame({"PERSON_ID": rng.integers(0, 40, 30)})
+            )
+            phenotypes.append(pt)
+        periods.append((period_num, f"P{period_num}", phenotypes))
+    periods[1][2][2].table = None
+
+    nodes, links = SankeyGenerator("TP", periods).build()
+
+    ids = [
+        set() if pt.table is None else set(pt.table.execute().PERSON_ID)
+        for _, _, phenotypes in periods
+        for pt in phenotypes
+    ]
+    assert [node["value"] for node in nodes] == [len(x) for x in ids]
+    expected = [
+        {"source": i, "target": j, "value": len(ids[i] & ids[j])}
+        for step in range(2)
+        for i in range(3 * step, 3 * step + 3)
+        for j in range(3 * step + 3, 3 * step + 6)
+        if ids[i] & ids[j]
+    ]
+    assert links == expected
@@ -0,0 +1,91 @@
+"""
+Unit tests for the Waterfall reporter.
+"""
+
+import datetime
+from unittest.mock import Mock
+
+import ibis
+import pandas as pd
+
+from phenex.reporting.waterfall import Waterfall
+
+D1 = datetime.date(2020, 1, 1)
+D2 = datetime.date(2020, 6, 1)
+
+
+def _phenotype(name, person_ids, index_dates=None, children=()):
+    df = pd.DataFrame({"PERSON_ID": person_ids, "BOOLEAN": True})
+    if index_dates is not None:
+        df["INDEX_DATE"] = index_dates
+    phenotype = Mock()
+    phenotype.name = name
+    phenotype.display_name = name
+    phenotype.table = ibis.memtable(df)
+    phenotype.children = list(children)
+    return phenotype
+
+
+def _cohort():
+    # six patients enter, P1 on two index dates
+    entry = _phenotype("entry", [])
+    entry.table = ibis.memtable(
+        pd.DataFrame(
+            {
+                "PERSON_ID": ["P1", "P1", "P2", "P3", "P4", "P5", "P6"],
+                "EVENT_DATE": [D1, D2, D1, D1, D1, D1, D1],
+                "BOOLEAN": True,
+            }
+        )
+    )
+    component = _phenotype("component", ["P1", "P2", "P9"])
+    # only the first index date of P1 fulfills the index-date specific inclusion
+    inclusion_1 = _phenotype(
+        "inclusion_1",
+        ["P1", "P2", "P3", "P4", "P5", "P9"],
+        [D1, D1, D1, D1, D1, D1],
+        children=[component],
+    )
+    inclusion_2 = _phenotype("inclusion_2", ["P1", "P2", "P3", "P4"])
+    exclusion = _phenotype("exclusion", ["P4", "P4", "P6"])
+
+    cohort = Mock()
+    cohort.entry_criterion = entry
+    cohort.inclusions = [inclusion_1, inclusion_2]
+    cohort.exclusions = [exclusion]
+    cohort.n_persons_in_source_database = 10
+    cohort.index_table = ibis.memtable(
+        pd.DataFrame(
+            {
+                "PERSON_ID": ["P1", "P2", "P3"],
+                "INDEX_DATE": [D1, D1, D1],
+                "BOOLEAN": True,
+            }
+        )
+    )
+    return cohort
+
+
+def test_waterfall_counts():
+    df = Waterfall().execute(_cohort()).set_index("Name")
+    assert df.loc["entry", "Remaining"] == 6
+    assert df.loc["entry", "N_events_remaining"] == 7
+    assert df.loc["inclusion_1", "N"] == 6
+    assert df.loc["inclusion_1", "Remaining"] == 5
+    assert df.loc["inclusion_1", "N_events_remaining"] == 5
+    assert df.loc["inclusion_2", "Remaining"] == 4
+    assert df.loc["exclusion", "N"] == 2
+    assert df.loc["exclusion", "N_events"] == 3
+    assert df.loc["exclusion", "Remaining"] == 3
+    assert df.loc["exclusion", "Delta"] == -1
+    assert df.loc["Final Cohort Size", "Remaining"] == 3
+    assert "component" not in df.index
+
+
+def test_waterfall_components():
+    df = Waterfall(include_component_phenotypes_level=1).execute(_cohort())
+    assert df.Name.tolist()[2:4] == ["inclusion_1", "component"]
+    component = df.set_index("Name").loc["component"]
+    assert component["Index"] == "2.1"
+    assert component["N"] == 3
+    assert pd.isna(component["Remaining"])
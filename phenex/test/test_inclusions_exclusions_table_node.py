@@ -0,0 +1,71 @@
+import datetime
+import pandas as pd
+import ibis
+import pytest
+from phenex.node import Node
+from phenex.core import InclusionsTableNode, ExclusionsTableNode
+
+INDEX = datetime.date(2020, 1, 1)
+
+
+class MockPhenotype(Node):
+    def __init__(self, name, persons, index_dates=True):
+        super().__init__(name=name)
+        df = pd.DataFrame({"PERSON_ID": persons})
+        df["BOOLEAN"] = True
+        if index_dates:
+            df["INDEX_DATE"] = INDEX
+        df["EVENT_DATE"] = INDEX
+        self.table = ibis.memtable(df)
+
+
+def _execute(node_class, index_dates=True, bitmask=True):
+    """
+    P1 : a, b, c (b twice)
+    P2 : a, c
+    P3 : b
+    P4 : none
+    """
+    entry = MockPhenotype("entry", ["P1", "P2", "P3", "P4"])
+    phenotypes = [
+        MockPhenotype("a", ["P1", "P2"], index_dates),
+        MockPhenotype("b", ["P1", "P1", "P3"], index_dates),
+        MockPhenotype("c", ["P1", "P2"], index_dates),
+    ]
+    node = node_class(
+        name="table", index_phenotype=entry, phenotypes=phenotypes, bitmask=bitmask
+    )
+    df = node._execute({}).to_pandas()
+    return df.sort_values("PERSON_ID").set_index("PERSON_ID")
+
+
+@pytest.mark.parametrize("index_dates", [True, False])
+def test_inclusions_table(index_dates):
+    df = _execute(InclusionsTableNode, index_dates)
+    assert len(df) == 4
+    assert df.BOOLEAN.tolist() == [True, False, False, False]
+    assert df.B_BOOLEAN.tolist() == [True, False, True, False]
+    assert df.BITMASK.tolist() == [7, 5, 2, 0]
+    assert ("INDEX_DATE" in df.columns) == index_dates
+
+
+def test_exclusions_table():
+    df = _execute(ExclusionsTableNode)
+    assert df.BOOLEAN.tolist() == [True, True, True, False]
+    assert df.BITMASK.tolist() == [7, 5, 2, 0]
+
+
+def test_without_bitmask():
+    df = _execute(InclusionsTableNode, bitmask=False)
+    assert "BITMASK" not in df.columns
+
+
+def test_bitmask_too_many_phenotypes():
+    phenotypes = [MockPhenotype(f"p{i}", ["P1"]) for i in range(63)]
+    with pytest.raises(ValueError):
+        InclusionsTableNode(
+            name="inclusions",
+            index_phenotype=MockPhenotype("entry", ["P1"]),
+            phenotypes=phenotypes,
+            bitmask=True,
+        )
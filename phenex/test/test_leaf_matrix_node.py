@@ -0,0 +1,140 @@
+import datetime
+import pandas as pd
+import ibis
+from phenex.core import LeafMatrixNode
+from phenex.phenotypes import (
+    AgePhenotype,
+    CodelistPhenotype,
+    LogicPhenotype,
+    ScorePhenotype,
+)
+from phenex.codelists import Codelist
+from phenex.filters import RelativeTimeRangeFilter, ValueFilter, GreaterThanOrEqualTo
+from phenex.tables import CodeTable, PhenexPersonTable
+
+INDEX = datetime.date(2020, 6, 1)
+
+
+def _tables():
+    """
+    P1 : d1 and d2 before index, adult
+    P2 : d1 after index, adult
+    P3 : d2 before index, minor
+    P4 : no events, minor
+    """
+    person = pd.DataFrame(
+        {
+            "PERSON_ID": ["P1", "P2", "P3", "P4"],
+            "DATE_OF_BIRTH": [
+                datetime.date(1980, 1, 1),
+                datetime.date(1985, 1, 1),
+                datetime.date(2010, 1, 1),
+                datetime.date(2012, 1, 1),
+            ],
+            "INDEX_DATE": [INDEX] * 4,
+        }
+    )
+    condition = pd.DataFrame(
+        {
+            "PERSON_ID": ["P1", "P1", "P1", "P2", "P3"],
+            "EVENT_DATE": [
+                datetime.date(2020, 1, 1),
+                datetime.date(2020, 2, 1),
+                datetime.date(2020, 3, 1),
+                datetime.date(2020, 7, 1),
+                datetime.date(2020, 1, 15),
+            ],
+            "CODE": ["d1", "d1", "d2", "d1", "d2"],
+            "CODE_TYPE": ["ICD10CM"] * 5,
+            "INDEX_DATE": [INDEX] * 5,
+        }
+    )
+    return {
+        "PERSON": PhenexPersonTable(ibis.memtable(person)),
+        "CONDITION_OCCURRENCE": CodeTable(ibis.memtable(condition)),
+    }
+
+
+def _leaves():
+    d1 = CodelistPhenotype(
+        name="d1",
+        codelist=Codelist(["d1"]).copy(use_code_type=False),
+        domain="CONDITION_OCCURRENCE",
+        return_date="first",
+        relative_time_range=RelativeTimeRangeFilter(when="before"),
+    )
+    d2 = CodelistPhenotype(
+        name="d2",
+        codelist=Codelist(["d2"]).copy(use_code_type=False),
+        domain="CONDITION_OCCURRENCE",
+        return_date="last",
+        relative_time_range=RelativeTimeRangeFilter(when="before"),
+    )
+    adult = AgePhenotype(
+        name="adult", value_filter=ValueFilter(min_value=GreaterThanOrEqualTo(18))
+    )
+    return d1, d2, adult
+
+
+def _computation_graph_phenotypes():
+    d1, d2, adult = _leaves()
+    return [
+        LogicPhenotype(name="d1_and_adult", expression=d1 & adult),
+        LogicPhenotype(name="d1_or_d2", expression=d1 | d2, return_date="last"),
+        ScorePhenotype(name="score", expression=2 * d1 + d2 + adult),
+    ]
+
+
+def _result(phenotype):
+    df = phenotype.table.to_pandas()
+    return df.sort_values("PERSON_ID").reset_index(drop=True)
+
+
+def test_has_one_row_per_index():
+    d1, d2, adult = _leaves()
+    assert d1.has_one_row_per_index
+    assert adult.has_one_row_per_index
+    all_d1 = CodelistPhenotype(
+        codelist=Codelist(["d1"]), domain="CONDITION_OCCURRENCE", return_date="all"
+    )
+    assert not all_d1.has_one_row_per_index
+    assert not LogicPhenotype(expression=d1 & all_d1).can_use_leaf_matrix()
+    assert not LogicPhenotype(
+        expression=d2 & LogicPhenotype(expression=d1 & adult)
+    ).can_use_leaf_matrix()
+
+
+def test_leaf_matrix_matches_hstack():
+    tables = _tables()
+
+    expected = {}
+    for pt in _computation_graph_phenotypes():
+        pt.execute(tables)
+        expected[pt.name] = _result(pt)
+
+    phenotypes = _computation_graph_phenotypes()
+    leaves = {leaf.name: leaf for pt in phenotypes for leaf in pt.children}
+    leaf_matrix = LeafMatrixNode(
+        name="test_leaf_matrix", phenotypes=list(leaves.values())
+    )
+    for pt in phenotypes:
+        pt.use_leaf_matrix(leaf_matrix)
+        assert leaf_matrix in pt.dependencies
+        assert leaf_matrix not in pt.children
+
+    for pt in phenotypes:
+        pt.execute(tables)
+        assert leaf_matrix.table is not None
+        pd.testing.assert_frame_equal(_result(pt), expected[pt.name])
+
+    pt.use_leaf_matrix(None)
+    assert leaf_matrix not in pt.dependencies
+
+
+def test_leaf_matrix_without_person_table():
+    d1, d2, adult = _leaves()
+    leaf_matrix = LeafMatrixNode(name="test_leaf_matrix", phenotypes=[d1, d2])
+    tables = _tables()
+    del tables["PERSON"]
+    leaf_matrix.execute(tables)
+    assert leaf_matrix.table is None
@@ -570,6 +570,34 @@ class TestPhenexNodeExecution:
         with pytest.raises(ValueError, match="Circular dependency detected"):
             node_b.add_children(node_a)
 
+    def test_execution_dependencies(self):
+        """Test that execution dependencies are executed first but are not children"""
+        parent = ConcreteNode("parent")
+        child = ConcreteNode("child")
+        shared = ConcreteNode("shared")
+        parent.add_children(child)
+        parent.add_execution_dependencies(shared)
+
+        assert parent.children == [child]
+        assert parent.execution_dependencies == [shared]
+        assert shared in parent.dependencies
+        assert shared in parent.dependency_graph[parent]
+
+        parent.execute({"domain1": MockTable()})
+        assert shared.executed
+
+        parent.remove_execution_dependencies(shared)
+        assert parent.execution_dependencies == []
+        assert shared not in parent.dependencies
+
+    def test_execution_dependencies_circular_dependency(self):
+        """Test that an execution dependency cannot create a cycle"""
+        node1 = Node("node1")
+        node2 = Node("node2")
+        node1.add_children(node2)
+        with pytest.raises(ValueError, match="Circular dependency detected"):
+            node2.add_execution_dependencies(node1)
+
 
 class TestPhenexNodeGroup:
     """Test NodeGroup class"""
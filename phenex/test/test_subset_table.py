@@ -0,0 +1,127 @@
+import datetime
+import pandas as pd
+import ibis
+from phenex.node import Node
+from phenex.core import SubsetTable, SubsetKeysNode
+from phenex.tables import CodeTable, PhenexTable
+
+D1 = datetime.date(2020, 1, 1)
+D2 = datetime.date(2020, 6, 1)
+
+
+class MockPhenotype(Node):
+    def _execute(self, tables):
+        return ibis.memtable(self.df)
+
+
+def _mock_phenotype(name, df):
+    phenotype = MockPhenotype(name=name)
+    phenotype.df = df
+    return phenotype
+
+
+def _condition_occurrence():
+    """
+    P1 : two events, one of them duplicated
+    P2 : one event
+    P3 : one event, not in the index phenotype
+    """
+    df = pd.DataFrame(
+        {
+            "PERSON_ID": ["P1", "P1", "P1", "P2", "P3"],
+            "EVENT_DATE": [D1, D2, D2, D1, D1],
+            "CODE": ["c1", "c2", "c2", "c1", "c1"],
+        }
+    )
+    return CodeTable(ibis.memtable(df))
+
+
+def _entry():
+    """
+    P1 : two index dates, the first one twice
+    P2 : one index date
+    """
+    df = pd.DataFrame(
+        {
+            "PERSON_ID": ["P1", "P1", "P1", "P2"],
+            "EVENT_DATE": [D1, D1, D2, D2],
+            "BOOLEAN": True,
+        }
+    )
+    return _mock_phenotype("entry", df)
+
+
+def _result(table):
+    df = table.to_pandas()
+    return sorted(map(tuple, df[sorted(df.columns)].astype(str).values))
+
+
+def test_subset_keys():
+    keys = SubsetKeysNode(name="keys", index_phenotype=_entry())
+    keys.execute({})
+    df = keys.table.to_pandas()
+    assert list(df.columns) == ["PERSON_ID", "INDEX_DATE"]
+    assert df.values.tolist() == [["P1", D1], ["P1", D2], ["P2", D2]]
+
+
+def test_subset_entry():
+    entry = _entry()
+    tables = {"CONDITION_OCCURRENCE": _condition_occurrence()}
+    keys = SubsetKeysNode(name="keys", index_phenotype=entry)
+    shared = SubsetTable(
+        name="subset",
+        domain="CONDITION_OCCURRENCE",
+        index_phenotype=entry,
+        index_keys=keys,
+    )
+    shared.execute(tables)
+    # every record is repeated once per distinct index date of the patient
+    assert shared.table.count().execute() == 3 * 2 + 1
+    assert "INDEX_DATE" in shared.table.columns
+    assert "P3" not in shared.table.PERSON_ID.to_pandas().tolist()
+
+    unshared = SubsetTable(
+        name="subset_unshared", domain="CONDITION_OCCURRENCE", index_phenotype=entry
+    )
+    unshared.execute(tables)
+    assert _result(unshared.table) == _result(shared.table)
+
+
+def test_subset_index():
+    entry = _entry()
+    entry_subset = SubsetTable(
+        name="subset_entry", domain="CONDITION_OCCURRENCE", index_phenotype=entry
+    )
+    entry_subset.execute({"CONDITION_OCCURRENCE": _condition_occurrence()})
+
+    index = _mock_phenotype(
+        "index",
+        pd.DataFrame({"PERSON_ID": ["P1"], "INDEX_DATE": [D2], "BOOLEAN": True}),
+    )
+    index_subset = SubsetTable(
+        name="subset_index", domain="CONDITION_OCCURRENCE", index_phenotype=index
+    )
+    index_subset.execute({"CONDITION_OCCURRENCE": CodeTable(entry_subset.table)})
+    # a semi-join on (PERSON_ID, INDEX_DATE); the columns are unchanged
+    assert index_subset.table.columns == entry_subset.table.columns
+    df = index_subset.table.to_pandas()
+    assert df.PERSON_ID.tolist() == ["P1"] * 3
+    assert set(df.INDEX_DATE) == {D2}
+
+
+def test_subset_without_person_id():
+    concept = PhenexTable(ibis.memtable(pd.DataFrame({"CONCEPT_ID": [1, 2]})))
+    subset = SubsetTable(name="subset", domain="CONCEPT", index_phenotype=_entry())
+    subset.execute({"CONCEPT": concept})
+    assert subset.table.count().execute() == 2
+
+
+def test_subset_columns():
+    subset = SubsetTable(
+        name="subset",
+        domain="CONDITION_OCCURRENCE",
+        index_phenotype=_entry(),
+        columns=["PERSON_ID", "EVENT_DATE"],
+    )
+    subset.execute({"CONDITION_OCCURRENCE": _condition_occurrence()})
+    assert subset.table.columns == ["PERSON_ID", "EVENT_DATE", "INDEX_DATE"]
@@ -3,6 +3,7 @@ import pandas as pd
 import ibis
 import pytest
 from phenex.tables import CodeTable, PhenexPersonTable, PhenexTable
+from phenex.tables import _AUTOJOIN_PATH_CACHE
 
 
 class TestCoalescingMapper(CodeTable):
@@ -370,6 +371,98 @@ def test_column_mapping_override():
     pd.testing.assert_frame_equal(result[["CODE"]], df_expected, check_dtype=False)
 
 
+class TestAutojoinEventTable(CodeTable):
+    """Event table without codes; reaches the concept table via a mapping table."""
+
+    NAME_TABLE = "TEST_AUTOJOIN_EVENT"
+    JOIN_KEYS = {"TestAutojoinMappingTable": [("ID", "EVENTID")]}
+    PATHS = {"TestAutojoinConceptTable": ["TestAutojoinMappingTable"]}
+    KNOWN_FIELDS = ["PERSON_ID", "EVENT_DATE", "ID"]
+    DEFAULT_MAPPING = {"PERSON_ID": "PERSON_ID", "EVENT_DATE": "EVENT_DATE", "ID": "ID"}
+
+
+class TestAutojoinMappingTable(PhenexTable):
+    NAME_TABLE = "TEST_AUTOJOIN_MAPPING"
+    JOIN_KEYS = {
+        "TestAutojoinEventTable": [("EVENTID", "ID")],
+        "TestAutojoinConceptTable": ["CONCEPTID"],
+    }
+    KNOWN_FIELDS = ["EVENTID", "CONCEPTID"]
+    DEFAULT_MAPPING = {"EVENTID": "EVENTID", "CONCEPTID": "CONCEPTID"}
+
+
+class TestAutojoinConceptTable(CodeTable):
+    NAME_TABLE = "TEST_AUTOJOIN_CONCEPT"
+    JOIN_KEYS = {"TestAutojoinMappingTable": ["CONCEPTID"]}
+    KNOWN_FIELDS = ["CONCEPTID", "CODE"]
+    DEFAULT_MAPPING = {"CONCEPTID": "CONCEPTID", "CODE": "CODE"}
+
+
+def _autojoin_domains():
+    events = pd.DataFrame(
+        {
+            "PERSON_ID": ["P1", "P1", "P2", "P3"],
+            "EVENT_DATE": [datetime.date(2020, 1, 1)] * 4,
+            "ID": [1, 2, 3, 4],
+        }
+    )
+    # event 1 maps to two concepts; event 4 has no mapping
+    mapping = pd.DataFrame({"EVENTID": [1, 1, 2, 3], "CONCEPTID": [10, 11, 11, 12]})
+    concepts = pd.DataFrame({"CONCEPTID": [10, 11, 12], "CODE": ["A", "A", "B"]})
+    return {
+        "EVENT": TestAutojoinEventTable(ibis.memtable(events)),
+        "MAPPING": TestAutojoinMappingTable(ibis.memtable(mapping)),
+        "CONCEPT": TestAutojoinConceptTable(ibis.memtable(concepts)),
+    }
+
+
+def test_autojoin_path_is_cached_per_class_pair():
+    domains = _autojoin_domains()
+    event, concept = domains["EVENT"], domains["CONCEPT"]
+    _AUTOJOIN_PATH_CACHE.pop((TestAutojoinEventTable, TestAutojoinConceptTable), None)
+
+    path = event._find_path(concept)
+    assert path == ["TestAutojoinMappingTable", "TestAutojoinConceptTable"]
+    assert (TestAutojoinEventTable, TestAutojoinConceptTable) in _AUTOJOIN_PATH_CACHE
+
+    # a second lookup must not re-resolve the path
+    resolved = []
+    original_resolve = TestAutojoinEventTable._resolve_path
+    TestAutojoinEventTable._resolve_path = lambda self, other: resolved.append(other)
+    try:
+        assert event._find_path(concept) == path
+    finally:
+        TestAutojoinEventTable._resolve_path = original_resolve
+    assert resolved == []
+
+    # mutating the returned path must not corrupt the cache
+    path.append("SomethingElse")
+    assert event._find_path(concept) == [
+        "TestAutojoinMappingTable",
+        "TestAutojoinConceptTable",
+    ]
+
+
+def test_autojoin_semi_join_matches_join():
+    domains = _autojoin_domains()
+    event, concept = domains["EVENT"], domains["CONCEPT"]
+    filtered_concept = concept.filter(concept.CODE == "A")
+
+    joined = event.join(filtered_concept, domains=domains)
+    expected = (
+        joined.select(event.columns).distinct().execute().sort_values("ID").ID.tolist()
+    )
+
+    semi_joined = event.semi_join(filtered_concept, domains=domains)
+    assert isinstance(semi_joined, TestAutojoinEventTable)
+    assert semi_joined.columns == event.columns
+    result = semi_joined.execute().sort_values("ID")
+
+    assert result.ID.tolist() == expected == [1, 2]
+    # semi-join never duplicates rows, even though event 1 maps to two concepts
+    assert len(result) == 2
+
+
 if __name__ == "__main__":
     test_single_column_mapping()
     test_coalesce_first_column_present()
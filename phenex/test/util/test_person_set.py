@@ -0,0 +1,61 @@
+import ibis
+import numpy as np
+import pandas as pd
+import pytest
+from phenex.phenotypes.phenotype import Phenotype
+from phenex.util import PersonSet
+
+
+@pytest.mark.parametrize("dense", [False, True])
+def test_set_algebra_matches_python_sets(dense):
+    rng = np.random.default_rng(0)
+    if dense:
+        # most chunks hold more than 4096 ids and are stored as bitmaps
+        a = np.flatnonzero(rng.random(300_000) < 0.9) - 100_000
+        b = np.flatnonzero(rng.random(300_000) < 0.5)
+    else:
+        a = rng.integers(-200_000, 400_000, 20_000)
+        b = rng.integers(-200_000, 400_000, 20_000)
+    set_a, set_b = set(a.tolist()), set(b.tolist())
+    person_set_a, person_set_b = PersonSet(a), PersonSet(b)
+
+    assert len(person_set_a) == len(set_a)
+    assert set(person_set_a & person_set_b) == set_a & set_b
+    assert set(person_set_a | person_set_b) == set_a | set_b
+    assert set(person_set_a - person_set_b) == set_a - set_b
+    assert person_set_a.to_numpy().tolist() == sorted(set_a)
+    assert int(a[0]) in person_set_a
+    assert person_set_a == PersonSet(sorted(set_a))
+
+
+def test_string_person_ids():
+    a = PersonSet(["P1", "P2", "P3", "P2"])
+    b = PersonSet(["P2", "P4"])
+    assert len(a) == 3
+    assert list(a & b) == ["P2"]
+    assert list(a - b) == ["P1", "P3"]
+    assert len(a | b) == 4
+    assert "P1" in a and "P4" not in a
+
+
+def test_empty():
+    assert len(PersonSet()) == 0
+    assert not PersonSet()
+    assert len(PersonSet([1, 2]) & PersonSet()) == 0
+
+
+class MockPhenotype(Phenotype):
+    def _execute(self, tables):
+        return self.df
+
+
+def test_phenotype_person_set_is_cached():
+    phenotype = MockPhenotype(name="mock")
+    phenotype.table = ibis.memtable(pd.DataFrame({"PERSON_ID": [3, 1, 3]}))
+    person_set = phenotype.person_set
+    assert person_set.to_numpy().tolist() == [1, 3]
+    assert phenotype.person_set is person_set
+
+    # a new table invalidates the cached set
+    phenotype.table = ibis.memtable(pd.DataFrame({"PERSON_ID": [2]}))
+    assert phenotype.person_set.to_numpy().tolist() == [2]
@@ -1,2 +1,3 @@
 from .logging import create_logger
 from .database_sampler import DatabaseSampler
+from .person_set import PersonSet
@@ -0,0 +1,240 @@
+from __future__ import annotations
+
+from typing import Any, Dict, Iterable, Optional
+
+import numpy as np
+
+# Containers with more values than this are stored as a bitmap (as in roaring bitmaps,
+# this is where a 65536-bit bitmap becomes smaller than an array of 16-bit values).
+_MAX_ARRAY_SIZE = 4096
+_N_WORDS = 1 << 10  # 1024 x 64 bits = one bitmap container
+
+
+class PersonSet:
+    """An immutable, in-memory set of PERSON_IDs supporting fast set algebra.
+
+    Integer PERSON_IDs are stored roaring-bitmap style: the IDs are split into
+    chunks by their high bits (PERSON_ID >> 16) and the low 16 bits of each chunk
+    are kept either as a sorted uint16 array (sparse chunks) or as a 65536-bit
+    bitmap (dense chunks, more than 4096 IDs). Intersections, unions, differences
+    and cardinalities are vectorized NumPy operations per chunk, without boxing
+    the IDs as Python objects. Non-integer PERSON_IDs (e.g. strings) are kept as
+    a sorted array of unique values instead.
+
+    Args:
+        person_ids: Iterable of PERSON_IDs. Duplicates are ignored.
+
+    Example:
+        a = PersonSet.from_table(phenotype_a.table)   # one database round-trip
+        b = PersonSet.from_table(phenotype_b.table)
+        len(a & b), len(a - b), len(a | b)
+    """
+
+    def __init__(self, person_ids: Optional[Iterable[Any]] = None) -> None:
+        if person_ids is None:
+            person_ids = []
+        values = (
+            person_ids
+            if isinstance(person_ids, np.ndarray)
+            else np.asarray(list(person_ids))
+        )
+        self._containers: Optional[Dict[int, np.ndarray]] = None
+        self._values: Optional[np.ndarray] = None
+        if values.dtype.kind == "f" and np.all(np.mod(values, 1) == 0):
+            values = values.astype(np.int64)
+        if values.dtype.kind in "iu" or len(values) == 0:
+            self._containers = self._build_containers(values.astype(np.int64))
+        else:
+            self._values = np.unique(values.astype(object))
+
+    @classmethod
+    def from_table(cls, table) -> "PersonSet":
+        """Build a PersonSet from the distinct PERSON_IDs of an ibis table.
+
+        Args:
+            table: ibis Table (or PhenexTable) with a PERSON_ID column.
+        """
+        ids = table.select("PERSON_ID").distinct().execute()["PERSON_ID"]
+        return cls(ids.dropna().to_numpy())
+
+    @classmethod
+    def _from_containers(cls, containers: Dict[int, np.ndarray]) -> "PersonSet":
+        result = cls()
+        result._containers = containers
+        return result
+
+    @classmethod
+    def _from_values(cls, values: np.ndarray) -> "PersonSet":
+        result = cls()
+        result._containers = None
+        result._values = values
+        return result
+
+    # ------------------------------------------------------------------
+    # Container helpers
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _build_containers(ids: np.ndarray) -> Dict[int, np.ndarray]:
+        ids = np.sort(ids)
+        if len(ids) == 0:
+            return {}
+        ids = ids[np.concatenate([[True], ids[1:] != ids[:-1]])]
+        highs = ids >> 16
+        starts = np.flatnonzero(highs[1:] != highs[:-1]) + 1
+        containers = {}
+        for chunk in np.split(ids, starts):
+            key = chunk[0] >> 16
+            low = (chunk & 0xFFFF).astype(np.uint16)
+            containers[int(key)] = PersonSet._normalize(low)
+        return containers
+
+    @staticmethod
+    def _is_bitmap(container: np.ndarray) -> bool:
+        return container.dtype == np.uint64
+
+    @staticmethod
+    def _to_bitmap(container: np.ndarray) -> np.ndarray:
+        if PersonSet._is_bitmap(container):
+            return container
+        bits = np.zeros(_N_WORDS * 64, dtype=bool)
+        bits[container] = True
+        return np.packbits(bits, bitorder="little").view(np.uint64)
+
+    @staticmethod
+    def _to_array(container: np.ndarray) -> np.ndarray:
+        if not PersonSet._is_bitmap(container):
+            return container
+        bits = np.unpackbits(container.view(np.uint8), bitorder="little")
+        return np.flatnonzero(bits).astype(np.uint16)
+
+    @staticmethod
+    def _cardinality(container: np.ndarray) -> int:
+        if PersonSet._is_bitmap(container):
+            return int(np.unpackbits(container.view(np.uint8)).sum())
+        return len(container)
+
+    @staticmethod
+    def _normalize(container: np.ndarray) -> Optional[np.ndarray]:
+        """Store a container in its smaller representation; None if empty."""
+        n = PersonSet._cardinality(container)
+        if n == 0:
+            return None
+        if n > _MAX_ARRAY_SIZE:
+            return PersonSet._to_bitmap(container)
+        return PersonSet._to_array(container)
+
+    @staticmethod
+    def _contains(container: np.ndarray, low: np.ndarray) -> np.ndarray:
+        """Boolean mask of which of the uint16 values low are in container."""
+        if PersonSet._is_bitmap(container):
+            words = container[(low >> 6).astype(np.intp)]
+            return ((words >> (low & 63).astype(np.uint64)) & np.uint64(1)).astype(bool)
+        return np.isin(low, container, assume_unique=True)
+
+    @staticmethod
+    def _and(a: np.ndarray, b: np.ndarray) -> Optional[np.ndarray]:
+        if PersonSet._is_bitmap(a) and PersonSet._is_bitmap(b):
+            return PersonSet._normalize(a & b)
+        if PersonSet._is_bitmap(a):
+            a, b = b, a
+        return PersonSet._normalize(a[PersonSet._contains(b, a)])
+
+    @staticmethod
+    def _or(a: np.ndarray, b: np.ndarray) -> Optional[np.ndarray]:
+        if PersonSet._is_bitmap(a) or PersonSet._is_bitmap(b):
+            return PersonSet._to_bitmap(a) | PersonSet._to_bitmap(b)
+        return PersonSet._normalize(np.union1d(a, b))
+
+    @staticmethod
+    def _sub(a: np.ndarray, b: np.ndarray) -> Optional[np.ndarray]:
+        if PersonSet._is_bitmap(a):
+            return PersonSet._normalize(a & ~PersonSet._to_bitmap(b))
+        return PersonSet._normalize(a[~PersonSet._contains(b, a)])
+
+    # ------------------------------------------------------------------
+    # Set algebra
+    # ------------------------------------------------------------------
+
+    def _is_compatible(self, other: "PersonSet") -> bool:
+        return self._containers is not None and other._containers is not None
+
+    def __and__(self, other: "PersonSet") -> "PersonSet":
+        if not self._is_compatible(other):
+            return PersonSet._from_values(
+                np.intersect1d(self.to_numpy(), other.to_numpy())
+            )
+        containers = {}
+        for key in self._containers.keys() & other._containers.keys():
+            container = self._and(self._containers[key], other._containers[key])
+            if container is not None:
+                containers[key] = container
+        return PersonSet._from_containers(containers)
+
+    def __or__(self, other: "PersonSet") -> "PersonSet":
+        if not self._is_compatible(other):
+            return PersonSet._from_values(np.union1d(self.to_numpy(), other.to_numpy()))
+        containers = dict(self._containers)
+        for key, container in other._containers.items():
+            if key in containers:
+                containers[key] = self._or(containers[key], container)
+            else:
+                containers[key] = container
+        return PersonSet._from_containers(containers)
+
+    def __sub__(self, other: "PersonSet") -> "PersonSet":
+        if not self._is_compatible(other):
+            return PersonSet._from_values(
+                np.setdiff1d(self.to_numpy(), other.to_numpy())
+            )
+        containers = {}
+        for key, container in self._containers.items():
+            if key in other._containers:
+                container = self._sub(container, other._containers[key])
+            if container is not None:
+                containers[key] = container
+        return PersonSet._from_containers(containers)
+
+    def __len__(self) -> int:
+        if self._containers is None:
+            return len(self._values)
+        return sum(self._cardinality(c) for c in self._containers.values())
+
+    def __bool__(self) -> bool:
+        return len(self) > 0
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, PersonSet):
+            return NotImplemented
+        return len(self) == len(other) and len(self - other) == 0
+
+    def __contains__(self, person_id: Any) -> bool:
+        if self._containers is None:
+            i = np.searchsorted(self._values, person_id)
+            return i < len(self._values) and self._values[i] == person_id
+        if not isinstance(person_id, (int, np.integer)):
+            return False
+        container = self._containers.get(int(person_id) >> 16)
+        if container is None:
+            return False
+        low = np.array([int(person_id) & 0xFFFF], dtype=np.uint16)
+        return bool(self._contains(container, low)[0])
+
+    def __iter__(self):
+        return iter(self.to_numpy().tolist())
+
+    def to_numpy(self) -> np.ndarray:
+        """Return the PERSON_IDs as a sorted NumPy array."""
+        if self._containers is None:
+            return self._values
+        if not self._containers:
+            return np.array([], dtype=np.int64)
+        return np.concatenate(
+            [
+                (np.int64(key) << 16) + self._to_array(self._containers[key])
+                for key in sorted(self._containers)
+            ]
+        )
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}(n={len(self)})"